@@ -26,10 +26,21 @@
 
 import dataclasses
 import enum
+import sys
 from typing import Any, Dict, Mapping, NamedTuple, Optional
 
 
-@dataclasses.dataclass
+# Components can create millions of detections, so when it is supported, the detection and track classes use
+# __slots__ instead of a per-instance __dict__. This reduces memory usage and speeds up attribute access.
+# The constructors and attributes are the same either way, but attributes that are not declared can not be
+# added to slotted instances, and slotted instances can only be pickled with pickle protocol 2 or higher.
+if sys.version_info >= (3, 10):
+    _detection_dataclass = dataclasses.dataclass(slots=True)
+else:
+    _detection_dataclass = dataclasses.dataclass
+
+
+@_detection_dataclass
 class ImageLocation:
     x_left_upper: int
     y_left_upper: int
@@ -39,7 +50,7 @@ class ImageLocation:
     detection_properties: Dict[str, str] = dataclasses.field(default_factory=dict)
 
 
-@dataclasses.dataclass
+@_detection_dataclass
 class VideoTrack:
     start_frame: int
     stop_frame: int
@@ -48,7 +59,7 @@ class VideoTrack:
     detection_properties: Dict[str, str] = dataclasses.field(default_factory=dict)
 
 
-@dataclasses.dataclass
+@_detection_dataclass
 class AudioTrack:
     start_time: int
     stop_time: int
@@ -56,7 +67,7 @@ class AudioTrack:
     detection_properties: Dict[str, str] = dataclasses.field(default_factory=dict)
 
 
-@dataclasses.dataclass
+@_detection_dataclass
 class GenericTrack:
     confidence: float = -1
     detection_properties: Dict[str, str] = dataclasses.field(default_factory=dict)
@@ -0,0 +1,83 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Compares the exact fast path AffineFrameTransformer uses for rotations that are multiples of 90 degrees
+# with the cv2.warpAffine call that was previously used for every rotation.
+#
+# Usage: python bench_affine_transformer.py [width] [height]
+
+import sys
+
+import cv2
+import numpy as np
+
+from mpf_component_util import utils
+from mpf_component_util.frame_transformers import NoOpTransformer, SearchRegion
+from mpf_component_util.frame_transformers.affine_frame_transformer import AffineFrameTransformer
+
+import bench_util
+
+
+CASES = (
+    ('ROTATION=90', 90, False),
+    ('ROTATION=180', 180, False),
+    ('ROTATION=270', 270, False),
+    ('HORIZONTAL_FLIP', 0, True),
+    ('ROTATION=90 + HORIZONTAL_FLIP', 90, True),
+)
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 1920
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 1080
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame_size = utils.Size(width, height)
+
+    rows = []
+    for name, rotation, flip in CASES:
+        transformer = AffineFrameTransformer.search_region_on_rotated_frame(
+            rotation, flip, (0, 0, 0), SearchRegion(), NoOpTransformer(frame_size))
+        transformation = transformer._AffineFrameTransformer__transform
+
+        def warp_affine():
+            return cv2.warpAffine(frame, transformation.reverse_transformation_matrix,
+                                  transformation.get_region_size(), flags=cv2.WARP_INVERSE_MAP | cv2.INTER_CUBIC,
+                                  borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0))
+
+        def fast_path():
+            return transformer.transform_frame(frame, 0)
+
+        assert np.array_equal(warp_affine(), fast_path())
+        warp_ms = bench_util.time_per_call_ms(warp_affine)
+        fast_ms = bench_util.time_per_call_ms(fast_path)
+        rows.append((name, warp_ms, fast_ms, f'{warp_ms / fast_ms:.1f}x'))
+
+    print(f'Frame size: {width}x{height}, OpenCV {cv2.__version__}')
+    bench_util.print_table(('Transform', 'warpAffine (ms)', 'Fast path (ms)', 'Speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
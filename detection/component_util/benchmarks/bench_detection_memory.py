@@ -0,0 +1,84 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Measures the memory used by mpf.ImageLocation and mpf.VideoTrack objects and how long it takes to create them.
+# The classes in mpf_component_api use __slots__ when running on Python 3.10 or newer. They are compared with
+# equivalent dataclasses that use a per-instance __dict__.
+#
+# Usage: python bench_detection_memory.py [num_detections]
+
+import dataclasses
+import sys
+import tracemalloc
+
+import mpf_component_api as mpf
+
+import bench_util
+
+
+def make_dict_based(cls):
+    fields = [(f.name, f.type, f) for f in dataclasses.fields(cls)]
+    return dataclasses.make_dataclass('Dict' + cls.__name__, fields)
+
+
+DictImageLocation = make_dict_based(mpf.ImageLocation)
+DictVideoTrack = make_dict_based(mpf.VideoTrack)
+
+
+def create_track(num_detections, image_location_cls, video_track_cls):
+    return video_track_cls(0, num_detections - 1, frame_locations={
+        i: image_location_cls(i, i, 10, 10, 0.5) for i in range(num_detections)})
+
+
+def measure(num_detections, image_location_cls, video_track_cls):
+    tracemalloc.start()
+    track = create_track(num_detections, image_location_cls, video_track_cls)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del track
+    # tracemalloc slows down allocation, so the timing is repeated without it.
+    create_ms = bench_util.time_per_call_ms(lambda: create_track(num_detections, image_location_cls,
+                                                                 video_track_cls), repeat=3)
+    return memory / num_detections, create_ms
+
+
+def main():
+    num_detections = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    uses_slots = not hasattr(mpf.ImageLocation(0, 0, 0, 0), '__dict__')
+    dict_bytes, dict_ms = measure(num_detections, DictImageLocation, DictVideoTrack)
+    slots_bytes, slots_ms = measure(num_detections, mpf.ImageLocation, mpf.VideoTrack)
+
+    print(f'{num_detections} detections in a single track, Python {sys.version.split()[0]}, '
+          f'mpf_component_api uses __slots__: {uses_slots}')
+    bench_util.print_table(
+        ('Classes', 'Bytes per detection', 'Create track (ms)'),
+        (('__dict__', dict_bytes, dict_ms),
+         ('mpf_component_api', slots_bytes, slots_ms),
+         ('Reduction', f'{1 - slots_bytes / dict_bytes:.0%}', f'{1 - slots_ms / dict_ms:.0%}')))
+
+
+if __name__ == '__main__':
+    main()
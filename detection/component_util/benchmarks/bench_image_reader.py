@@ -0,0 +1,68 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Measures the time it takes to decode a still image using the path ImageReader selects for the format and using
+# the cv2.VideoCapture path that was previously used for all images. Synthetic JPEG, PNG, and TIFF images of
+# several sizes are written to a temporary directory before timing.
+#
+# Usage: python bench_image_reader.py
+
+import os
+import tempfile
+
+import cv2
+
+from mpf_component_util import image_reader
+
+import bench_util
+from bench_interpolation import create_test_frame
+
+
+SIZES = ((320, 240), (1280, 720), (1920, 1080), (3840, 2160))
+
+EXTENSIONS = ('.jpg', '.png', '.tif')
+
+
+def main():
+    rows = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for extension in EXTENSIONS:
+            for width, height in SIZES:
+                path = os.path.join(temp_dir, f'{width}x{height}{extension}')
+                cv2.imwrite(path, create_test_frame(width, height))
+
+                video_capture_ms = bench_util.time_per_call_ms(
+                    lambda: image_reader._read_with_video_capture(path))
+                image_codec_ms = bench_util.time_per_call_ms(lambda: image_reader._read_image(path))
+                rows.append((extension[1:].upper(), f'{width}x{height}', video_capture_ms, image_codec_ms,
+                             video_capture_ms / image_codec_ms))
+
+    print(f'OpenCV {cv2.__version__}')
+    bench_util.print_table(('Format', 'Size', 'VideoCapture (ms)', 'ImageReader (ms)', 'Speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
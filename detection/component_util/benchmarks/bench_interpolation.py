@@ -0,0 +1,108 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Compares the speed and quality of the interpolation methods that can be selected with the
+# ROTATION_INTERPOLATION job property. Quality is measured by transforming a synthetic frame, transforming
+# it back with the same interpolation method, and then computing the PSNR against the original frame.
+# Higher PSNR is better. Frames that are rotated by a multiple of 90 degrees do not use interpolation.
+#
+# Usage: python bench_interpolation.py [rotation] [width] [height]
+
+import sys
+
+import cv2
+import numpy as np
+
+from mpf_component_util import utils
+from mpf_component_util.frame_transformers import NoOpTransformer
+from mpf_component_util.frame_transformers.frame_resizer import FrameResizer
+from mpf_component_util.frame_transformers.affine_frame_transformer import AffineFrameTransformer
+
+import bench_util
+
+
+INTERPOLATIONS = (
+    ('NEAREST', cv2.INTER_NEAREST),
+    ('LINEAR', cv2.INTER_LINEAR),
+    ('CUBIC', cv2.INTER_CUBIC),
+    ('AREA', cv2.INTER_AREA),
+)
+
+
+def main():
+    rotation = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 1920
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else 1080
+    frame = create_test_frame(width, height)
+    frame_size = utils.Size(width, height)
+
+    rows = []
+    for name, interpolation in INTERPOLATIONS:
+        rotator = AffineFrameTransformer.rotate_full_frame(
+            rotation, False, (0, 0, 0), NoOpTransformer(frame_size), interpolation=interpolation)
+        rotate_ms = bench_util.time_per_call_ms(lambda: rotator.transform_frame(frame, 0))
+        rotate_psnr = get_rotation_round_trip_psnr(frame, rotator, interpolation)
+
+        resizer = FrameResizer(max(width, height) // 2, NoOpTransformer(frame_size), interpolation=interpolation)
+        resize_ms = bench_util.time_per_call_ms(lambda: resizer.transform_frame(frame, 0))
+        resized = resizer.transform_frame(frame, 0)
+        resize_psnr = cv2.PSNR(frame, cv2.resize(resized, frame_size, interpolation=interpolation))
+
+        rows.append((name, rotate_ms, 1000 / rotate_ms, rotate_psnr, resize_ms, 1000 / resize_ms, resize_psnr))
+
+    print(f'Frame size: {width}x{height}, rotation: {rotation}, OpenCV {cv2.__version__}')
+    bench_util.print_table(('ROTATION_INTERPOLATION', 'Rotate (ms)', 'Rotate (fps)', 'Rotate PSNR (dB)',
+                            'Resize 50% (ms)', 'Resize (fps)', 'Resize PSNR (dB)'), rows)
+
+
+def create_test_frame(width, height):
+    # Smoothed noise provides texture and the rectangles provide hard edges.
+    rng = np.random.default_rng(0)
+    frame = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (0, 0), 1.5)
+    for _ in range(50):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.rectangle(frame, (int(x), int(y)), (int(x) + width // 10, int(y) + height // 10), color, 3)
+    return frame
+
+
+def get_rotation_round_trip_psnr(frame, rotator, interpolation):
+    transformation = rotator._AffineFrameTransformer__transform
+    rotated = rotator.transform_frame(frame, 0)
+    # Map the rotated frame back on to the original frame's coordinate system.
+    forward_matrix = cv2.invertAffineTransform(transformation.reverse_transformation_matrix)
+    if interpolation == cv2.INTER_AREA:
+        # cv2.warpAffine uses INTER_LINEAR when INTER_AREA is requested.
+        interpolation = cv2.INTER_LINEAR
+    restored = cv2.warpAffine(rotated, forward_matrix, utils.Size.from_frame(frame),
+                              flags=cv2.WARP_INVERSE_MAP | interpolation)
+    # Ignore the edges because pixels near the edges are blended with the fill color.
+    margin = 8
+    return cv2.PSNR(frame[margin:-margin, margin:-margin], restored[margin:-margin, margin:-margin])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Measures repeated utils.get_property calls on a plain dict and on a JobProperties, which converts each
+# property once.
+#
+# Usage: python bench_job_properties.py
+
+from mpf_component_util import utils
+
+import bench_util
+
+
+PROPERTIES = dict(CONFIDENCE_THRESHOLD='0.5', MAX_DETECTIONS='100', USE_GPU='true', MODEL_NAME='yolo')
+
+
+def read_properties(props):
+    utils.get_property(props, 'CONFIDENCE_THRESHOLD', 0.0)
+    utils.get_property(props, 'MAX_DETECTIONS', 0)
+    utils.get_property(props, 'USE_GPU', False)
+    utils.get_property(props, 'MODEL_NAME', '')
+    utils.get_property(props, 'MISSING', -1)
+
+
+def main():
+    job_properties = utils.JobProperties(PROPERTIES)
+    rows = []
+    for name, props in (('dict', PROPERTIES), ('JobProperties', job_properties)):
+        ms = bench_util.time_per_call_ms(lambda: read_properties(props))
+        rows.append((name, f'{ms * 1000:.2f}'))
+    bench_util.print_table(('Properties', 'µs per 5 reads'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Compares rotating a frame and then letterboxing it to a model's input size in two separate steps with doing
+# both in a single warp, which is what the frame transformer factory does when MODEL_INPUT_WIDTH and
+# MODEL_INPUT_HEIGHT are set along with ROTATION.
+#
+# Usage: python bench_model_input.py [rotation] [model_input_size]
+
+import sys
+
+import cv2
+
+from mpf_component_util import utils
+from mpf_component_util.frame_transformers import NoOpTransformer
+from mpf_component_util.frame_transformers.affine_frame_transformer import AffineFrameTransformer
+from mpf_component_util.frame_transformers.frame_resizer import ModelInputResizer, ModelInputSize
+
+import bench_util
+from bench_interpolation import create_test_frame
+
+
+def main():
+    rotation = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    model_input_dimension = int(sys.argv[2]) if len(sys.argv) > 2 else 640
+    model_input_size = ModelInputSize(model_input_dimension, model_input_dimension, letterbox=True)
+
+    rows = []
+    for width, height in ((1280, 720), (1920, 1080), (3840, 2160)):
+        frame = create_test_frame(width, height)
+        frame_size = utils.Size(width, height)
+
+        two_steps = ModelInputResizer(
+            model_input_size, (0, 0, 0),
+            AffineFrameTransformer.rotate_full_frame(rotation, False, (0, 0, 0), NoOpTransformer(frame_size)))
+        single_warp = AffineFrameTransformer.rotate_full_frame(rotation, False, (0, 0, 0),
+                                                               NoOpTransformer(frame_size),
+                                                               model_input_size=model_input_size)
+        two_steps_ms = bench_util.time_per_call_ms(lambda: two_steps.transform_frame(frame, 0))
+        single_warp_ms = bench_util.time_per_call_ms(lambda: single_warp.transform_frame(frame, 0))
+        rows.append((f'{width}x{height}', two_steps_ms, single_warp_ms, two_steps_ms / single_warp_ms))
+
+    print(f'Rotation: {rotation}, model input: {model_input_dimension}x{model_input_dimension} letterboxed, '
+          f'OpenCV {cv2.__version__}')
+    bench_util.print_table(('Frame size', 'Rotate then resize (ms)', 'Single warp (ms)', 'Speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
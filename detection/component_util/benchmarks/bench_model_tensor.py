@@ -0,0 +1,69 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Compares converting a BGR frame to a normalized float32 RGB CHW tensor with separate OpenCV and NumPy calls
+# against ModelTensorConverter writing in to a pooled buffer.
+#
+# Usage: python bench_model_tensor.py
+
+import cv2
+import numpy as np
+
+from mpf_component_util import FramePool, utils
+from mpf_component_util.frame_transformers import NoOpTransformer
+from mpf_component_util.frame_transformers.model_tensor_converter import ModelTensorConverter, ModelTensorFormat
+
+import bench_util
+from bench_interpolation import create_test_frame
+
+
+# ImageNet mean and standard deviation
+MEAN = (123.675, 116.28, 103.53)
+STD = (58.395, 57.12, 57.375)
+
+
+def main():
+    rows = []
+    for width, height in ((640, 640), (1280, 720), (1920, 1080)):
+        frame = create_test_frame(width, height)
+        converter = ModelTensorConverter(ModelTensorFormat('RGB', np.dtype(np.float32), MEAN, STD, 'CHW'),
+                                         NoOpTransformer(utils.Size(width, height)), FramePool(2))
+        separate_ms = bench_util.time_per_call_ms(lambda: convert_separately(frame))
+        converter_ms = bench_util.time_per_call_ms(lambda: converter.transform_frame(frame, 0))
+        rows.append((f'{width}x{height}', separate_ms, converter_ms, separate_ms / converter_ms))
+
+    print(f'BGR uint8 HWC to normalized RGB float32 CHW, OpenCV {cv2.__version__}, NumPy {np.__version__}')
+    bench_util.print_table(('Frame size', 'Separate steps (ms)', 'ModelTensorConverter (ms)', 'Speedup'), rows)
+
+
+def convert_separately(frame):
+    tensor = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).astype(np.float32)
+    tensor = (tensor - np.array(MEAN, dtype=np.float32)) / np.array(STD, dtype=np.float32)
+    return np.ascontiguousarray(tensor.transpose(2, 0, 1))
+
+
+if __name__ == '__main__':
+    main()
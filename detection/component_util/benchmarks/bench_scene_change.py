@@ -0,0 +1,56 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Measures how long SceneChangeFrameFilter takes to decide whether to skip a frame. The decision is made for every
+# decoded frame, so it needs to be much cheaper than running a model on the frame.
+#
+# Usage: python bench_scene_change.py
+
+import itertools
+
+from mpf_component_util.frame_filters import IntervalFrameFilter, SceneChangeFrameFilter
+
+import bench_interpolation
+import bench_util
+
+
+FRAME_SIZES = ((640, 480), (1920, 1080), (3840, 2160))
+
+
+def main():
+    rows = []
+    for width, height in FRAME_SIZES:
+        frame = bench_interpolation.create_test_frame(width, height)
+        # Every frame is identical to the first one, so all of them after the first are skipped.
+        frame_filter = SceneChangeFrameFilter(IntervalFrameFilter(0, 10 ** 9, 1), 0.1)
+        positions = itertools.count()
+        ms = bench_util.time_per_call_ms(lambda: frame_filter.accept_frame(frame, next(positions)))
+        rows.append((f'{width}x{height}', f'{ms:.3f}'))
+    bench_util.print_table(('Frame size', 'ms per frame'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Compares decoding a full tiled TIFF image and then cropping it to a search region with only decoding the tiles
+# that intersect the search region. Requires the optional tifffile package.
+#
+# Usage: python bench_tiff_region.py [image_size] [search_region_size]
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+import tifffile
+
+import mpf_component_api as mpf
+from mpf_component_util import image_reader, ImageReader
+
+import bench_util
+
+
+def main():
+    image_size = int(sys.argv[1]) if len(sys.argv) > 1 else 8192
+    region_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+
+    rows = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'image.tif')
+        write_test_image(path, image_size)
+        for compression in ('none', 'zlib'):
+            if compression != 'none':
+                tifffile.imwrite(path, tifffile.imread(path), tile=(256, 256), photometric='rgb',
+                                 compression=compression)
+            job = mpf.ImageJob('Bench Job', path, {
+                'SEARCH_REGION_ENABLE_DETECTION': 'true',
+                'SEARCH_REGION_TOP_LEFT_X_DETECTION': str(image_size // 3),
+                'SEARCH_REGION_TOP_LEFT_Y_DETECTION': str(image_size // 3),
+                'SEARCH_REGION_BOTTOM_RIGHT_X_DETECTION': str(image_size // 3 + region_size),
+                'SEARCH_REGION_BOTTOM_RIGHT_Y_DETECTION': str(image_size // 3 + region_size)
+            }, {}, None)
+
+            full_decode_ms = bench_util.time_per_call_ms(lambda: image_reader._read_image(path), repeat=3)
+            region_decode_ms = bench_util.time_per_call_ms(lambda: ImageReader(job), repeat=3)
+            rows.append((compression, full_decode_ms, region_decode_ms, full_decode_ms / region_decode_ms))
+
+    print(f'Image size: {image_size}x{image_size}, search region size: {region_size}x{region_size}, '
+          f'256x256 tiles, OpenCV {cv2.__version__}, tifffile {tifffile.__version__}')
+    bench_util.print_table(('Compression', 'Full decode (ms)', 'Region decode (ms)', 'Speedup'), rows)
+
+
+def write_test_image(path, image_size):
+    # Gradients compress similarly to natural images and are fast to generate.
+    gradient = np.linspace(0, 255, image_size, dtype=np.float32)
+    image = np.empty((image_size, image_size, 3), dtype=np.uint8)
+    image[..., 0] = gradient
+    image[..., 1] = gradient[:, np.newaxis]
+    image[..., 2] = (gradient + gradient[:, np.newaxis]) / 2
+    tifffile.imwrite(path, image, tile=(256, 256), photometric='rgb')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+# Measures the per-job cost of frame_transformer_factory.get_transformer when jobs share the same transformation
+# properties and frame size, with and without the transformer chain cache.
+#
+# Usage: python bench_transformer_factory.py
+
+import mpf_component_api as mpf
+from mpf_component_util import utils
+from mpf_component_util.frame_transformers import frame_transformer_factory
+
+import bench_util
+
+
+JOB_PROPERTIES = (
+    ('No transformation', {}),
+    ('Search region', dict(SEARCH_REGION_ENABLE_DETECTION='true', SEARCH_REGION_TOP_LEFT_X_DETECTION='10%',
+                           SEARCH_REGION_BOTTOM_RIGHT_Y_DETECTION='500')),
+    ('Rotation 90', dict(ROTATION='90')),
+    ('Rotation 20, flip', dict(ROTATION='20', HORIZONTAL_FLIP='true', ROTATION_FILL_COLOR='WHITE')),
+    ('Rotation 20, letterbox', dict(ROTATION='20', MODEL_INPUT_WIDTH='640', MODEL_INPUT_HEIGHT='640',
+                                    LETTERBOX='true', MODEL_INPUT_LAYOUT='CHW')),
+)
+
+
+def main():
+    frame_size = utils.Size(1920, 1080)
+    rows = []
+    for name, job_properties in JOB_PROPERTIES:
+        job = mpf.ImageJob('Bench Job', 'image.png', dict(job_properties, CONFIDENCE_THRESHOLD='0.5'),
+                           dict(MIME_TYPE='image/png'))
+        uncached_us = 1000 * bench_util.time_per_call_ms(
+            lambda: frame_transformer_factory._get_transformer(job, frame_size, dict(), dict(), None))
+        cached_us = 1000 * bench_util.time_per_call_ms(
+            lambda: frame_transformer_factory.get_transformer(job, frame_size))
+        rows.append((name, uncached_us, cached_us, uncached_us / cached_us))
+
+    bench_util.print_table(('Job properties', 'Uncached (us)', 'Cached (us)', 'Speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import timeit
+from typing import Any, Callable, Sequence
+
+
+def time_per_call_ms(func: Callable[[], Any], min_duration_s: float = 0.5, repeat: int = 5) -> float:
+    """
+    :param func: Function to time
+    :param min_duration_s: Approximate minimum duration of each timing run
+    :param repeat: Number of timing runs
+    :return: Milliseconds per call in the fastest run
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_duration_s / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> None:
+    """
+    Prints rows as a Markdown table so that results can be pasted in to pull requests.
+    """
+    str_rows = [[_format_cell(c) for c in row] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in str_rows)) for i, h in enumerate(headers)]
+    print('| ' + ' | '.join(h.ljust(w) for h, w in zip(headers, widths)) + ' |')
+    print('|' + '|'.join('-' * (w + 2) for w in widths) + '|')
+    for row, str_row in zip(rows, str_rows):
+        # Numbers are right aligned so that the decimal points line up.
+        cells = (s.rjust(w) if isinstance(v, (int, float)) else s.ljust(w)
+                 for v, s, w in zip(row, str_row, widths))
+        print('| ' + ' | '.join(cells) + ' |')
+
+
+def _format_cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f'{value:.3f}'
+    return str(value)
@@ -24,10 +24,14 @@
 # limitations under the License.                                            #
 #############################################################################
 
-from .image_reader import ImageReader, ImageReaderMixin
+from .image_reader import ImageReader, ImageReaderMixin, read_images
 
 from .video_capture import VideoCapture, VideoCaptureMixin
 
+from .frame_pool import FramePool
+
+from .columnar_video_track import ColumnarVideoTrack
+
 from .audio_transcoder import transcode_to_wav
 
 from .models_ini_parser import (
@@ -0,0 +1,296 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+from __future__ import annotations
+
+import collections.abc
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+import mpf_component_api as mpf
+
+from .frame_transformers.image_location_batch import ImageLocationBatch
+
+
+class ColumnarVideoTrack(object):
+    """
+    Memory efficient alternative to mpf.VideoTrack for tracks with a large number of detections. Instead of a
+    dict of ImageLocation objects, the frame indices, bounding boxes, and confidences are stored in NumPy arrays.
+    Each distinct set of detection properties is only stored once. The frame_locations property provides a
+    read-only mpf.VideoTrack compatible view, and to_video_track and from_video_track convert between the two
+    representations. VideoCapture.reverse_transform and VideoCaptureMixin accept either representation.
+    """
+
+    def __init__(self, start_frame: int, stop_frame: int, confidence: float = -1,
+                 detection_properties: Optional[Dict[str, str]] = None, initial_capacity: int = 16):
+        self.start_frame = start_frame
+        self.stop_frame = stop_frame
+        self.confidence = confidence
+        self.detection_properties = detection_properties if detection_properties is not None else dict()
+
+        self.__size = 0
+        capacity = max(1, initial_capacity)
+        self.__frame_indices = np.empty(capacity, dtype=np.int64)
+        # Columns are x_left_upper, y_left_upper, width, height.
+        self.__boxes = np.empty((capacity, 4), dtype=np.int32)
+        self.__confidences = np.empty(capacity, dtype=np.float64)
+        self.__property_set_ids = np.empty(capacity, dtype=np.int32)
+
+        self.__property_sets: List[Dict[str, str]] = []
+        self.__property_set_lookup: Dict[FrozenSet[Tuple[str, str]], int] = dict()
+
+
+    @staticmethod
+    def from_arrays(start_frame: int, stop_frame: int, frame_indices, boxes, confidences,
+                    confidence: float = -1,
+                    detection_properties: Optional[Dict[str, str]] = None) -> ColumnarVideoTrack:
+        """
+        Creates a track whose image locations do not have any detection properties.
+
+        :param start_frame: The track's start frame
+        :param stop_frame: The track's stop frame
+        :param frame_indices: Sequence containing the frame index of each detection
+        :param boxes: Sequence with a (x_left_upper, y_left_upper, width, height) row for each detection
+        :param confidences: Sequence containing the confidence of each detection
+        :param confidence: The track's confidence
+        :param detection_properties: The track's detection properties
+        :return: The new track
+        """
+        frame_indices = np.asarray(frame_indices, dtype=np.int64)
+        track = ColumnarVideoTrack(start_frame, stop_frame, confidence, detection_properties, len(frame_indices))
+        track.__append_rows(frame_indices, np.asarray(boxes, dtype=np.int32).reshape(-1, 4),
+                            np.asarray(confidences, dtype=np.float64),
+                            np.full(len(frame_indices), track.__intern({}), dtype=np.int32))
+        return track
+
+
+    @staticmethod
+    def from_video_track(video_track: mpf.VideoTrack) -> ColumnarVideoTrack:
+        frame_locations = video_track.frame_locations
+        track = ColumnarVideoTrack(video_track.start_frame, video_track.stop_frame, video_track.confidence,
+                                   dict(video_track.detection_properties), len(frame_locations))
+        for frame_index, image_location in frame_locations.items():
+            track.add_image_location(frame_index, image_location)
+        return track
+
+
+    def to_video_track(self) -> mpf.VideoTrack:
+        return mpf.VideoTrack(self.start_frame, self.stop_frame, self.confidence, dict(self.frame_locations),
+                              dict(self.detection_properties))
+
+
+    def add_detection(self, frame_index: int, x_left_upper: int, y_left_upper: int, width: int, height: int,
+                      confidence: float = -1, detection_properties: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Adds a detection to the track. Like the keys of mpf.VideoTrack.frame_locations, each frame index
+        should only be added once.
+        """
+        if self.__size == len(self.__frame_indices):
+            self.__grow(self.__size + 1)
+        row = self.__size
+        self.__frame_indices[row] = frame_index
+        self.__boxes[row] = (x_left_upper, y_left_upper, width, height)
+        self.__confidences[row] = confidence
+        self.__property_set_ids[row] = self.__intern(detection_properties or {})
+        self.__size += 1
+
+
+    def add_image_location(self, frame_index: int, image_location: mpf.ImageLocation) -> None:
+        self.add_detection(frame_index, image_location.x_left_upper, image_location.y_left_upper,
+                           image_location.width, image_location.height, image_location.confidence,
+                           image_location.detection_properties)
+
+
+    def __len__(self):
+        return self.__size
+
+
+    @property
+    def frame_indices(self) -> np.ndarray:
+        return self.__read_only(self.__frame_indices[:self.__size])
+
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """
+        :return: Array with a (x_left_upper, y_left_upper, width, height) row for each detection
+        """
+        return self.__read_only(self.__boxes[:self.__size])
+
+
+    @property
+    def confidences(self) -> np.ndarray:
+        return self.__read_only(self.__confidences[:self.__size])
+
+
+    def get_detection_properties(self, row: int) -> Dict[str, str]:
+        """
+        :param row: Index of the detection in the order it was added
+        :return: A copy of the detection's properties
+        """
+        if not 0 <= row < self.__size:
+            raise IndexError(f'Row {row} is out of range for track with {self.__size} detections.')
+        return dict(self.__property_sets[self.__property_set_ids[row]])
+
+
+    @property
+    def frame_locations(self) -> Mapping[int, mpf.ImageLocation]:
+        """
+        :return: Read-only mapping from frame index to ImageLocation. The ImageLocation objects are created
+                 when they are accessed, so modifying them does not modify the track.
+        """
+        return _FrameLocationsView(self)
+
+
+    def get_image_location(self, row: int) -> mpf.ImageLocation:
+        x, y, width, height = self.__boxes[row].tolist()
+        return mpf.ImageLocation(x, y, width, height, float(self.__confidences[row]),
+                                 self.get_detection_properties(row))
+
+
+    def to_image_location_batch(self) -> ImageLocationBatch:
+        boxes = self.__boxes[:self.__size].astype(np.int64)
+        # Rows with the same properties share a dict, so the batch only copies each distinct dict once.
+        return ImageLocationBatch(
+            self.__frame_indices[:self.__size].copy(), boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3],
+            self.__confidences[:self.__size].copy(),
+            [self.__property_sets[i] for i in self.__property_set_ids[:self.__size].tolist()])
+
+
+    def update_from_image_location_batch(self, batch: ImageLocationBatch, frame_indices: np.ndarray) -> None:
+        """
+        Replaces the track's detections with the contents of the batch.
+
+        :param batch: Batch that was created with to_image_location_batch and then modified
+        :param frame_indices: The new frame index of each row of the batch
+        """
+        self.__size = 0
+        self.__property_sets = []
+        self.__property_set_lookup = dict()
+        # Most rows share a dict with other rows, so each distinct dict only needs to be interned once.
+        interned_ids: Dict[int, int] = dict()
+        property_set_ids = np.empty(len(batch), dtype=np.int32)
+        for row, properties in enumerate(batch.detection_properties):
+            set_id = interned_ids.get(id(properties))
+            if set_id is None:
+                set_id = interned_ids[id(properties)] = self.__intern(properties)
+            property_set_ids[row] = set_id
+        boxes = np.column_stack((batch.x, batch.y, batch.width, batch.height)).astype(np.int32)
+        self.__append_rows(np.asarray(frame_indices, dtype=np.int64), boxes, batch.confidence, property_set_ids)
+
+
+    def __intern(self, properties: Mapping[str, str]) -> int:
+        key = frozenset(properties.items())
+        set_id = self.__property_set_lookup.get(key)
+        if set_id is None:
+            set_id = self.__property_set_lookup[key] = len(self.__property_sets)
+            self.__property_sets.append(dict(properties))
+        return set_id
+
+
+    def __append_rows(self, frame_indices: np.ndarray, boxes: np.ndarray, confidences: np.ndarray,
+                      property_set_ids: np.ndarray) -> None:
+        new_size = self.__size + len(frame_indices)
+        if new_size > len(self.__frame_indices):
+            self.__grow(new_size)
+        rows = slice(self.__size, new_size)
+        self.__frame_indices[rows] = frame_indices
+        self.__boxes[rows] = boxes
+        self.__confidences[rows] = confidences
+        self.__property_set_ids[rows] = property_set_ids
+        self.__size = new_size
+
+
+    def __grow(self, min_capacity: int) -> None:
+        # Doubling the capacity makes adding detections one at a time amortized O(1).
+        capacity = max(min_capacity, 2 * len(self.__frame_indices))
+        self.__frame_indices = self.__resized(self.__frame_indices, capacity)
+        self.__boxes = self.__resized(self.__boxes, capacity)
+        self.__confidences = self.__resized(self.__confidences, capacity)
+        self.__property_set_ids = self.__resized(self.__property_set_ids, capacity)
+
+
+    def __resized(self, array: np.ndarray, capacity: int) -> np.ndarray:
+        new_array = np.empty((capacity, *array.shape[1:]), dtype=array.dtype)
+        new_array[:self.__size] = array[:self.__size]
+        return new_array
+
+
+    @staticmethod
+    def __read_only(array: np.ndarray) -> np.ndarray:
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+
+
+class _FrameLocationsView(collections.abc.Mapping):
+    def __init__(self, track: ColumnarVideoTrack):
+        self.__track = track
+        self.__frame_indices = track.frame_indices
+        self.__rows_by_frame: Optional[Dict[int, int]] = None
+
+
+    def __getitem__(self, frame_index: int) -> mpf.ImageLocation:
+        if self.__rows_by_frame is None:
+            # Only built when needed, because iterating over the items does not require it.
+            self.__rows_by_frame = {f: row for row, f in enumerate(self.__frame_indices.tolist())}
+        return self.__track.get_image_location(self.__rows_by_frame[frame_index])
+
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.__frame_indices.tolist())
+
+
+    def __len__(self) -> int:
+        return len(self.__frame_indices)
+
+
+    def items(self):
+        return _FrameLocationsItemsView(self)
+
+
+    def values(self):
+        return _FrameLocationsValuesView(self)
+
+
+    def get_row_items(self) -> Iterator[Tuple[int, mpf.ImageLocation]]:
+        # Faster than the default implementation of items(), which would need to look up each frame index.
+        for row, frame_index in enumerate(self.__frame_indices.tolist()):
+            yield frame_index, self.__track.get_image_location(row)
+
+
+
+class _FrameLocationsItemsView(collections.abc.ItemsView):
+    def __iter__(self):
+        return self._mapping.get_row_items()
+
+
+
+class _FrameLocationsValuesView(collections.abc.ValuesView):
+    def __iter__(self):
+        return (image_location for _, image_location in self._mapping.get_row_items())
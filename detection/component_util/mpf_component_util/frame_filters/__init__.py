@@ -26,7 +26,9 @@
 
 from .interval_frame_filter import IntervalFrameFilter
 from .frame_list_filters import FeedForwardFrameFilter, KeyFrameFilter
-from .seek_strategies import SetFramePositionSeek, GrabSeek
+from .key_frame_index import KeyFrameIndex
+from .scene_change_frame_filter import SceneChangeFrameFilter
+from .seek_strategies import SetFramePositionSeek, GrabSeek, KeyFrameSeek
 
 
 def get_no_op_filter(frame_count):
@@ -26,6 +26,8 @@
 
 import abc
 
+import numpy as np
+
 
 class FrameFilter(abc.ABC):
 
@@ -40,6 +42,30 @@ class FrameFilter(abc.ABC):
         raise NotImplementedError()
 
 
+    def segment_to_original_frame_positions(self, segment_positions: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of segment_to_original_frame_position. Subclasses should override this method
+        when the mapping can be done with NumPy operations.
+
+        :param segment_positions: Array of frame positions within the segment
+        :return: Array containing the matching frame positions in the original video
+        """
+        return np.array([self.segment_to_original_frame_position(p) for p in segment_positions.tolist()],
+                        dtype=np.int64)
+
+
+    def accept_frame(self, frame: np.ndarray, original_position: int) -> bool:
+        """
+        Called with each decoded frame before it is given to the caller. Filters that decide which frames to skip
+        based on the frame's content override this method. A skipped frame does not get a segment position.
+
+        :param frame: The decoded frame, before any frame transformations are applied
+        :param original_position: Position of the frame in the original video
+        :return: True if the frame should be given to the caller
+        """
+        return True
+
+
     @abc.abstractmethod
     def original_to_segment_frame_position(self, original_position):
         """
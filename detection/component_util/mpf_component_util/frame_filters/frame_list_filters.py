@@ -27,9 +27,14 @@
 import bisect
 import subprocess
 import sys
+import time
 from typing import List
 
+import numpy as np
+
 from . import frame_filter
+from .key_frame_index import get_ffprobe_error_message
+from .. import media_cache
 from .. import utils
 
 
@@ -49,6 +54,15 @@ class _FrameListFilter(frame_filter.FrameFilter):
                 'but the maximum segment position is %s' % (segment_position, self.get_segment_frame_count() - 1))
 
 
+    def segment_to_original_frame_positions(self, segment_positions):
+        frame_count = self.get_segment_frame_count()
+        out_of_range = (segment_positions >= frame_count) | (segment_positions < -frame_count)
+        if np.any(out_of_range):
+            # Use the scalar version to raise the exception.
+            self.segment_to_original_frame_position(int(segment_positions[out_of_range][0]))
+        return np.asarray(self.__frames_to_show, dtype=np.int64)[segment_positions]
+
+
     def original_to_segment_frame_position(self, original_position):
         return bisect.bisect_left(self.__frames_to_show, original_position)
 
@@ -82,16 +96,46 @@ class KeyFrameFilter(_FrameListFilter):
 
     @staticmethod
     def get_key_frames(video_job):
+        """
+        :param video_job: The job to get key frames for
+        :return: The key frames between the job's start and stop frames, only including every n-th key frame
+                 when FRAME_INTERVAL is n.
+        """
+        stop_frame = video_job.stop_frame
+        if stop_frame < 0:
+            stop_frame = float('inf')
+
+        # The default PACKET mode reads the key frame flags from the video's packets. FRAME mode decodes every
+        # frame, which is much slower, but may be useful when the packet flags are not reliable.
+        probe_mode = utils.get_property(video_job.job_properties, 'KEY_FRAME_PROBE_MODE', 'PACKET').upper()
+        probe_start_time = time.perf_counter()
+        all_key_frames = None
+        if probe_mode != 'FRAME':
+            max_frames = None if stop_frame == float('inf') else stop_frame + 1
+            try:
+                all_key_frames = media_cache.get_key_frame_index(
+                    video_job.data_uri, video_job.job_properties, max_frames).key_frames
+            except ValueError as err:
+                # Some formats, like raw H.264 streams, do not store presentation timestamps in their packets.
+                print('Unable to get key frames from packets due to:', err, file=sys.stderr)
+                print('Falling back to FRAME mode', file=sys.stderr)
+                probe_mode = 'FRAME'
+        if all_key_frames is None:
+            all_key_frames = KeyFrameFilter.__probe_decoded_key_frames(video_job.data_uri, stop_frame)
+        print('Probing key frames for "%s" using %s mode took %.3f seconds.'
+              % (video_job.data_uri, probe_mode, time.perf_counter() - probe_start_time), file=sys.stderr)
+
+        frame_interval = max(1, utils.get_property(video_job.job_properties, 'FRAME_INTERVAL', 1))
+        key_frames_in_segment = [int(f) for f in all_key_frames if video_job.start_frame <= f <= stop_frame]
+        return key_frames_in_segment[::frame_interval]
+
+
+    @staticmethod
+    def __probe_decoded_key_frames(data_uri, stop_frame) -> List[int]:
         command = ('ffprobe', '-loglevel', 'warning', '-select_streams', 'v', '-show_entries', 'frame=key_frame',
-                   '-print_format', 'flat=h=0', video_job.data_uri)
+                   '-print_format', 'flat=h=0', data_uri)
         with subprocess.Popen(command, text=True, stdout=subprocess.PIPE) as proc:
             key_frames: List[int] = []
-            num_key_frames_seen = 0
-            frame_interval = max(1, utils.get_property(video_job.job_properties, 'FRAME_INTERVAL', 1))
-            stop_frame = video_job.stop_frame
-            if stop_frame < 0:
-                stop_frame = float('inf')
-
             for line in proc.stdout:
                 # Expected line format for key frame: frame.209.key_frame=1
                 # Expected line format for non-key frame: frame.210.key_frame=0
@@ -102,28 +146,14 @@ class KeyFrameFilter(_FrameListFilter):
 
                 line_parts = line.split('.')
                 frame_number = int(line_parts[1])
-                if frame_number < video_job.start_frame:
-                    continue
-
                 if frame_number > stop_frame:
                     proc.terminate()
                     return key_frames
 
-                if 'key_frame=1' not in line_parts[2]:
-                    continue
-
-                if num_key_frames_seen % frame_interval == 0:
+                if 'key_frame=1' in line_parts[2]:
                     key_frames.append(frame_number)
-                num_key_frames_seen += 1
 
             exit_code = proc.wait()
             if exit_code == 0:
                 return key_frames
-
-            error_msg = 'The ffprobe process '
-            if exit_code > 0:
-                error_msg += 'exited with exit code: %s.' % exit_code
-            else:
-                # When exit code is negative, it is the number of the signal that caused the process exit.
-                error_msg += 'exited due to signal number: %s.' % (-1 * exit_code)
-            raise ChildProcessError(error_msg)
+            raise ChildProcessError(get_ffprobe_error_message(exit_code))
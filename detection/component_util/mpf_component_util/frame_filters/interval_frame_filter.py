@@ -73,6 +73,10 @@ class IntervalFrameFilter(frame_filter.FrameFilter):
         return self.__frame_interval * segment_position + self.__start_frame
 
 
+    def segment_to_original_frame_positions(self, segment_positions):
+        return self.__frame_interval * segment_positions + self.__start_frame
+
+
     def original_to_segment_frame_position(self, original_position):
         return (original_position - self.__start_frame) // self.__frame_interval
 
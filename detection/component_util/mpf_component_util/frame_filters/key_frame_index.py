@@ -0,0 +1,193 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import bisect
+import fractions
+import subprocess
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class KeyFrameIndex(object):
+    """
+    The presentation time of every frame in a video and which of those frames are key frames. The index is
+    built from the video's packets, so no frames need to be decoded.
+    """
+
+    def __init__(self, frame_times_ms: np.ndarray, key_frames: np.ndarray):
+        """
+        :param frame_times_ms: Presentation time of each frame, relative to the start of the video stream.
+                               Must be sorted.
+        :param key_frames: Sorted indices of the key frames
+        """
+        self.__frame_times_ms = frame_times_ms
+        self.__key_frames = key_frames
+
+
+    # B-frames cause packets to be stored in a different order than they are presented. When only part of
+    # the video is probed, this many extra packets are read so that frames near the end of the requested
+    # range are numbered correctly.
+    MAX_REORDER_DEPTH = 32
+
+    @staticmethod
+    def from_media(media_path: str, max_frames: Optional[int] = None) -> 'KeyFrameIndex':
+        """
+        :param media_path: Path to the video
+        :param max_frames: When provided, only the first max_frames frames are indexed, and ffprobe is stopped
+                           shortly after reaching them.
+        :return: The index of the video's first video stream
+        """
+        time_base, start_pts = _probe_stream_timing(media_path)
+
+        command = ('ffprobe', '-loglevel', 'warning', '-select_streams', 'v:0', '-show_entries', 'packet=pts,flags',
+                   '-print_format', 'csv=p=0', media_path)
+        packet_limit = None if max_frames is None else max_frames + KeyFrameIndex.MAX_REORDER_DEPTH
+        packets: List[List[int]] = []
+        with subprocess.Popen(command, text=True, stdout=subprocess.PIPE) as proc:
+            for line in proc.stdout:
+                # Expected line format: <pts>,<flags>
+                pts, _, flags = line.rstrip().partition(',')
+                if 'D' in flags:
+                    # Discarded packets are not presented, so they do not have a frame number.
+                    continue
+                if pts == 'N/A':
+                    proc.terminate()
+                    raise ValueError(f'Unable to index "{media_path}" because it contains packets without a '
+                                     'presentation timestamp.')
+                packets.append([int(pts), 'K' in flags])
+                if packet_limit is not None and len(packets) >= packet_limit:
+                    proc.terminate()
+                    break
+            else:
+                exit_code = proc.wait()
+                if exit_code != 0:
+                    raise ChildProcessError(get_ffprobe_error_message(exit_code))
+
+        if not packets:
+            raise ValueError(f'Unable to index "{media_path}" because ffprobe did not report any video packets.')
+
+        # Packets are stored in decode order, but frame numbers are assigned in presentation order.
+        packet_array = np.array(packets, dtype=np.int64)
+        packet_array = packet_array[np.argsort(packet_array[:, 0], kind='stable')][:max_frames]
+        frame_times_ms = (packet_array[:, 0] - start_pts) * float(time_base * 1000)
+        key_frames = np.flatnonzero(packet_array[:, 1])
+        return KeyFrameIndex(frame_times_ms, key_frames)
+
+
+    # Format used when saving an index. Storing both fields in one array allows the index to be memory mapped.
+    _FILE_DTYPE = np.dtype([('time_ms', '<f8'), ('is_key_frame', '?')])
+
+    def save(self, file) -> None:
+        """
+        :param file: Path or file object to write the index to in .npy format
+        """
+        index_array = np.zeros(self.frame_count, dtype=KeyFrameIndex._FILE_DTYPE)
+        index_array['time_ms'] = self.__frame_times_ms
+        index_array['is_key_frame'][self.__key_frames] = True
+        np.save(file, index_array, allow_pickle=False)
+
+
+    @staticmethod
+    def load(path: str) -> 'KeyFrameIndex':
+        """
+        :param path: Path to an index created by KeyFrameIndex.save
+        :return: The loaded index. The frame times are memory mapped rather than read in to memory.
+        """
+        index_array = np.load(path, mmap_mode='r', allow_pickle=False)
+        if index_array.dtype != KeyFrameIndex._FILE_DTYPE:
+            raise ValueError(f'"{path}" does not contain a key frame index.')
+        return KeyFrameIndex(index_array['time_ms'], np.flatnonzero(index_array['is_key_frame']))
+
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.__frame_times_ms)
+
+
+    @property
+    def key_frames(self) -> np.ndarray:
+        return self.__key_frames
+
+
+    def get_frame_time_ms(self, frame: int) -> float:
+        return float(self.__frame_times_ms[frame])
+
+
+    def get_preceding_key_frames(self, frame: int, max_count: int) -> List[int]:
+        """
+        :param frame: Frame number to search from
+        :param max_count: Maximum number of key frames to return
+        :return: Key frames at or before frame, closest first
+        """
+        end = bisect.bisect_right(self.__key_frames, frame)
+        return [int(f) for f in self.__key_frames[max(0, end - max_count):end][::-1]]
+
+
+    def get_frame_at_time(self, time_ms: float) -> Optional[int]:
+        """
+        :param time_ms: Presentation time, relative to the start of the video stream
+        :return: The frame displayed at exactly time_ms, or None if time_ms is not close to any frame's
+                 presentation time
+        """
+        times = self.__frame_times_ms
+        idx = bisect.bisect_left(times, time_ms)
+        candidates = [i for i in (idx - 1, idx) if 0 <= i < len(times)]
+        if not candidates:
+            return None
+        frame = min(candidates, key=lambda i: abs(times[i] - time_ms))
+        # time_ms is expected to be a frame's exact presentation time, so only allow enough tolerance to
+        # account for rounding.
+        tolerance = min((abs(times[i] - times[frame]) / 4 for i in (frame - 1, frame + 1) if 0 <= i < len(times)),
+                        default=0.5)
+        if abs(times[frame] - time_ms) < tolerance:
+            return frame
+        return None
+
+
+
+def _probe_stream_timing(media_path: str) -> Tuple[fractions.Fraction, int]:
+    command = ('ffprobe', '-loglevel', 'warning', '-select_streams', 'v:0', '-show_entries',
+               'stream=time_base,start_pts', '-print_format', 'csv=p=0', media_path)
+    proc = subprocess.run(command, text=True, stdout=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise ChildProcessError(get_ffprobe_error_message(proc.returncode))
+    # Expected output format: <time_base>,<start_pts>
+    fields = proc.stdout.strip().split(',')
+    if len(fields) != 2:
+        raise ValueError(f'Unable to index "{media_path}" because ffprobe did not report a video stream.')
+    time_base, start_pts = fields
+    return fractions.Fraction(time_base), 0 if start_pts == 'N/A' else int(start_pts)
+
+
+def get_ffprobe_error_message(exit_code: int) -> str:
+    error_msg = 'The ffprobe process '
+    if exit_code > 0:
+        error_msg += 'exited with exit code: %s.' % exit_code
+    else:
+        # When exit code is negative, it is the number of the signal that caused the process exit.
+        error_msg += 'exited due to signal number: %s.' % (-1 * exit_code)
+    return error_msg
@@ -0,0 +1,177 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import bisect
+import threading
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from . import frame_filter
+from .. import utils
+
+
+class SceneChangeFrameFilter(frame_filter.FrameFilter):
+    """
+    Skips frames that are nearly identical to the last frame that was emitted. Since whether a frame is skipped
+    depends on its content, the decision is made while the video is being read. VideoCapture passes each decoded
+    frame to accept_frame, and the frames it accepts are numbered consecutively, so from the component's point
+    of view the skipped frames are not part of the segment.
+
+    Frames are compared using the mean absolute difference of small thumbnails, as a fraction of the maximum
+    pixel value. A frame is emitted when the difference is at least the threshold.
+
+    Frames that have not been read yet are assumed to be emitted, so the segment frame count is an upper bound
+    that decreases as frames are skipped.
+
+    When VideoCapture prefetches frames, accept_frame is called from the prefetch thread while the caller's thread
+    maps frame positions, so the filter's state is protected by a lock.
+    """
+
+    THUMBNAIL_SIZE = 32
+
+    def __init__(self, inner: frame_filter.FrameFilter, threshold: float):
+        """
+        :param inner: Filter that determines which frames are candidates to be emitted
+        :param threshold: Minimum difference, between 0 and 1, from the last emitted frame for a frame
+                          to be emitted
+        """
+        super(SceneChangeFrameFilter, self).__init__()
+        self.__inner = inner
+        self.__threshold = threshold
+        # Original positions of the emitted frames.
+        self.__emitted: List[int] = []
+        # Inner segment position of the first frame that has not been accepted or skipped.
+        self.__next_candidate = 0
+        self.__last_thumbnail: Optional[np.ndarray] = None
+        # Reentrant because is_past_end_of_segment calls the other locked methods.
+        self.__lock = threading.RLock()
+
+
+    @staticmethod
+    def from_job(job, inner: frame_filter.FrameFilter) -> frame_filter.FrameFilter:
+        """
+        :return: inner wrapped in a SceneChangeFrameFilter when the job's SCENE_CHANGE_THRESHOLD property
+                 is greater than 0, otherwise inner
+        """
+        threshold = utils.get_property(job.job_properties, 'SCENE_CHANGE_THRESHOLD', 0.0)
+        if threshold > 0:
+            return SceneChangeFrameFilter(inner, threshold)
+        return inner
+
+
+    def accept_frame(self, frame, original_position):
+        # The thumbnail does not depend on the filter's state, so it is created before acquiring the lock.
+        thumbnail = self.__get_thumbnail(frame)
+        with self.__lock:
+            return self.__accept_thumbnail(thumbnail, original_position)
+
+
+    def __accept_thumbnail(self, thumbnail, original_position):
+        inner_position = self.__inner.original_to_segment_frame_position(original_position)
+        if inner_position < self.__next_candidate:
+            # Initialization frames and frames that were already emitted, but are being read again because
+            # the frame position was changed.
+            return True
+
+        # When the frame position was moved forward, the frames in between were never read. They are kept in the
+        # segment because the caller may have already been given their segment positions.
+        self.__emitted.extend(self.__inner.segment_to_original_frame_position(p)
+                              for p in range(self.__next_candidate, inner_position))
+        self.__next_candidate = inner_position + 1
+
+        if self.__last_thumbnail is not None and self.__get_difference(thumbnail) < self.__threshold:
+            return False
+        self.__last_thumbnail = thumbnail
+        self.__emitted.append(original_position)
+        return True
+
+
+    @classmethod
+    def __get_thumbnail(cls, frame: np.ndarray) -> np.ndarray:
+        # Sampling every n-th pixel before resizing makes INTER_AREA much faster, while still averaging enough
+        # pixels that noise does not dominate the difference.
+        height, width = frame.shape[:2]
+        step = max(1, min(height, width) // (4 * cls.THUMBNAIL_SIZE))
+        size = (cls.THUMBNAIL_SIZE, cls.THUMBNAIL_SIZE)
+        return cv2.resize(frame[::step, ::step], size, interpolation=cv2.INTER_AREA)
+
+
+    def __get_difference(self, thumbnail: np.ndarray) -> float:
+        if thumbnail.shape != self.__last_thumbnail.shape:
+            return 1.0
+        return float(np.mean(cv2.absdiff(thumbnail, self.__last_thumbnail))) / 255
+
+
+    def segment_to_original_frame_position(self, segment_position):
+        if segment_position < 0:
+            return self.__inner.segment_to_original_frame_position(segment_position)
+        with self.__lock:
+            num_emitted = len(self.__emitted)
+            if segment_position < num_emitted:
+                return self.__emitted[segment_position]
+            return self.__inner.segment_to_original_frame_position(
+                self.__next_candidate + segment_position - num_emitted)
+
+
+    def segment_to_original_frame_positions(self, segment_positions):
+        with self.__lock:
+            num_emitted = len(self.__emitted)
+            is_emitted = (segment_positions >= 0) & (segment_positions < num_emitted)
+            if np.all(is_emitted):
+                return np.asarray(self.__emitted, dtype=np.int64)[segment_positions]
+            return super(SceneChangeFrameFilter, self).segment_to_original_frame_positions(segment_positions)
+
+
+    def original_to_segment_frame_position(self, original_position):
+        # A skipped frame maps to the segment position of the next emitted frame.
+        inner_position = self.__inner.original_to_segment_frame_position(original_position)
+        if inner_position < 0:
+            return inner_position
+        with self.__lock:
+            if inner_position >= self.__next_candidate:
+                return len(self.__emitted) + inner_position - self.__next_candidate
+            return bisect.bisect_left(self.__emitted, original_position)
+
+
+    def get_available_initialization_frame_count(self):
+        return self.__inner.get_available_initialization_frame_count()
+
+
+    def get_segment_frame_count(self):
+        with self.__lock:
+            return len(self.__emitted) + self.__inner.get_segment_frame_count() - self.__next_candidate
+
+
+    def is_past_end_of_segment(self, original_position):
+        # The frame count and the position of the last frame must come from the same state.
+        with self.__lock:
+            return super(SceneChangeFrameFilter, self).is_past_end_of_segment(original_position)
+
+
+    def get_segment_duration(self, original_frame_rate):
+        return self.__inner.get_segment_duration(original_frame_rate)
@@ -63,15 +63,21 @@ class _SequentialSeek(object):
     def change_position(cls, cv_video_cap, current_position, requested_position):
         new_position_in_future = requested_position > current_position
         if new_position_in_future:
-            start = current_position
+            return cls._advance_from(cv_video_cap, current_position, requested_position)
         else:
-            # The current position is past the requested position. We need to start reading from the very
-            # beginning of the video. If it were possible to set the frame position to a frame in the middle
-            #  of the video, then SetFramePositionSeek would not have failed.
-            if not cv_video_cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
-                return current_position
-            start = 0
+            return cls._rewind_and_advance(cv_video_cap, current_position, requested_position)
 
+    @classmethod
+    def _rewind_and_advance(cls, cv_video_cap, current_position, requested_position):
+        # The current position is past the requested position. We need to start reading from the very
+        # beginning of the video. If it were possible to set the frame position to a frame in the middle
+        #  of the video, then SetFramePositionSeek would not have failed.
+        if not cv_video_cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+            return current_position
+        return cls._advance_from(cv_video_cap, 0, requested_position)
+
+    @classmethod
+    def _advance_from(cls, cv_video_cap, start, requested_position):
         num_frames_to_discard = requested_position - start
 
         num_success = 0
@@ -100,6 +106,56 @@ class GrabSeek(_SequentialSeek):
         return ReadSeek()
 
 
+
+class KeyFrameSeek(GrabSeek):
+    # Seeks to a key frame at or before the requested frame and grabs forward from there, instead of
+    # grabbing forward from the beginning of the video like GrabSeek does when seeking backwards.
+    # OpenCV converts frame positions to timestamps using the average frame rate, so on variable frame rate
+    # video cv2.VideoCapture.set(cv2.CAP_PROP_POS_FRAMES, int) does not land on the requested frame.
+    # To work around that, the position OpenCV actually landed on is determined by looking up the timestamp
+    # of the first grabbed frame in the key frame index.
+
+    # Number of key frames to try seeking to before rewinding to the beginning of the video.
+    MAX_SEEK_ATTEMPTS = 3
+
+    def __init__(self, key_frame_index):
+        self.__key_frame_index = key_frame_index
+
+    def change_position(self, cv_video_cap, current_position, requested_position):
+        frame_diff = requested_position - current_position
+        if 0 < frame_diff <= SetFramePositionSeek.SET_POS_MIN_FRAMES:
+            return self._advance_from(cv_video_cap, current_position, requested_position)
+
+        key_frames = self.__key_frame_index.get_preceding_key_frames(requested_position, self.MAX_SEEK_ATTEMPTS)
+        if key_frames and key_frames[0] <= current_position < requested_position:
+            # Seeking would not skip any frames that grabbing from the current position would decode.
+            return self._advance_from(cv_video_cap, current_position, requested_position)
+
+        frame_rate = cv_video_cap.get(cv2.CAP_PROP_FPS)
+        for key_frame in key_frames:
+            landed_position = self.__seek_near(cv_video_cap, key_frame, frame_rate)
+            if landed_position is not None and landed_position < requested_position:
+                return self._advance_from(cv_video_cap, landed_position + 1, requested_position)
+
+        return self._rewind_and_advance(cv_video_cap, current_position, requested_position)
+
+    def __seek_near(self, cv_video_cap, key_frame, frame_rate):
+        if frame_rate <= 0:
+            return None
+        key_frame_time_ms = self.__key_frame_index.get_frame_time_ms(key_frame)
+        if not cv_video_cap.set(cv2.CAP_PROP_POS_FRAMES, round(key_frame_time_ms * frame_rate / 1000)):
+            return None
+        if not cv_video_cap.grab():
+            return None
+        return self.__key_frame_index.get_frame_at_time(cv_video_cap.get(cv2.CAP_PROP_POS_MSEC))
+
+    @staticmethod
+    def fallback():
+        print('KeyFrameSeek failed: falling back to GrabSeek', file=sys.stderr)
+        return GrabSeek()
+
+
+
 class ReadSeek(_SequentialSeek):
     @staticmethod
     def _advance(cv_video_cap):
@@ -0,0 +1,114 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import sys
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class FramePool(object):
+    """
+    A bounded pool of reusable frame buffers. A buffer is only handed out again after everything outside
+    of the pool has released it, which includes views of the buffer like the ones created when cropping.
+    This means callers do not need to explicitly return frames to the pool, they just need to stop
+    referencing them.
+
+    When all of the pooled buffers are in use and the pool is full, a new array is allocated but not added
+    to the pool. This keeps memory usage flat on long videos even if the caller holds on to frames.
+    """
+
+    def __init__(self, max_size: int):
+        self.__max_size = max_size
+        self.__buffers: List[np.ndarray] = []
+        # A pool may be used by both the VideoCapture prefetch thread and the caller's thread.
+        self.__lock = threading.Lock()
+
+
+    def get(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Gets an uninitialized array with the given shape and type.
+
+        :param shape: Shape of the requested array
+        :param dtype: Element type of the requested array
+        :return: An unused array from the pool or a newly allocated array
+        """
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        with self.__lock:
+            unused_mismatched_idx = None
+            for idx in range(len(self.__buffers)):
+                if _is_in_use(self.__buffers, idx):
+                    continue
+                if self.__buffers[idx].shape == shape and self.__buffers[idx].dtype == dtype:
+                    return self.__buffers[idx]
+                unused_mismatched_idx = idx
+
+            new_buffer = np.empty(shape, dtype=dtype)
+            if len(self.__buffers) < self.__max_size:
+                self.__buffers.append(new_buffer)
+            elif unused_mismatched_idx is not None:
+                # The frame size changed, so the old buffer is not likely to be used again.
+                self.__buffers[unused_mismatched_idx] = new_buffer
+            return new_buffer
+
+
+    def __len__(self) -> int:
+        return len(self.__buffers)
+
+
+
+def get_output_buffer(shape: Tuple[int, ...], dtype, dst: Optional[np.ndarray] = None,
+                      frame_pool: Optional[FramePool] = None) -> np.ndarray:
+    """
+    Gets the array that a frame transformation should write its output to.
+
+    :param shape: Shape of the output
+    :param dtype: Element type of the output
+    :param dst: Array provided by the caller. It is used when it has the requested shape and type.
+    :param frame_pool: Pool to get the array from when dst can not be used. When None, a new array is allocated.
+    :return: The array to write the output to
+    """
+    if dst is not None and dst.shape == tuple(shape) and dst.dtype == dtype:
+        return dst
+    if frame_pool is None:
+        return np.empty(shape, dtype=dtype)
+    return frame_pool.get(shape, dtype)
+
+
+
+def _get_ref_count(buffers: List[np.ndarray], idx: int) -> int:
+    return sys.getrefcount(buffers[idx])
+
+
+# The reference count of a buffer that is only referenced by the pool. It is measured, rather than
+# hard-coded, because the number of temporary references depends on the Python version.
+_UNUSED_REF_COUNT = _get_ref_count([np.empty(0)], 0)
+
+
+def _is_in_use(buffers: List[np.ndarray], idx: int) -> bool:
+    return _get_ref_count(buffers, idx) > _UNUSED_REF_COUNT
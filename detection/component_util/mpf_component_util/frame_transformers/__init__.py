@@ -25,5 +25,7 @@
 #############################################################################
 
 from . import frame_transformer_factory as factory
+from .frame_tiler import FrameTile, FrameTiler
 from .frame_transformer import NoOpTransformer
+from .image_location_batch import ImageLocationBatch
 from .search_region import SearchRegion, RegionEdge
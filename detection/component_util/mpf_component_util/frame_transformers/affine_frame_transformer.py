@@ -26,16 +26,21 @@
 
 from __future__ import annotations
 
+import collections
 import functools
-from typing import Sequence, Iterable, Tuple
+import threading
+from typing import Optional, Sequence, Iterable, Tuple
 
 import cv2
 import numpy as np
 
 import mpf_component_api as mpf
 
+from .frame_resizer import ModelInputSize, fill_letterbox_padding, get_resized_size
 from .frame_transformer import BaseDecoratedFrameTransformer, IFrameTransformer
+from .image_location_batch import ImageLocationBatch
 from .. import utils
+from ..frame_pool import FramePool, get_output_buffer
 from .search_region import SearchRegion
 
 
@@ -46,75 +51,176 @@ class AffineFrameTransformer(BaseDecoratedFrameTransformer):
                  frame_flip: bool,
                  fill_color: Tuple[int, int, int],
                  search_region: SearchRegion,
-                 inner_transform: IFrameTransformer):
+                 inner_transform: IFrameTransformer,
+                 frame_pool: Optional[FramePool] = None,
+                 max_output_dimension: int = 0,
+                 precompute_maps: bool = False,
+                 interpolation: int = cv2.INTER_CUBIC,
+                 model_input_size: Optional[ModelInputSize] = None):
         super().__init__(inner_transform)
+        # Every frame uses the same transformation, so the per-pixel source coordinates can be computed once
+        # and shared by all of the frames in the job.
         self.__transform = _AffineTransformation(regions, frame_rotation, frame_flip, fill_color,
-                                                 search_region)
+                                                 search_region, max_output_dimension, precompute_maps,
+                                                 interpolation, model_input_size)
+        self.__frame_pool = frame_pool
 
     @staticmethod
     def search_region_on_rotated_frame(rotation: float, flip: bool,
                                        fill_color: Tuple[int, int, int],
                                        search_region: SearchRegion,
-                                       inner_transform: IFrameTransformer
+                                       inner_transform: IFrameTransformer,
+                                       frame_pool: Optional[FramePool] = None,
+                                       max_output_dimension: int = 0,
+                                       precompute_maps: bool = False,
+                                       interpolation: int = cv2.INTER_CUBIC,
+                                       model_input_size: Optional[ModelInputSize] = None
                                        ) -> 'AffineFrameTransformer':
         return AffineFrameTransformer(
             _full_frame(inner_transform.get_frame_size(0)),
-            rotation, flip, fill_color, search_region, inner_transform)
+            rotation, flip, fill_color, search_region, inner_transform, frame_pool, max_output_dimension,
+            precompute_maps, interpolation, model_input_size)
 
     @staticmethod
     def rotate_full_frame(rotation: float, flip: bool, fill_color: Tuple[int, int, int],
-                          inner_transform: IFrameTransformer) -> 'AffineFrameTransformer':
+                          inner_transform: IFrameTransformer,
+                          frame_pool: Optional[FramePool] = None,
+                          max_output_dimension: int = 0,
+                          precompute_maps: bool = False,
+                          interpolation: int = cv2.INTER_CUBIC,
+                          model_input_size: Optional[ModelInputSize] = None) -> 'AffineFrameTransformer':
         return AffineFrameTransformer(
             _full_frame(inner_transform.get_frame_size(0)),
-            rotation, flip, fill_color, SearchRegion(), inner_transform)
+            rotation, flip, fill_color, SearchRegion(), inner_transform, frame_pool, max_output_dimension,
+            precompute_maps, interpolation, model_input_size)
 
     @staticmethod
     def rotated_superset_region(regions: Sequence[utils.RotatedRect], frame_rotation: float,
                                 frame_flip: bool, fill_color: Tuple[int, int, int],
-                                inner_transform: IFrameTransformer) -> 'AffineFrameTransformer':
+                                inner_transform: IFrameTransformer,
+                                frame_pool: Optional[FramePool] = None,
+                                max_output_dimension: int = 0,
+                                precompute_maps: bool = False,
+                                interpolation: int = cv2.INTER_CUBIC,
+                                model_input_size: Optional[ModelInputSize] = None) -> 'AffineFrameTransformer':
         return AffineFrameTransformer(regions, frame_rotation, frame_flip, fill_color,
-                                      SearchRegion(), inner_transform)
+                                      SearchRegion(), inner_transform, frame_pool, max_output_dimension,
+                                      precompute_maps, interpolation, model_input_size)
 
     def _do_frame_transform(self, frame, frame_index):
-        return self.__transform.apply(frame)
+        return self._do_frame_transform_into(frame, frame_index, None)
+
+    def _do_frame_transform_into(self, frame, frame_index, dst):
+        return self.__transform.apply(frame, _get_output(self.__transform, frame, dst, self.__frame_pool))
 
     def _do_reverse_transform(self, image_location, frame_index):
         self.__transform.apply_reverse(image_location)
 
+    def _do_reverse_transform_batch(self, batch):
+        self.__transform.apply_reverse_batch(batch, np.arange(len(batch)))
+
     def get_frame_size(self, frame_index):
         return self.__transform.get_region_size()
 
 
 
 class FeedForwardExactRegionAffineTransformer(BaseDecoratedFrameTransformer):
+    """
+    Tracks can contain tens of thousands of detections, so the regions are stored in a structured array and the
+    transformation for a frame is only created when the frame is accessed. Runs of consecutive frames with
+    identical regions share the same transformation.
+    """
+
+    _REGION_DTYPE = np.dtype([('x', 'f8'), ('y', 'f8'), ('width', 'f8'), ('height', 'f8'),
+                              ('rotation', 'f8'), ('flip', '?')])
+
     def __init__(self, regions: Iterable[utils.RotatedRect], fill_color: Tuple[int, int, int],
-                 inner_transform: IFrameTransformer):
+                 inner_transform: IFrameTransformer, frame_pool: Optional[FramePool] = None,
+                 max_output_dimension: int = 0, interpolation: int = cv2.INTER_CUBIC,
+                 model_input_size: Optional[ModelInputSize] = None):
         super().__init__(inner_transform)
-        self.__frame_transforms = [self.__create_transformation(r, fill_color) for r in regions]
+        self.__regions = np.array([(r.x, r.y, r.width, r.height, r.rotation, r.flip) for r in regions],
+                                  dtype=self._REGION_DTYPE)
+        self.__run_starts = self.__get_run_starts(self.__regions)
+        self.__fill_color = fill_color
+        self.__max_output_dimension = max_output_dimension
+        self.__interpolation = interpolation
+        self.__model_input_size = model_input_size
+        self.__frame_pool = frame_pool
+        # Frames are accessed in order, so only the most recently used transformation is kept. The run start
+        # and the transformation are stored in a single tuple so that they are always updated together.
+        self.__current_transform: Tuple[int, Optional[_AffineTransformation]] = (-1, None)
 
     def _do_frame_transform(self, frame, frame_index):
-        return self.__get_transform(frame_index).apply(frame)
+        return self._do_frame_transform_into(frame, frame_index, None)
+
+    def _do_frame_transform_into(self, frame, frame_index, dst):
+        transform = self.__get_transform(frame_index)
+        return transform.apply(frame, _get_output(transform, frame, dst, self.__frame_pool))
 
     def _do_reverse_transform(self, image_location, frame_index):
         self.__get_transform(frame_index).apply_reverse(image_location)
 
+    def _do_reverse_transform_batch(self, batch):
+        frame_indices = batch.frame_indices
+        out_of_range = (frame_indices >= len(self.__regions)) | (frame_indices < -len(self.__regions))
+        if np.any(out_of_range):
+            raise self.__get_index_error(int(frame_indices[out_of_range][0]))
+
+        # Group the rows of the batch by the transformation they use.
+        unique_run_starts, inverse = np.unique(self.__run_starts[frame_indices], return_inverse=True)
+        sorted_rows = np.argsort(inverse, kind='stable')
+        row_groups = np.split(sorted_rows, np.cumsum(np.bincount(inverse))[:-1])
+        for run_start, rows in zip(unique_run_starts.tolist(), row_groups):
+            self.__get_run_transform(run_start).apply_reverse_batch(batch, rows)
+
     def get_frame_size(self, frame_index):
         return self.__get_transform(frame_index).get_region_size()
 
-    def __get_transform(self, frame_index):
+    def __get_transform(self, frame_index) -> _AffineTransformation:
         try:
-            return self.__frame_transforms[frame_index]
+            run_start = int(self.__run_starts[frame_index])
         except IndexError:
-            raise IndexError(
-                'Attempted to get transformation for frame: {}, but there are only {} entries in the feed forward track'
-                .format(frame_index, len(self.__frame_transforms)))
+            raise self.__get_index_error(frame_index)
+        return self.__get_run_transform(run_start)
+
+    def __get_index_error(self, frame_index) -> IndexError:
+        return IndexError(
+            'Attempted to get transformation for frame: {}, but there are only {} entries in the feed forward track'
+            .format(frame_index, len(self.__regions)))
+
+    def __get_run_transform(self, run_start: int) -> _AffineTransformation:
+        current_run_start, current_transform = self.__current_transform
+        if current_run_start == run_start and current_transform is not None:
+            return current_transform
+
+        x, y, width, height, rotation, flip = self.__regions[run_start].item()
+        transform = self.__create_transformation(utils.RotatedRect(x, y, width, height, rotation, flip),
+                                                 self.__fill_color, self.__max_output_dimension,
+                                                 self.__interpolation, self.__model_input_size)
+        self.__current_transform = (run_start, transform)
+        return transform
+
+    @staticmethod
+    def __get_run_starts(regions: np.ndarray) -> np.ndarray:
+        # Maps each frame index to the index of the first frame in its run of identical regions.
+        if len(regions) == 0:
+            return np.empty(0, dtype=np.intp)
+        is_run_start = np.empty(len(regions), dtype=bool)
+        is_run_start[0] = True
+        is_run_start[1:] = regions[1:] != regions[:-1]
+        return np.maximum.accumulate(np.where(is_run_start, np.arange(len(regions)), 0))
 
     @staticmethod
     def __create_transformation(region: utils.RotatedRect,
-                                fill_color: Tuple[int, int, int]) -> '_AffineTransformation':
+                                fill_color: Tuple[int, int, int],
+                                max_output_dimension: int,
+                                interpolation: int,
+                                model_input_size: Optional[ModelInputSize]) -> '_AffineTransformation':
         frame_rotation = 360 - region.rotation if region.flip else region.rotation
         return _AffineTransformation((region,), frame_rotation, region.flip, fill_color,
-                                     SearchRegion())
+                                     SearchRegion(), max_output_dimension, interpolation=interpolation,
+                                     model_input_size=model_input_size)
 
 
 
@@ -122,12 +228,33 @@ def _full_frame(frame_size: utils.Size) -> Sequence[utils.RotatedRect]:
     return (utils.RotatedRect(0, 0, frame_size.width, frame_size.height, 0, False),)
 
 
+def _normalize_angles(angles: np.ndarray) -> np.ndarray:
+    # Vectorized version of utils.normalize_angle. np.mod uses the same sign convention as Python's % operator.
+    return np.where((0 <= angles) & (angles < 360), angles, np.mod(angles, 360))
+
+
+def _get_output(transform: _AffineTransformation, frame: np.ndarray, dst: Optional[np.ndarray],
+                frame_pool: Optional[FramePool]) -> Optional[np.ndarray]:
+    if dst is None and frame_pool is None:
+        # Let OpenCV allocate the output.
+        return None
+    width, height = transform.get_region_size()
+    return get_output_buffer((height, width, *frame.shape[2:]), frame.dtype, dst, frame_pool)
+
+
 class _AffineTransformation(object):
+    # Smallest scale factor that is done entirely by cv2.warpAffine.
+    _MIN_WARP_SCALE = 0.5
+
     def __init__(self,
                  pre_transform_regions: Sequence[utils.RotatedRect],
                  frame_rotation_degrees: float,
                  flip: bool, fill_color: Tuple[int, int, int],
-                 post_transform_search_region: SearchRegion):
+                 post_transform_search_region: SearchRegion,
+                 max_output_dimension: int = 0,
+                 precompute_maps: bool = False,
+                 interpolation: int = cv2.INTER_CUBIC,
+                 model_input_size: Optional[ModelInputSize] = None):
         if len(pre_transform_regions) == 0:
             raise IndexError('The "preTransformRegions" parameter must contain at least one element, but it was empty')
 
@@ -146,7 +273,23 @@ class _AffineTransformation(object):
         # the correctly oriented image.
         # searchRegionRect will either be the same as mappedBoundingRect or be contained within mappedBoundingRect.
         search_region_rect = post_transform_search_region.get_rect(mapped_bounding_rect.size)
-        self.__region_size: utils.Size[int] = search_region_rect.size
+        # When the search region is larger than max_output_dimension or a model input size is provided, the same
+        # warp that rotates the frame also resizes it, so that the frame does not need to be resampled twice.
+        # When letterboxing, only the content part of the output is warped. The letterbox padding can map to
+        # pixels outside of the search region, so it is filled with the fill color instead.
+        self.__content_rect: Optional[utils.Rect[int]] = None
+        if model_input_size is None:
+            self.__region_size, scale = get_resized_size(search_region_rect.size, max_output_dimension)
+            self.__scale = (scale, scale)
+            scale_mat = _IndividualXForms.scale(scale)
+        else:
+            self.__region_size = model_input_size.size
+            self.__scale = model_input_size.get_scale(search_region_rect.size)
+            content_rect = model_input_size.get_content_rect(search_region_rect.size)
+            if content_rect.size != self.__region_size:
+                self.__content_rect = content_rect
+            scale_mat = np.matmul(_IndividualXForms.translation(content_rect.x, content_rect.y),
+                                  _IndividualXForms.scale(*self.__scale))
         # When searchRegionRect is smaller than mappedBoundingRect, we need to move the searchRegionRect
         # to the origin. This slides the pixels outside of the search region off of the frame.
         move_search_region_to_origin = _IndividualXForms.translation(-search_region_rect.x, -search_region_rect.y)
@@ -161,41 +304,128 @@ class _AffineTransformation(object):
             # Transformations are applied from right to left, so rotation occurs first.
             combined_transform = functools.reduce(
                 np.matmul,
-                (move_search_region_to_origin, flip_shift_correction, flip_mat, move_roi_to_origin, rotation_mat))
+                (scale_mat, move_search_region_to_origin, flip_shift_correction, flip_mat, move_roi_to_origin,
+                 rotation_mat))
         else:
             # Transformations are applied from right to left, so rotation occurs first.
             combined_transform = functools.reduce(
                 np.matmul,
-                (move_search_region_to_origin, move_roi_to_origin, rotation_mat))
+                (scale_mat, move_search_region_to_origin, move_roi_to_origin, rotation_mat))
 
         # When combining transformations the 3d version must be used,
         # but when mapping 2d points the last row of the matrix can be dropped.
         combined_2d_transform = combined_transform[:2, :3]
         self.__reverse_transformation_matrix = cv2.invertAffineTransform(combined_2d_transform)
+        if self.__content_rect is None:
+            self.__warp_matrix = self.__reverse_transformation_matrix
+            self.__warp_size = self.__region_size
+        else:
+            # Maps the content view of the output to the original frame.
+            self.__warp_matrix = self.__reverse_transformation_matrix.copy()
+            self.__warp_matrix[:, 2] += np.matmul(self.__warp_matrix[:, :2],
+                                                  (self.__content_rect.x, self.__content_rect.y))
+            self.__warp_size = self.__content_rect.size
+        self.__orthogonal_transform = _OrthogonalTransform.from_matrix(self.__warp_matrix, self.__warp_size)
+        # cv2.warpAffine only samples a few source pixels for each output pixel, so large downscales alias.
+        # In that case, the part of the frame that is used is first shrunk with INTER_AREA, which averages all
+        # of the source pixels, and the warp only does the remaining rotation and small scale adjustment.
+        self.__prescale = max(self.__scale) if min(self.__scale) < self._MIN_WARP_SCALE else None
+        self.__precompute_maps = precompute_maps
+        # cv2.warpAffine and cv2.remap do not support INTER_AREA. cv2.warpAffine silently uses INTER_LINEAR
+        # instead, so the same is done here to make sure the remap tables are compatible.
+        self.__interpolation = cv2.INTER_LINEAR if interpolation == cv2.INTER_AREA else interpolation
+
+
+    def apply(self, frame: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.__content_rect is None:
+            return self.__warp(frame, dst)
+
+        if dst is None:
+            width, height = self.__region_size
+            dst = np.empty((height, width, *frame.shape[2:]), dtype=frame.dtype)
+        content = fill_letterbox_padding(dst, self.__content_rect, self.__fill_color)
+        warped = self.__warp(frame, content)
+        if warped is not content:
+            # _OrthogonalTransform may return a view of the input frame.
+            content[...] = warped
+        return dst
+
+
+    def __warp(self, frame: np.ndarray, dst: Optional[np.ndarray]) -> np.ndarray:
+        if self.__prescale is not None:
+            return self.__warp_prescaled(frame, dst)
+
+        if self.__orthogonal_transform is not None and self.__orthogonal_transform.can_apply(frame):
+            return self.__orthogonal_transform.apply(frame, dst)
 
-
-    def apply(self, frame: np.ndarray) -> np.ndarray:
         # From cv::warpAffine docs:
         # The function warpAffine transforms the source image using the specified matrix when the flag
         # WARP_INVERSE_MAP is set. Otherwise, the transformation is first inverted with cv::invertAffineTransform.
         # From OpenCV's Geometric Image Transformations module documentation:
         # To avoid sampling artifacts, the mapping is done in the reverse order, from destination to the source.
 
-        # Using INTER_CUBIC, because according to
+        # INTER_CUBIC is the default, because according to
         # https://en.wikipedia.org/wiki/Affine_transformation#Image_transformation
         # "This transform relocates pixels requiring intensity interpolation to approximate the value of moved pixels,
         # bicubic interpolation is the standard for image transformations in image processing applications."
-        return cv2.warpAffine(frame, self.__reverse_transformation_matrix, self.__region_size,  # type: ignore
-                              flags=cv2.WARP_INVERSE_MAP | cv2.INTER_CUBIC,
+        if self.__precompute_maps:
+            map1, map2 = _remap_table_cache.get(self.__warp_matrix, self.__warp_size,
+                                                self.__interpolation)
+            return cv2.remap(frame, map1, map2, self.__interpolation, dst=dst,
+                             borderMode=cv2.BORDER_CONSTANT, borderValue=self.__fill_color)
+
+        return cv2.warpAffine(frame, self.__warp_matrix, self.__warp_size,  # type: ignore
+                              dst=dst, flags=cv2.WARP_INVERSE_MAP | self.__interpolation,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=self.__fill_color)
+
+
+    def __warp_prescaled(self, frame: np.ndarray, dst: Optional[np.ndarray]) -> np.ndarray:
+        # Find the part of the frame that the output maps to. The margin keeps the pixels the interpolation
+        # kernel reads at the edges of the crop from being replaced by the fill color.
+        width, height = self.__warp_size
+        output_corners = np.array(((0, 0, 1), (width, 0, 1), (0, height, 1), (width, height, 1)), dtype=float)
+        source_corners = np.matmul(output_corners, self.__warp_matrix.T)
+        margin = 2 / self.__prescale + 2
+        frame_height, frame_width = frame.shape[:2]
+        left = max(0, int(np.floor(source_corners[:, 0].min() - margin)))
+        top = max(0, int(np.floor(source_corners[:, 1].min() - margin)))
+        right = min(frame_width, int(np.ceil(source_corners[:, 0].max() + margin)))
+        bottom = min(frame_height, int(np.ceil(source_corners[:, 1].max() + margin)))
+        if right <= left or bottom <= top:
+            # The output is entirely outside of the frame, so it only contains the fill color.
+            return cv2.warpAffine(frame, self.__warp_matrix, self.__warp_size, dst=dst,  # type: ignore
+                                  flags=cv2.WARP_INVERSE_MAP | self.__interpolation,
+                                  borderMode=cv2.BORDER_CONSTANT, borderValue=self.__fill_color)
+
+        crop_width = right - left
+        crop_height = bottom - top
+        shrunk_size = utils.Size(max(1, int(round(crop_width * self.__prescale))),
+                                 max(1, int(round(crop_height * self.__prescale))))
+        shrunk = cv2.resize(frame[top:bottom, left:right], shrunk_size, interpolation=cv2.INTER_AREA)
+
+        # Maps original frame coordinates to coordinates in the shrunk crop. cv2.resize aligns pixel centers,
+        # so x' = (x - left + 0.5) * scale_x - 0.5.
+        scale_x = shrunk_size.width / crop_width
+        scale_y = shrunk_size.height / crop_height
+        prescale_mat = np.array(((scale_x, 0, (0.5 - left) * scale_x - 0.5),
+                                 (0, scale_y, (0.5 - top) * scale_y - 0.5)))
+        warp_matrix = np.empty((2, 3))
+        warp_matrix[:, :2] = np.matmul(prescale_mat[:, :2], self.__warp_matrix[:, :2])
+        warp_matrix[:, 2] = np.matmul(prescale_mat[:, :2], self.__warp_matrix[:, 2]) + prescale_mat[:, 2]
+        return cv2.warpAffine(shrunk, warp_matrix, self.__warp_size, dst=dst,  # type: ignore
+                              flags=cv2.WARP_INVERSE_MAP | self.__interpolation,
                               borderMode=cv2.BORDER_CONSTANT, borderValue=self.__fill_color)
 
 
     def apply_reverse(self, image_location: mpf.ImageLocation) -> None:
-        top_left = np.array((image_location.x_left_upper, image_location.y_left_upper, 1.0), dtype=float)
-        new_top_left = np.matmul(self.__reverse_transformation_matrix, top_left)
+        new_x, new_y = self.__map_to_original(image_location.x_left_upper, image_location.y_left_upper)
 
-        image_location.x_left_upper = int(round(new_top_left[0]))
-        image_location.y_left_upper = int(round(new_top_left[1]))
+        image_location.x_left_upper = int(round(new_x))
+        image_location.y_left_upper = int(round(new_y))
+        scale_x, scale_y = self.__scale
+        if scale_x != 1 or scale_y != 1:
+            image_location.width = int(round(image_location.width / scale_x))
+            image_location.height = int(round(image_location.height / scale_y))
 
         if not utils.rotation_angles_equal(self.__rotation_degrees, 0):
             existing_rotation = utils.get_property(image_location.detection_properties, 'ROTATION', 0.0)
@@ -211,10 +441,67 @@ class _AffineTransformation(object):
                 image_location.detection_properties['HORIZONTAL_FLIP'] = 'true'
 
 
+    def apply_reverse_batch(self, batch: ImageLocationBatch, rows: np.ndarray) -> None:
+        """
+        Vectorized version of apply_reverse that produces exactly the same results.
+
+        :param batch: The image locations to do the reverse transform on.
+        :param rows: Indices of the rows in the batch that use this transformation.
+        """
+        new_x, new_y = self.__map_to_original(batch.x[rows], batch.y[rows])
+        # np.rint rounds half to even, just like the built-in round function.
+        batch.x[rows] = np.rint(new_x)
+        batch.y[rows] = np.rint(new_y)
+        scale_x, scale_y = self.__scale
+        if scale_x != 1 or scale_y != 1:
+            batch.width[rows] = np.rint(batch.width[rows] / scale_x)
+            batch.height[rows] = np.rint(batch.height[rows] / scale_y)
+
+        has_rotation = not utils.rotation_angles_equal(self.__rotation_degrees, 0)
+        if not has_rotation and not self.__flip:
+            return
+
+        # Rows may share a detection_properties dict, so each distinct dict is copied once and the copy is updated.
+        row_list = rows.tolist()
+        original_properties = [batch.detection_properties[i] for i in row_list]
+        unique_properties = list({id(p): p for p in original_properties}.values())
+        updated_properties = [dict(p) for p in unique_properties]
+
+        if has_rotation:
+            existing_rotations = np.array(
+                [utils.get_property(p, 'ROTATION', 0.0) for p in updated_properties], dtype=float)
+            rotation_adjustment_amount = 360 - self.__rotation_degrees if self.__flip else self.__rotation_degrees
+            new_rotations = _normalize_angles(existing_rotations + rotation_adjustment_amount)
+            for properties, new_rotation in zip(updated_properties, new_rotations.tolist()):
+                properties['ROTATION'] = str(new_rotation)
+
+        if self.__flip:
+            for properties in updated_properties:
+                if utils.get_property(properties, 'HORIZONTAL_FLIP', False):
+                    del properties['HORIZONTAL_FLIP']
+                else:
+                    properties['HORIZONTAL_FLIP'] = 'true'
+
+        replacements = {id(old): new for old, new in zip(unique_properties, updated_properties)}
+        for i, properties in zip(row_list, original_properties):
+            batch.detection_properties[i] = replacements[id(properties)]
+
+
+    def __map_to_original(self, x, y):
+        # Used for both single image locations and batches, so that both produce exactly the same results.
+        (m00, m01, m02), (m10, m11, m12) = self.__reverse_transformation_matrix
+        return m00 * x + m01 * y + m02, m10 * x + m11 * y + m12
+
+
     def get_region_size(self) -> utils.Size:
         return self.__region_size
 
 
+    @property
+    def reverse_transformation_matrix(self) -> np.ndarray:
+        return self.__reverse_transformation_matrix
+
+
     @staticmethod
     def __get_mapped_bounding_rect(regions: Sequence[utils.RotatedRect],
                                    frame_rot_mat: np.ndarray) -> utils.Rect[float]:
@@ -234,6 +521,146 @@ class _AffineTransformation(object):
 
 
 
+class _OrthogonalTransform(object):
+    """
+    When the rotation is a multiple of 90 degrees, each output pixel is exactly equal to one of the input
+    pixels, so the transformation can be done by cropping and then using cv2.flip, cv2.transpose, or cv2.rotate.
+    This is lossless and much faster than cv2.warpAffine, which produces the same result with any of the
+    supported interpolation methods.
+    """
+
+    # Maps the signs of the non-zero elements of the reverse transformation matrix to the operation that
+    # produces the output from the cropped input. When the matrix is diagonal, the keys are the signs of
+    # (m[0, 0], m[1, 1]), otherwise they are the signs of (m[0, 1], m[1, 0]).
+    _DIAGONAL_OPS = {
+        (1, 1): lambda src, dst: src,
+        (-1, 1): lambda src, dst: cv2.flip(src, 1, dst=dst),
+        (1, -1): lambda src, dst: cv2.flip(src, 0, dst=dst),
+        (-1, -1): lambda src, dst: cv2.rotate(src, cv2.ROTATE_180, dst=dst),
+    }
+
+    _ANTI_DIAGONAL_OPS = {
+        (1, 1): lambda src, dst: cv2.transpose(src, dst=dst),
+        (1, -1): lambda src, dst: cv2.rotate(src, cv2.ROTATE_90_CLOCKWISE, dst=dst),
+        (-1, 1): lambda src, dst: cv2.rotate(src, cv2.ROTATE_90_COUNTERCLOCKWISE, dst=dst),
+        (-1, -1): lambda src, dst: cv2.flip(cv2.transpose(src), -1, dst=dst),
+    }
+
+    def __init__(self, source_rect: utils.Rect[int], op):
+        self.__source_rect = source_rect
+        self.__op = op
+
+
+    @staticmethod
+    def from_matrix(reverse_transformation_matrix: np.ndarray,
+                    region_size: utils.Size[int]) -> Optional['_OrthogonalTransform']:
+        rounded = np.round(reverse_transformation_matrix)
+        if not np.allclose(reverse_transformation_matrix, rounded, rtol=0, atol=1e-6):
+            return None
+        linear_part = rounded[:, :2]
+        if np.array_equal(np.abs(linear_part), np.identity(2)):
+            op = _OrthogonalTransform._DIAGONAL_OPS[(int(linear_part[0, 0]), int(linear_part[1, 1]))]
+        elif np.array_equal(np.abs(linear_part), np.fliplr(np.identity(2))):
+            op = _OrthogonalTransform._ANTI_DIAGONAL_OPS[(int(linear_part[0, 1]), int(linear_part[1, 0]))]
+        else:
+            # Scaled or rotated by an angle that is not a multiple of 90 degrees.
+            return None
+
+        # Map the output frame's corners in to the input frame to find the region that will be used.
+        output_corners = np.array(((0, 0, 1), (region_size.width - 1, region_size.height - 1, 1)), dtype=float)
+        source_corners = np.matmul(rounded, output_corners.T).T
+        top_left = [int(v) for v in np.amin(source_corners, axis=0)]
+        bottom_right = [int(v) + 1 for v in np.amax(source_corners, axis=0)]
+        return _OrthogonalTransform(utils.Rect.from_corners(top_left, bottom_right), op)
+
+
+    def can_apply(self, frame: np.ndarray) -> bool:
+        # When part of the output is outside of the input frame, cv2.warpAffine is needed to add the fill color.
+        rect = self.__source_rect
+        frame_height, frame_width = frame.shape[:2]
+        return rect.x >= 0 and rect.y >= 0 and rect.br.x <= frame_width and rect.br.y <= frame_height
+
+
+    def apply(self, frame: np.ndarray, dst: Optional[np.ndarray]) -> np.ndarray:
+        rect = self.__source_rect
+        return self.__op(frame[rect.y:rect.br.y, rect.x:rect.br.x], dst)
+
+
+
+class _RemapTableCache(object):
+    """
+    Bounded, thread-safe, least recently used cache of the remap tables used by cv2.remap. cv2.warpAffine
+    computes the source coordinates of every output pixel on each call. When the same transformation is applied
+    to many frames, the coordinates can be computed once and stored in the compact fixed-point format produced by
+    cv2.convertMaps. The cache is shared by all of the transformers in the process, so segment jobs with the same
+    rotation reuse the same tables.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.__max_bytes = max_bytes
+        self.__current_bytes = 0
+        self.__tables: collections.OrderedDict = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+
+    def get(self, reverse_transformation_matrix: np.ndarray, output_size: utils.Size[int],
+            interpolation: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        key = (reverse_transformation_matrix.tobytes(), tuple(output_size), interpolation)
+        with self.__lock:
+            tables = self.__tables.get(key)
+            if tables is not None:
+                self.__tables.move_to_end(key)
+                return tables
+
+            tables = self.__create_tables(reverse_transformation_matrix, output_size, interpolation)
+            self.__tables[key] = tables
+            self.__current_bytes += self.__get_size(tables)
+            # Always keep the most recent entry, even when it is larger than the limit by itself.
+            while self.__current_bytes > self.__max_bytes and len(self.__tables) > 1:
+                _, evicted = self.__tables.popitem(last=False)
+                self.__current_bytes -= self.__get_size(evicted)
+            return tables
+
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__tables.clear()
+            self.__current_bytes = 0
+
+
+    def __len__(self):
+        return len(self.__tables)
+
+
+    @staticmethod
+    def __create_tables(reverse_transformation_matrix: np.ndarray, output_size: utils.Size[int],
+                        interpolation: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        width, height = output_size
+        xs = np.arange(width, dtype=np.float64)
+        ys = np.arange(height, dtype=np.float64)[:, np.newaxis]
+        (m00, m01, m02), (m10, m11, m12) = reverse_transformation_matrix
+        map_x = (m00 * xs + m01 * ys + m02).astype(np.float32)
+        map_y = (m10 * xs + m11 * ys + m12).astype(np.float32)
+        map1, map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2,
+                                     nninterpolation=interpolation == cv2.INTER_NEAREST)
+        # The tables are shared between threads, so make sure they do not get modified.
+        # When using nearest neighbor interpolation, map2 is None because the fractional part is not needed.
+        for table in (map1, map2):
+            if table is not None:
+                table.flags.writeable = False
+        return map1, map2
+
+
+    @staticmethod
+    def __get_size(tables: Tuple[np.ndarray, Optional[np.ndarray]]) -> int:
+        return sum(t.nbytes for t in tables if t is not None)
+
+
+# A 1920x1080 frame needs about 12 MB of remap tables.
+_remap_table_cache = _RemapTableCache(256 * 1024 * 1024)
+
+
+
 class _IndividualXForms(object):
     """
     All transformation matrices are from https://en.wikipedia.org/wiki/Affine_transformation#Image_transformation
@@ -264,6 +691,16 @@ class _IndividualXForms(object):
             (0, 0, 1),
         ))
 
+    @staticmethod
+    def scale(scale_x: float, scale_y: Optional[float] = None) -> np.ndarray:
+        if scale_y is None:
+            scale_y = scale_x
+        return np.array((
+            (scale_x, 0, 0),
+            (0, scale_y, 0),
+            (0, 0, 1)
+        ))
+
     @staticmethod
     def translation(x_distance: float, y_distance: float) -> np.ndarray:
         return np.array((
@@ -25,32 +25,58 @@
 #############################################################################
 
 import abc
-from typing import List, Mapping
+from typing import List, Mapping, Optional
 
 import numpy as np
 
 import mpf_component_api as mpf
-from . frame_transformer import BaseDecoratedFrameTransformer, IFrameTransformer
+from . frame_transformer import BaseDecoratedFrameTransformer, IFrameTransformer, NoOpTransformer
+from .image_location_batch import ImageLocationBatch
 from .. import utils
 
 
 class _BaseFrameCropper(BaseDecoratedFrameTransformer, abc.ABC):
 
+    def __init__(self, inner_transform: IFrameTransformer):
+        super().__init__(inner_transform)
+        # When the inner transform does not modify the frame, the region of interest is also the region of the
+        # original frame that needs to be decoded.
+        self.__crops_original_frame = isinstance(inner_transform, NoOpTransformer)
+
+
     def get_frame_size(self, frame_index: int) -> utils.Size:
         return self._get_region_of_interest(frame_index).size
 
 
     def _do_frame_transform(self, frame: np.ndarray, frame_index: int) -> np.ndarray:
         region = self._get_region_of_interest(frame_index)
+        if self.__crops_original_frame and utils.Size.from_frame(frame) == region.size:
+            # Only the decode region was decoded. When the region of interest is the full frame, slicing would
+            # not have changed the frame either.
+            return frame
         return frame[region.y:region.br.y, region.x:region.br.x]
 
 
+    def get_decode_region(self, frame_index: int) -> Optional[utils.Rect]:
+        if self.__crops_original_frame:
+            return self._get_region_of_interest(frame_index)
+        return super().get_decode_region(frame_index)
+
+
     def _do_reverse_transform(self, image_location: mpf.ImageLocation, frame_index: int) -> None:
         region = self._get_region_of_interest(frame_index)
         image_location.x_left_upper += region.x
         image_location.y_left_upper += region.y
 
 
+    def _do_reverse_transform_batch(self, batch: ImageLocationBatch) -> None:
+        # Many detections are usually in the same frame, so each frame's region is only looked up once.
+        unique_frame_indices, inverse = np.unique(batch.frame_indices, return_inverse=True)
+        regions = [self._get_region_of_interest(int(i)) for i in unique_frame_indices]
+        batch.x += np.array([r.x for r in regions], dtype=np.int64)[inverse]
+        batch.y += np.array([r.y for r in regions], dtype=np.int64)[inverse]
+
+
     def _get_intersecting_region(
             self, region_of_interest: utils.Rect, frame_index: int) -> utils.Rect:
         frame_rect = utils.Rect.from_corner_and_size(
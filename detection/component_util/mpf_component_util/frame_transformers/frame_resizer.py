@@ -0,0 +1,238 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+from typing import NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import mpf_component_api as mpf
+from .frame_transformer import BaseDecoratedFrameTransformer, IFrameTransformer
+from .image_location_batch import ImageLocationBatch
+from .. import utils
+from ..frame_pool import FramePool, get_output_buffer
+
+
+class FrameResizer(BaseDecoratedFrameTransformer):
+    """
+    Shrinks frames so that neither dimension is larger than max_dimension, while preserving the aspect ratio.
+    Frames that are already small enough are not modified.
+    """
+
+    def __init__(self, max_dimension: int, inner_transform: IFrameTransformer,
+                 frame_pool: Optional[FramePool] = None,
+                 interpolation: int = cv2.INTER_AREA):
+        super().__init__(inner_transform)
+        self.__max_dimension = max_dimension
+        self.__frame_pool = frame_pool
+        self.__interpolation = interpolation
+
+
+    def get_frame_size(self, frame_index: int) -> utils.Size:
+        return get_resized_size(self._get_inner_frame_size(frame_index), self.__max_dimension)[0]
+
+
+    def _do_frame_transform(self, frame: np.ndarray, frame_index: int) -> np.ndarray:
+        return self._do_frame_transform_into(frame, frame_index, None)
+
+
+    def _do_frame_transform_into(self, frame: np.ndarray, frame_index: int,
+                                 dst: Optional[np.ndarray]) -> np.ndarray:
+        new_size = self.get_frame_size(frame_index)
+        if new_size == utils.Size.from_frame(frame):
+            return frame
+        dst = get_output_buffer((new_size.height, new_size.width, *frame.shape[2:]), frame.dtype, dst,
+                                self.__frame_pool)
+        return cv2.resize(frame, new_size, dst=dst, interpolation=self.__interpolation)
+
+
+    def _do_reverse_transform(self, image_location: mpf.ImageLocation, frame_index: int) -> None:
+        inner_size = self._get_inner_frame_size(frame_index)
+        new_size = self.get_frame_size(frame_index)
+        if inner_size == new_size:
+            return
+        scale_x = inner_size.width / new_size.width
+        scale_y = inner_size.height / new_size.height
+        image_location.x_left_upper = int(round(image_location.x_left_upper * scale_x))
+        image_location.y_left_upper = int(round(image_location.y_left_upper * scale_y))
+        image_location.width = int(round(image_location.width * scale_x))
+        image_location.height = int(round(image_location.height * scale_y))
+
+
+    def _do_reverse_transform_batch(self, batch: ImageLocationBatch) -> None:
+        unique_frame_indices, inverse = np.unique(batch.frame_indices, return_inverse=True)
+        scales = np.ones((len(unique_frame_indices), 2))
+        for i, frame_index in enumerate(unique_frame_indices.tolist()):
+            inner_size = self._get_inner_frame_size(frame_index)
+            new_size = self.get_frame_size(frame_index)
+            if inner_size != new_size:
+                scales[i] = (inner_size.width / new_size.width, inner_size.height / new_size.height)
+        scale_x = scales[inverse, 0]
+        scale_y = scales[inverse, 1]
+        # np.rint rounds half to even, just like the built-in round function.
+        batch.x[:] = np.rint(batch.x * scale_x)
+        batch.y[:] = np.rint(batch.y * scale_y)
+        batch.width[:] = np.rint(batch.width * scale_x)
+        batch.height[:] = np.rint(batch.height * scale_y)
+
+
+
+def get_resized_size(size: utils.Size, max_dimension: int) -> Tuple[utils.Size[int], float]:
+    """
+    :param size: Size of the frame before resizing
+    :param max_dimension: Maximum width and height of the resized frame. When less than 1, frames are not resized.
+    :return: The resized frame size and the scale factor used to get there
+    """
+    largest_dimension = max(size)
+    if max_dimension < 1 or largest_dimension <= max_dimension:
+        return utils.Size(int(size.width), int(size.height)), 1.0
+    scale = max_dimension / largest_dimension
+    return utils.Size(max(1, int(round(size.width * scale))), max(1, int(round(size.height * scale)))), scale
+
+
+
+def fill_letterbox_padding(output: np.ndarray, content_rect: utils.Rect[int],
+                           fill_color: Tuple[int, int, int]) -> np.ndarray:
+    """
+    Fills the part of output that is outside of content_rect with fill_color.
+
+    :return: A view of the part of output that is inside of content_rect
+    """
+    output[:content_rect.y] = fill_color
+    output[content_rect.br.y:] = fill_color
+    output[content_rect.y:content_rect.br.y, :content_rect.x] = fill_color
+    output[content_rect.y:content_rect.br.y, content_rect.br.x:] = fill_color
+    return output[content_rect.y:content_rect.br.y, content_rect.x:content_rect.br.x]
+
+
+
+class ModelInputSize(NamedTuple):
+    """
+    The frame size a model expects. When letterbox is true, frames are scaled by the same amount in both
+    dimensions and the remaining area is filled with the fill color. Otherwise, frames are stretched to fill the
+    whole model input.
+    """
+    width: int
+    height: int
+    letterbox: bool = False
+
+    @property
+    def size(self) -> utils.Size[int]:
+        return utils.Size(self.width, self.height)
+
+
+    def get_content_rect(self, frame_size: utils.Size) -> utils.Rect[int]:
+        """
+        :param frame_size: Size of the frame before resizing
+        :return: The area of the model input that the resized frame occupies. The letterbox padding is split
+                 evenly between the two sides.
+        """
+        if not self.letterbox:
+            return utils.Rect(0, 0, self.width, self.height)
+        scale = min(self.width / frame_size.width, self.height / frame_size.height)
+        width = min(self.width, max(1, int(round(frame_size.width * scale))))
+        height = min(self.height, max(1, int(round(frame_size.height * scale))))
+        return utils.Rect((self.width - width) // 2, (self.height - height) // 2, width, height)
+
+
+    def get_scale(self, frame_size: utils.Size) -> Tuple[float, float]:
+        """
+        :param frame_size: Size of the frame before resizing
+        :return: The x and y scale factors. When letterboxing, they can differ slightly because the resized frame's
+                 size is rounded to whole pixels.
+        """
+        content_rect = self.get_content_rect(frame_size)
+        return content_rect.width / frame_size.width, content_rect.height / frame_size.height
+
+
+
+class ModelInputResizer(BaseDecoratedFrameTransformer):
+    """
+    Resizes frames to the exact size a model expects, optionally letterboxing them. This is the same
+    transformation that ModelInputSize adds to the affine frame transformers when the frame also needs to be
+    rotated or flipped.
+    """
+
+    def __init__(self, model_input_size: ModelInputSize, fill_color: Tuple[int, int, int],
+                 inner_transform: IFrameTransformer,
+                 frame_pool: Optional[FramePool] = None,
+                 interpolation: int = cv2.INTER_LINEAR):
+        super().__init__(inner_transform)
+        self.__model_input_size = model_input_size
+        self.__fill_color = fill_color
+        self.__frame_pool = frame_pool
+        self.__interpolation = interpolation
+
+
+    def get_frame_size(self, frame_index: int) -> utils.Size:
+        return self.__model_input_size.size
+
+
+    def _do_frame_transform(self, frame: np.ndarray, frame_index: int) -> np.ndarray:
+        return self._do_frame_transform_into(frame, frame_index, None)
+
+
+    def _do_frame_transform_into(self, frame: np.ndarray, frame_index: int,
+                                 dst: Optional[np.ndarray]) -> np.ndarray:
+        frame_size = utils.Size.from_frame(frame)
+        model_input_size = self.__model_input_size.size
+        if frame_size == model_input_size:
+            return frame
+
+        output_shape = (model_input_size.height, model_input_size.width, *frame.shape[2:])
+        output = get_output_buffer(output_shape, frame.dtype, dst, self.__frame_pool)
+
+        # The frame is resized directly in to the output, so only the letterbox padding needs to be filled.
+        content_rect = self.__model_input_size.get_content_rect(frame_size)
+        content = fill_letterbox_padding(output, content_rect, self.__fill_color)
+        cv2.resize(frame, content_rect.size, dst=content, interpolation=self.__interpolation)
+        return output
+
+
+    def _do_reverse_transform(self, image_location: mpf.ImageLocation, frame_index: int) -> None:
+        inner_size = self._get_inner_frame_size(frame_index)
+        content_rect = self.__model_input_size.get_content_rect(inner_size)
+        scale_x, scale_y = self.__model_input_size.get_scale(inner_size)
+        image_location.x_left_upper = int(round((image_location.x_left_upper - content_rect.x) / scale_x))
+        image_location.y_left_upper = int(round((image_location.y_left_upper - content_rect.y) / scale_y))
+        image_location.width = int(round(image_location.width / scale_x))
+        image_location.height = int(round(image_location.height / scale_y))
+
+
+    def _do_reverse_transform_batch(self, batch: ImageLocationBatch) -> None:
+        unique_frame_indices, inverse = np.unique(batch.frame_indices, return_inverse=True)
+        # Columns are x offset, y offset, x scale, and y scale.
+        params = np.empty((len(unique_frame_indices), 4))
+        for i, frame_index in enumerate(unique_frame_indices.tolist()):
+            inner_size = self._get_inner_frame_size(frame_index)
+            content_rect = self.__model_input_size.get_content_rect(inner_size)
+            params[i] = (content_rect.x, content_rect.y, *self.__model_input_size.get_scale(inner_size))
+        offset_x, offset_y, scale_x, scale_y = params[inverse].T
+        # np.rint rounds half to even, just like the built-in round function.
+        batch.x[:] = np.rint((batch.x - offset_x) / scale_x)
+        batch.y[:] = np.rint((batch.y - offset_y) / scale_y)
+        batch.width[:] = np.rint(batch.width / scale_x)
+        batch.height[:] = np.rint(batch.height / scale_y)
@@ -0,0 +1,189 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import mpf_component_api as mpf
+from .. import utils
+from ..frame_pool import FramePool
+
+
+class FrameTile(NamedTuple):
+    # A view of the region of the frame covered by the tile. The frame's data is not copied.
+    image: np.ndarray
+    # The tile's position in the frame.
+    region: utils.Rect[int]
+
+    def reverse_transform(self, image_location: mpf.ImageLocation) -> None:
+        """
+        Maps a detection found in the tile to the frame that was split.
+        """
+        image_location.x_left_upper += self.region.x
+        image_location.y_left_upper += self.region.y
+
+
+
+class FrameTiler(object):
+    """
+    Splits large frames into overlapping, fixed-size tiles so that small objects can be detected without
+    downscaling the frame. The tiler works on frames that have already been transformed by ImageReader or
+    VideoCapture, so search regions, rotation, and flipping are applied before tiling. The detections returned
+    by merge are relative to the transformed frame, so they still need to be passed to the ImageReader's or
+    VideoCapture's reverse_transform.
+    """
+
+    def __init__(self, tile_size: utils.Size[int], overlap: int = 0, duplicate_threshold: float = 0.5):
+        """
+        :param tile_size: Size of each tile. Tiles are smaller than tile_size when the frame is smaller than
+                          tile_size.
+        :param overlap: Minimum number of pixels that neighboring tiles share. Objects that are smaller than
+                        the overlap are fully contained in at least one tile.
+        :param duplicate_threshold: When the area of the intersection of two detections from different tiles
+                                    divided by the area of the smaller detection is greater than this value,
+                                    only the detection with the higher confidence is kept.
+        """
+        self.__tile_size = utils.Size.as_size(tile_size)
+        if overlap < 0 or overlap >= min(self.__tile_size):
+            raise ValueError(f'The tile overlap must be at least 0 and less than the tile width and height, '
+                             f'but it was {overlap}.')
+        self.__overlap = overlap
+        self.__duplicate_threshold = duplicate_threshold
+
+
+    def get_tiles(self, frame: np.ndarray) -> List[FrameTile]:
+        """
+        :param frame: The frame to split
+        :return: Tiles in row-major order. The tiles in the last row and column are shifted so that they end at
+                 the frame's edges, which makes all of the tiles the same size.
+        """
+        frame_size = utils.Size.from_frame(frame)
+        tile_width = min(self.__tile_size.width, frame_size.width)
+        tile_height = min(self.__tile_size.height, frame_size.height)
+        tiles = []
+        for y in _get_tile_starts(frame_size.height, tile_height, self.__overlap):
+            for x in _get_tile_starts(frame_size.width, tile_width, self.__overlap):
+                tiles.append(FrameTile(frame[y:y + tile_height, x:x + tile_width],
+                                       utils.Rect(x, y, tile_width, tile_height)))
+        return tiles
+
+
+    @staticmethod
+    def get_batch(tiles: Sequence[FrameTile], frame_pool: Optional[FramePool] = None) -> np.ndarray:
+        """
+        Copies the tiles in to a single contiguous array, which is the layout most models expect.
+
+        :param tiles: Tiles from the same call to get_tiles
+        :param frame_pool: When provided, the array is taken from the pool.
+        :return: Array with shape (len(tiles), tile height, tile width, channels)
+        """
+        first_image = tiles[0].image
+        shape = (len(tiles), *first_image.shape)
+        if frame_pool is None:
+            batch = np.empty(shape, dtype=first_image.dtype)
+        else:
+            batch = frame_pool.get(shape, first_image.dtype)
+        for tile, dst in zip(tiles, batch):
+            dst[...] = tile.image
+        return batch
+
+
+    def merge(self, tiles: Sequence[FrameTile], tile_detections: Iterable[Iterable[mpf.ImageLocation]]
+              ) -> List[mpf.ImageLocation]:
+        """
+        Maps the detections from each tile to the frame and removes the duplicates that occur when an object is
+        in more than one tile. Detections from the same tile are never removed because the component is
+        expected to have already handled overlapping detections within a tile.
+
+        :param tiles: Tiles from the same call to get_tiles
+        :param tile_detections: The detections found in each tile, in the same order as tiles. The image
+                                locations are modified in place.
+        :return: The remaining detections, ordered by decreasing confidence
+        """
+        image_locations = []
+        tile_indices = []
+        for tile_idx, detections in enumerate(tile_detections):
+            for image_location in detections:
+                image_locations.append(image_location)
+                tile_indices.append(tile_idx)
+        if not image_locations:
+            return []
+
+        tile_indices = np.array(tile_indices, dtype=np.int64)
+        tile_x = np.array([t.region.x for t in tiles], dtype=np.int64)
+        tile_y = np.array([t.region.y for t in tiles], dtype=np.int64)
+        x = np.array([il.x_left_upper for il in image_locations], dtype=np.int64) + tile_x[tile_indices]
+        y = np.array([il.y_left_upper for il in image_locations], dtype=np.int64) + tile_y[tile_indices]
+        width = np.array([il.width for il in image_locations], dtype=np.int64)
+        height = np.array([il.height for il in image_locations], dtype=np.int64)
+        confidence = np.array([il.confidence for il in image_locations], dtype=np.float64)
+
+        keep = _get_non_duplicates(x, y, width, height, confidence, tile_indices, self.__duplicate_threshold)
+        results = []
+        for idx, new_x, new_y in zip(keep.tolist(), x[keep].tolist(), y[keep].tolist()):
+            image_location = image_locations[idx]
+            image_location.x_left_upper = new_x
+            image_location.y_left_upper = new_y
+            results.append(image_location)
+        return results
+
+
+
+def _get_tile_starts(frame_length: int, tile_length: int, overlap: int) -> List[int]:
+    if frame_length <= tile_length:
+        return [0]
+    step = tile_length - overlap
+    count = math.ceil((frame_length - tile_length) / step) + 1
+    starts = np.arange(count, dtype=np.int64) * step
+    starts[-1] = frame_length - tile_length
+    return starts.tolist()
+
+
+def _get_non_duplicates(x, y, width, height, confidence, tile_indices, threshold) -> np.ndarray:
+    # Greedy non-maximum suppression. Intersection over the smaller area is used instead of intersection over
+    # union because an object that is cut off by a tile's edge produces a detection that is much smaller than
+    # the detection from the tile that contains the whole object.
+    order = np.argsort(-confidence, kind='stable')
+    x, y, br_x, br_y = x[order], y[order], (x + width)[order], (y + height)[order]
+    area = (width * height)[order]
+    tile_indices = tile_indices[order]
+
+    suppressed = np.zeros(len(order), dtype=bool)
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        rest = slice(i + 1, None)
+        intersection_width = np.minimum(br_x[i], br_x[rest]) - np.maximum(x[i], x[rest])
+        intersection_height = np.minimum(br_y[i], br_y[rest]) - np.maximum(y[i], y[rest])
+        intersection_area = np.clip(intersection_width, 0, None) * np.clip(intersection_height, 0, None)
+        smaller_area = np.maximum(np.minimum(area[i], area[rest]), 1)
+        suppressed[rest] |= ((intersection_area / smaller_area > threshold)
+                             & (tile_indices[rest] != tile_indices[i]))
+    return order[~suppressed]
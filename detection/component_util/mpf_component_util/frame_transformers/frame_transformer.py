@@ -27,12 +27,21 @@
 import abc
 
 from .. import utils
+from .image_location_batch import ImageLocationBatch
 
 
 class IFrameTransformer(abc.ABC):
 
     @abc.abstractmethod
-    def transform_frame(self, frame, frame_index):
+    def transform_frame(self, frame, frame_index, dst=None):
+        """
+        :param frame: Frame to transform.
+        :param frame_index: 0-based index of the frame's position in video or 0 if frame is from image.
+        :param dst: Optional array to write the transformed frame in to. It is only used when it has the
+                    transformed frame's shape and type, and the transformer can write its output directly in to
+                    it, so callers must use the returned frame.
+        :return: The transformed frame.
+        """
         raise NotImplementedError()
 
     @abc.abstractmethod
@@ -43,6 +52,29 @@ class IFrameTransformer(abc.ABC):
     def get_frame_size(self, frame_index):
         raise NotImplementedError()
 
+    def reverse_transform_batch(self, batch: ImageLocationBatch) -> None:
+        """
+        Reverse transforms every image location in the batch. Subclasses should override this method when the
+        reverse transform can be vectorized.
+
+        :param batch: The image locations to do the reverse transform on.
+        """
+        for i in range(len(batch)):
+            image_location = batch.get_image_location(i)
+            self.reverse_transform(image_location, int(batch.frame_indices[i]))
+            batch.set_image_location(i, image_location)
+
+    def get_decode_region(self, frame_index):
+        """
+        Gets the region of the original frame that is needed to produce the transformed frame. When a region is
+        returned, transform_frame accepts either the full frame or just that region of it, so decoders that support
+        it can skip decoding the rest of the frame.
+
+        :param frame_index: 0-based index of the frame's position in video or 0 if frame is from image.
+        :return: The required region of the original frame or None when the full frame is required.
+        """
+        return None
+
 
 
 class NoOpTransformer(IFrameTransformer):
@@ -52,12 +84,15 @@ class NoOpTransformer(IFrameTransformer):
     def get_frame_size(self, frame_index):
         return self.__frame_size
 
-    def transform_frame(self, frame, frame_index):
+    def transform_frame(self, frame, frame_index, dst=None):
         return frame
 
     def reverse_transform(self, image_location, frame_index):
         pass
 
+    def reverse_transform_batch(self, batch):
+        pass
+
 
 
 class BaseDecoratedFrameTransformer(IFrameTransformer, abc.ABC):
@@ -74,16 +109,20 @@ class BaseDecoratedFrameTransformer(IFrameTransformer, abc.ABC):
         self.__inner_transform = inner_transform
 
 
-    def transform_frame(self, frame, frame_index):
+    def transform_frame(self, frame, frame_index, dst=None):
         """
-        Calls in the inner transform before calling the subclass's _do_frame_transform method.
+        Calls in the inner transform before calling the subclass's _do_frame_transform method. Only the
+        outermost transformer uses dst.
 
         :param frame: Frame to transform.
         :param frame_index: 0-based index of the frame's position in video or 0 if frame is from image.
+        :param dst: Optional array to write the transformed frame in to.
         :return: The transformed frame.
         """
         frame = self.__inner_transform.transform_frame(frame, frame_index)
-        return self._do_frame_transform(frame, frame_index)
+        if dst is None:
+            return self._do_frame_transform(frame, frame_index)
+        return self._do_frame_transform_into(frame, frame_index, dst)
 
 
     def reverse_transform(self, image_location, frame_index):
@@ -97,6 +136,25 @@ class BaseDecoratedFrameTransformer(IFrameTransformer, abc.ABC):
         self.__inner_transform.reverse_transform(image_location, frame_index)
 
 
+    def reverse_transform_batch(self, batch: ImageLocationBatch) -> None:
+        """
+        Calls the subclass's _do_reverse_transform_batch before calling the inner transformer's
+        reverse_transform_batch.
+
+        :param batch: The image locations to do the reverse transform on.
+        """
+        self._do_reverse_transform_batch(batch)
+        self.__inner_transform.reverse_transform_batch(batch)
+
+
+    def get_decode_region(self, frame_index):
+        """
+        The subclass's _do_frame_transform only sees the output of the inner transform, so by default the inner
+        transform determines the decode region.
+        """
+        return self.__inner_transform.get_decode_region(frame_index)
+
+
     def _get_inner_frame_size(self, frame_index):
         return self.__inner_transform.get_frame_size(frame_index)
 
@@ -113,6 +171,19 @@ class BaseDecoratedFrameTransformer(IFrameTransformer, abc.ABC):
         raise NotImplementedError()
 
 
+    def _do_frame_transform_into(self, frame, frame_index, dst):
+        """
+        Subclasses that can write their output directly in to a caller provided array override this method.
+        By default, dst is ignored.
+
+        :param frame: Frame to transform.
+        :param frame_index: 0-based index of the frame's position in video or 0 if frame is from image.
+        :param dst: Array to write the transformed frame in to when it has the right shape and type.
+        :return: The transformed frame.
+        """
+        return self._do_frame_transform(frame, frame_index)
+
+
     @abc.abstractmethod
     def _do_reverse_transform(self, image_location, frame_index):
         """
@@ -122,3 +193,16 @@ class BaseDecoratedFrameTransformer(IFrameTransformer, abc.ABC):
         :param frame_index: 0-based index of the frame's position in video or 0 if frame is from image.
         """
         raise NotImplementedError()
+
+
+    def _do_reverse_transform_batch(self, batch: ImageLocationBatch) -> None:
+        """
+        Subclasses override this method to implement a vectorized reverse transform. By default,
+        _do_reverse_transform is called on each image location.
+
+        :param batch: The image locations to do the reverse transform on.
+        """
+        for i in range(len(batch)):
+            image_location = batch.get_image_location(i)
+            self._do_reverse_transform(image_location, int(batch.frame_indices[i]))
+            batch.set_image_location(i, image_location)
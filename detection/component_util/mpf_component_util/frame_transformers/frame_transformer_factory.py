@@ -26,19 +26,27 @@
 
 from __future__ import division, print_function
 
+import functools
 import sys
-from typing import Dict, Iterable, Mapping, Tuple, Union
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+
+import cv2
+import numpy as np
 
 import mpf_component_api as mpf
 
 from .affine_frame_transformer import AffineFrameTransformer, FeedForwardExactRegionAffineTransformer
 from .frame_transformer import NoOpTransformer
 from .frame_cropper import FeedForwardFrameCropper, SearchRegionFrameCropper
+from .frame_resizer import FrameResizer, ModelInputResizer, ModelInputSize
+from .model_tensor_converter import ModelTensorConverter, ModelTensorFormat
 from .search_region import SearchRegion, RegionEdge
 from .. import utils
+from ..frame_pool import FramePool
 
 
-def get_transformer(job: Union[mpf.VideoJob, mpf.ImageJob], input_frame_size):
+def get_transformer(job: Union[mpf.VideoJob, mpf.ImageJob], input_frame_size,
+                    frame_pool: Optional[FramePool] = None):
     ff_frame_locations = dict()
     track_properties = dict()
     if hasattr(job, 'feed_forward_track'):
@@ -50,24 +58,177 @@ def get_transformer(job: Union[mpf.VideoJob, mpf.ImageJob], input_frame_size):
         if job.feed_forward_location is not None:
             ff_frame_locations = {0: job.feed_forward_location}
 
-    return _get_transformer(job, input_frame_size, ff_frame_locations, track_properties)
+    if not ff_frame_locations and frame_pool is None:
+        # Without feed forward regions and a frame pool, the transformer chain only depends on a few properties
+        # and the frame size, so jobs with the same values can share a chain.
+        return _get_cached_transformer(
+            tuple(job.job_properties.get(p) for p in _TRANSFORMER_JOB_PROPERTIES),
+            tuple(job.media_properties.get(p) for p in _TRANSFORMER_MEDIA_PROPERTIES),
+            utils.Size.as_size(input_frame_size))
+    return _get_transformer(job, input_frame_size, ff_frame_locations, track_properties, frame_pool)
+
+
+
+# All of the job properties that _get_transformer uses. Properties that are added to _get_transformer must be
+# added here, or jobs that only differ by the new property will incorrectly share a transformer chain.
+_TRANSFORMER_JOB_PROPERTIES = (
+    'AUTO_FLIP', 'AUTO_ROTATE', 'DECODE_MAX_DIMENSION', 'FEED_FORWARD_TYPE', 'HORIZONTAL_FLIP', 'LETTERBOX',
+    'MODEL_INPUT_CHANNEL_ORDER', 'MODEL_INPUT_DTYPE', 'MODEL_INPUT_HEIGHT', 'MODEL_INPUT_LAYOUT',
+    'MODEL_INPUT_MEAN', 'MODEL_INPUT_STD', 'MODEL_INPUT_WIDTH', 'ROTATION', 'ROTATION_FILL_COLOR',
+    'ROTATION_INTERPOLATION', 'ROTATION_PRECOMPUTE_MAPS', 'ROTATION_THRESHOLD',
+    'SEARCH_REGION_BOTTOM_RIGHT_X_DETECTION', 'SEARCH_REGION_BOTTOM_RIGHT_Y_DETECTION',
+    'SEARCH_REGION_ENABLE_DETECTION', 'SEARCH_REGION_TOP_LEFT_X_DETECTION', 'SEARCH_REGION_TOP_LEFT_Y_DETECTION')
+
+_TRANSFORMER_MEDIA_PROPERTIES = ('HORIZONTAL_FLIP', 'ROTATION')
+
 
+class _PropertiesOnlyJob(NamedTuple):
+    job_properties: Dict[str, str]
+    media_properties: Dict[str, str]
 
 
-def _get_transformer(job, input_frame_size, ff_frame_locations: Dict[int, mpf.ImageLocation], track_properties):
+@functools.lru_cache(maxsize=128)
+def _get_cached_transformer(job_property_values: Tuple[Optional[str], ...],
+                            media_property_values: Tuple[Optional[str], ...],
+                            input_frame_size: utils.Size):
+    # Transformers do not have any mutable state when there is no frame pool, so the chains can be shared.
+    job = _PropertiesOnlyJob(
+        {k: v for k, v in zip(_TRANSFORMER_JOB_PROPERTIES, job_property_values) if v is not None},
+        {k: v for k, v in zip(_TRANSFORMER_MEDIA_PROPERTIES, media_property_values) if v is not None})
+    return _get_transformer(job, input_frame_size, dict(), dict(), None)
+
+
+
+def _get_transformer(job, input_frame_size, ff_frame_locations: Dict[int, mpf.ImageLocation], track_properties,
+                     frame_pool):
     transformer = NoOpTransformer(input_frame_size)
 
     if _feed_forward_is_enabled(job.job_properties):
         if not ff_frame_locations:
             raise ValueError('Feed forward is enabled, but feed forward track was empty.')
-        return _add_feed_forward_transforms_if_needed(job.job_properties, job.media_properties, track_properties,
-                                                      ff_frame_locations, transformer)
+        transformer = _add_feed_forward_transforms_if_needed(
+            job.job_properties, job.media_properties, track_properties, ff_frame_locations, transformer, frame_pool)
     else:
-        return _add_transformers_if_needed(job.job_properties, job.media_properties, input_frame_size, transformer)
+        transformer = _add_transformers_if_needed(job.job_properties, job.media_properties, input_frame_size,
+                                                  transformer, frame_pool)
+    transformer = _add_resizer_if_needed(job.job_properties, transformer, frame_pool)
+    return _add_tensor_converter_if_needed(job.job_properties, transformer, frame_pool)
+
+
+
+def _add_resizer_if_needed(job_properties, current_transformer, frame_pool):
+    affine_transformer_types = (AffineFrameTransformer, FeedForwardExactRegionAffineTransformer)
+    if isinstance(current_transformer, affine_transformer_types):
+        # The affine transformers resize the frame as part of the same warp that rotates it.
+        return current_transformer
+
+    model_input_size = _get_model_input_size(job_properties)
+    if model_input_size is not None:
+        # The frame will be resized to the model input size anyway, so DECODE_MAX_DIMENSION is not used.
+        return ModelInputResizer(model_input_size, _get_fill_color(job_properties), current_transformer,
+                                 frame_pool, _get_interpolation(job_properties, cv2.INTER_LINEAR))
+
+    max_dimension = _get_decode_max_dimension(job_properties)
+    if max_dimension < 1:
+        return current_transformer
+    # INTER_AREA is recommended by OpenCV for shrinking images because it avoids moire patterns.
+    return FrameResizer(max_dimension, current_transformer, frame_pool,
+                        _get_interpolation(job_properties, cv2.INTER_AREA))
+
+
+
+def _add_tensor_converter_if_needed(job_properties, current_transformer, frame_pool):
+    tensor_format = _get_model_tensor_format(job_properties)
+    if tensor_format is None:
+        return current_transformer
+    return ModelTensorConverter(tensor_format, current_transformer, frame_pool)
+
+
+
+_MODEL_TENSOR_PROPERTIES = ('MODEL_INPUT_CHANNEL_ORDER', 'MODEL_INPUT_DTYPE', 'MODEL_INPUT_MEAN',
+                            'MODEL_INPUT_STD', 'MODEL_INPUT_LAYOUT')
 
+_MODEL_TENSOR_DTYPES = {
+    'UINT8': np.dtype(np.uint8),
+    'FLOAT16': np.dtype(np.float16),
+    'FLOAT32': np.dtype(np.float32),
+}
 
+def _get_model_tensor_format(job_properties) -> Optional[ModelTensorFormat]:
+    # The conversion is opt-in because components that do not set any of the properties expect BGR images.
+    if not any(job_properties.get(p) for p in _MODEL_TENSOR_PROPERTIES):
+        return None
+    std = _get_channel_values(job_properties, 'MODEL_INPUT_STD', 1.0)
+    if 0 in std:
+        raise mpf.DetectionError.INVALID_PROPERTY.exception(
+            'The "MODEL_INPUT_STD" property must not contain zero, '
+            f'but it was set to "{job_properties["MODEL_INPUT_STD"]}".')
+    return ModelTensorFormat(
+        _get_choice(job_properties, 'MODEL_INPUT_CHANNEL_ORDER', ('BGR', 'RGB'), 'BGR'),
+        _MODEL_TENSOR_DTYPES[_get_choice(job_properties, 'MODEL_INPUT_DTYPE', _MODEL_TENSOR_DTYPES, 'FLOAT32')],
+        _get_channel_values(job_properties, 'MODEL_INPUT_MEAN', 0.0),
+        std,
+        _get_choice(job_properties, 'MODEL_INPUT_LAYOUT', ('HWC', 'CHW'), 'HWC'))
+
+
+def _get_choice(job_properties: Mapping[str, str], property_name: str, choices: Iterable[str],
+                default: str) -> str:
+    value = job_properties.get(property_name)
+    if not value:
+        return default
+    if value.upper() not in choices:
+        raise mpf.DetectionError.INVALID_PROPERTY.exception(
+            f'Expected the "{property_name}" property to be one of {", ".join(choices)}, '
+            f'but it was set to "{value}".')
+    return value.upper()
+
+
+def _get_channel_values(job_properties: Mapping[str, str], property_name: str,
+                        default: float) -> Tuple[float, float, float]:
+    value = job_properties.get(property_name)
+    if not value:
+        return (default,) * 3
+    try:
+        channel_values = [float(v) for v in value.split(',')]
+    except ValueError:
+        channel_values = []
+    if len(channel_values) == 1:
+        return (channel_values[0],) * 3
+    if len(channel_values) == 3:
+        return tuple(channel_values)  # type: ignore
+    raise mpf.DetectionError.INVALID_PROPERTY.exception(
+        f'Expected the "{property_name}" property to be either a single number or three comma separated numbers, '
+        f'but it was set to "{value}".')
 
-def _add_transformers_if_needed(job_properties, media_properties, input_video_size, current_transformer):
+
+
+def _get_decode_max_dimension(job_properties):
+    return utils.get_property(job_properties, 'DECODE_MAX_DIMENSION', 0)
+
+
+
+def _get_model_input_size(job_properties) -> Optional[ModelInputSize]:
+    width = utils.get_property(job_properties, 'MODEL_INPUT_WIDTH', 0)
+    height = utils.get_property(job_properties, 'MODEL_INPUT_HEIGHT', 0)
+    if width < 1 and height < 1:
+        return None
+    if width < 1 or height < 1:
+        raise mpf.DetectionError.INVALID_PROPERTY.exception(
+            'The "MODEL_INPUT_WIDTH" and "MODEL_INPUT_HEIGHT" properties must both be positive when either is '
+            f'set, but they were set to "{width}" and "{height}".')
+    return ModelInputSize(width, height, utils.get_property(job_properties, 'LETTERBOX', False))
+
+
+
+def _precompute_rotation_maps_is_enabled(job_properties):
+    # FeedForwardExactRegionAffineTransformer is not affected because it uses a different transformation
+    # for each frame.
+    return utils.get_property(job_properties, 'ROTATION_PRECOMPUTE_MAPS', False)
+
+
+
+def _add_transformers_if_needed(job_properties, media_properties, input_video_size, current_transformer,
+                                frame_pool):
     _, rotation = _get_job_level_rotation(job_properties, media_properties)
     rotation = utils.normalize_angle(rotation)
 
@@ -82,7 +243,9 @@ def _add_transformers_if_needed(job_properties, media_properties, input_video_si
     if rotation_required or flip_required:
         return AffineFrameTransformer.search_region_on_rotated_frame(
             rotation, flip_required, _get_fill_color(job_properties), search_region,
-            current_transformer)
+            current_transformer, frame_pool, _get_decode_max_dimension(job_properties),
+            _precompute_rotation_maps_is_enabled(job_properties),
+            _get_interpolation(job_properties, cv2.INTER_CUBIC), _get_model_input_size(job_properties))
 
     frame_rect = utils.Rect.from_corner_and_size((0, 0), input_video_size)
     search_region_rect = search_region.get_rect(input_video_size)
@@ -94,7 +257,7 @@ def _add_transformers_if_needed(job_properties, media_properties, input_video_si
 
 def _add_feed_forward_transforms_if_needed(job_properties, media_properties, track_properties,
                                            detections: Dict[int, mpf.ImageLocation],
-                                           current_transformer):
+                                           current_transformer, frame_pool):
     if _search_region_cropping_is_enabled(job_properties):
         print('Both feed forward cropping and search region cropping properties were provided. '
               'Only feed forward cropping will occur.',
@@ -148,14 +311,19 @@ def _add_feed_forward_transforms_if_needed(job_properties, media_properties, tra
     if is_exact_region_mode:
         if any_detection_requires_rotation_or_flip:
             return FeedForwardExactRegionAffineTransformer(regions, _get_fill_color(job_properties),
-                                                           current_transformer)
+                                                           current_transformer, frame_pool,
+                                                           _get_decode_max_dimension(job_properties),
+                                                           _get_interpolation(job_properties, cv2.INTER_CUBIC),
+                                                           _get_model_input_size(job_properties))
         else:
             return FeedForwardFrameCropper(detections, current_transformer)
     else:
         if any_detection_requires_rotation_or_flip:
             return AffineFrameTransformer.rotated_superset_region(
                 regions, job_level_rotation, job_level_flip, _get_fill_color(job_properties),
-                current_transformer)
+                current_transformer, frame_pool, _get_decode_max_dimension(job_properties),
+                _precompute_rotation_maps_is_enabled(job_properties),
+                _get_interpolation(job_properties, cv2.INTER_CUBIC), _get_model_input_size(job_properties))
         else:
             superset_region = _get_superset_region_no_rotation(regions)
             return SearchRegionFrameCropper(superset_region, current_transformer)
@@ -229,6 +397,26 @@ def _get_fill_color(job_properties: Mapping[str, str]) -> Tuple[int, int, int]:
             f'but it was set to "{fill_color_name}".')
 
 
+_INTERPOLATION_FLAGS = {
+    'NEAREST': cv2.INTER_NEAREST,
+    'LINEAR': cv2.INTER_LINEAR,
+    'CUBIC': cv2.INTER_CUBIC,
+    'AREA': cv2.INTER_AREA,
+}
+
+def _get_interpolation(job_properties: Mapping[str, str], default: int) -> int:
+    interpolation_name = job_properties.get('ROTATION_INTERPOLATION')
+    if not interpolation_name:
+        return default
+
+    interpolation = _INTERPOLATION_FLAGS.get(interpolation_name.upper())
+    if interpolation is None:
+        raise mpf.DetectionError.INVALID_PROPERTY.exception(
+            'Expected the "ROTATION_INTERPOLATION" property to be one of '
+            f'{", ".join(_INTERPOLATION_FLAGS)}, but it was set to "{interpolation_name}".')
+    return interpolation
+
+
 def _get_search_region(job_properties):
     if not _search_region_cropping_is_enabled(job_properties):
         return SearchRegion()
@@ -0,0 +1,115 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+import mpf_component_api as mpf
+
+
+class ImageLocationBatch(object):
+    """
+    Column oriented view of the frame locations of a track. It allows frame transformers to reverse transform
+    all of the detections in a track using NumPy operations instead of transforming one detection at a time.
+    Rows may share the same detection_properties dict, so transformers must replace a row's dict rather than
+    modify it.
+    """
+
+    def __init__(self, frame_indices: np.ndarray, x: np.ndarray, y: np.ndarray, width: np.ndarray,
+                 height: np.ndarray, confidence: np.ndarray, detection_properties: List[Dict[str, str]],
+                 image_locations: Optional[Sequence[mpf.ImageLocation]] = None):
+        self.frame_indices = frame_indices
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.confidence = confidence
+        self.detection_properties = detection_properties
+        # When present, to_frame_locations updates these objects instead of creating new ones.
+        self.__image_locations = image_locations
+
+
+    @staticmethod
+    def from_frame_locations(frame_locations: Mapping[int, mpf.ImageLocation]) -> ImageLocationBatch:
+        image_locations = list(frame_locations.values())
+        return ImageLocationBatch(
+            np.fromiter(frame_locations.keys(), dtype=np.int64, count=len(frame_locations)),
+            np.array([il.x_left_upper for il in image_locations], dtype=np.int64),
+            np.array([il.y_left_upper for il in image_locations], dtype=np.int64),
+            np.array([il.width for il in image_locations], dtype=np.int64),
+            np.array([il.height for il in image_locations], dtype=np.int64),
+            np.array([il.confidence for il in image_locations], dtype=np.float64),
+            [il.detection_properties for il in image_locations],
+            image_locations)
+
+
+    def __len__(self):
+        return len(self.frame_indices)
+
+
+    def get_image_location(self, index: int) -> mpf.ImageLocation:
+        """
+        :param index: Row of the batch
+        :return: A new image location with the batch's current values for the given row. The
+                 detection_properties dict is a copy, so it can be safely modified.
+        """
+        return mpf.ImageLocation(int(self.x[index]), int(self.y[index]),
+                                 int(self.width[index]), int(self.height[index]),
+                                 float(self.confidence[index]), dict(self.detection_properties[index]))
+
+
+    def set_image_location(self, index: int, image_location: mpf.ImageLocation) -> None:
+        self.x[index] = image_location.x_left_upper
+        self.y[index] = image_location.y_left_upper
+        self.width[index] = image_location.width
+        self.height[index] = image_location.height
+        self.detection_properties[index] = image_location.detection_properties
+
+
+    def to_frame_locations(self, frame_indices: np.ndarray) -> Dict[int, mpf.ImageLocation]:
+        """
+        :param frame_indices: The frame index for each row of the batch
+        :return: Dict mapping the frame indices to image locations containing the batch's values. When the batch
+                 was created from image locations, those objects are updated and returned.
+        """
+        image_locations = self.__image_locations
+        if image_locations is None:
+            # Frame transformers do not modify the confidence, so it only needs to be set on new objects.
+            image_locations = [mpf.ImageLocation(0, 0, 0, 0, confidence) for confidence in self.confidence.tolist()]
+        columns = zip(frame_indices.tolist(), self.x.tolist(), self.y.tolist(), self.width.tolist(),
+                      self.height.tolist(), self.detection_properties, image_locations)
+        frame_locations = dict()
+        for frame_index, x, y, width, height, properties, image_location in columns:
+            image_location.x_left_upper = x
+            image_location.y_left_upper = y
+            image_location.width = width
+            image_location.height = height
+            image_location.detection_properties = properties
+            frame_locations[frame_index] = image_location
+        return frame_locations
@@ -0,0 +1,122 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import mpf_component_api as mpf
+from .frame_transformer import BaseDecoratedFrameTransformer, IFrameTransformer
+from .image_location_batch import ImageLocationBatch
+from .. import utils
+from ..frame_pool import FramePool, get_output_buffer
+
+
+class ModelTensorFormat(NamedTuple):
+    """
+    Describes the array a model expects as input.
+    """
+    # Either 'BGR' or 'RGB'
+    channel_order: str = 'BGR'
+    dtype: np.dtype = np.dtype(np.float32)
+    # Each channel is computed as (pixel - mean) / std. mean and std are in the model's channel order.
+    mean: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    std: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+    # Either 'HWC' or 'CHW'
+    layout: str = 'HWC'
+
+
+
+class ModelTensorConverter(BaseDecoratedFrameTransformer):
+    """
+    Converts frames to the array a model expects in a single pass. Doing the channel reordering, type conversion,
+    normalization, and transpose as separate NumPy or OpenCV operations creates a full size temporary array for
+    each step. Instead, each channel of an 8-bit frame is converted with a 256 element lookup table that is written
+    directly to its position in the output.
+
+    This is the last transformer in a chain because the output is no longer a BGR image. The frame geometry
+    does not change, so the reverse transform does nothing.
+    """
+
+    def __init__(self, tensor_format: ModelTensorFormat, inner_transform: IFrameTransformer,
+                 frame_pool: Optional[FramePool] = None):
+        super().__init__(inner_transform)
+        self.__format = tensor_format
+        self.__frame_pool = frame_pool
+        # Index of the frame channel that is used for each of the output channels.
+        self.__source_channels = (2, 1, 0) if tensor_format.channel_order == 'RGB' else (0, 1, 2)
+        pixel_values = np.arange(256, dtype=np.float64)
+        self.__lookup_tables = [_to_dtype((pixel_values - mean) / std, tensor_format.dtype)
+                                for mean, std in zip(tensor_format.mean, tensor_format.std)]
+
+
+    def get_frame_size(self, frame_index: int) -> utils.Size:
+        return self._get_inner_frame_size(frame_index)
+
+
+    def _do_frame_transform(self, frame: np.ndarray, frame_index: int) -> np.ndarray:
+        return self._do_frame_transform_into(frame, frame_index, None)
+
+
+    def _do_frame_transform_into(self, frame: np.ndarray, frame_index: int,
+                                 dst: Optional[np.ndarray]) -> np.ndarray:
+        height, width = frame.shape[:2]
+        if self.__format.layout == 'CHW':
+            shape = (3, height, width)
+        else:
+            shape = (height, width, 3)
+        output = get_output_buffer(shape, self.__format.dtype, dst, self.__frame_pool)
+
+        for output_channel, source_channel in enumerate(self.__source_channels):
+            if self.__format.layout == 'CHW':
+                dst = output[output_channel]
+            else:
+                dst = output[..., output_channel]
+            src = frame[..., source_channel]
+            if frame.dtype == np.uint8:
+                # mode='clip' prevents NumPy from buffering the output.
+                np.take(self.__lookup_tables[output_channel], src, out=dst, mode='clip')
+            else:
+                dst[...] = _to_dtype((src - self.__format.mean[output_channel]) / self.__format.std[output_channel],
+                                     self.__format.dtype)
+        return output
+
+
+    def _do_reverse_transform(self, image_location: mpf.ImageLocation, frame_index: int) -> None:
+        pass
+
+
+    def _do_reverse_transform_batch(self, batch: ImageLocationBatch) -> None:
+        pass
+
+
+
+def _to_dtype(values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        values = np.clip(np.rint(values), info.min, info.max)
+    return values.astype(dtype)
+
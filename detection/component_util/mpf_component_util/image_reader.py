@@ -25,32 +25,38 @@
 #############################################################################
 
 import abc
-from typing import Iterable
+import collections
+import concurrent.futures
+import os
+from typing import Iterable, Iterator, Optional, Tuple, Union
 
 import cv2
 import numpy as np
 
 from . import frame_transformers
 from . import utils
+from .tiff_region_reader import TiffRegionReader
 import mpf_component_api as mpf
 
 
 class ImageReader(object):
 
     def __init__(self, image_job: mpf.ImageJob):
-        video_cap = cv2.VideoCapture(image_job.data_uri)
-        video_cap.set(cv2.CAP_PROP_ORIENTATION_AUTO, 0)
-        if not video_cap.isOpened():
-            raise mpf.DetectionError.COULD_NOT_OPEN_MEDIA.exception(
-                f'Failed to open "{image_job.data_uri}".')
-
-        was_read, image = video_cap.read()
-        if not was_read or image is None:
-            raise mpf.DetectionError.COULD_NOT_READ_MEDIA.exception(
-                f'Failed to read image from "{image_job.data_uri}".')
-
-        size = utils.Size.from_frame(image)
-        self.__frame_transformer = frame_transformers.factory.get_transformer(image_job, size)
+        tiff_reader = TiffRegionReader.open(image_job.data_uri)
+        if tiff_reader is None:
+            image = _read_image(image_job.data_uri)
+            size = utils.Size.from_frame(image)
+            self.__frame_transformer = frame_transformers.factory.get_transformer(image_job, size)
+        else:
+            with tiff_reader:
+                # The image size is in the TIFF header, so the frame transformer can be created before decoding
+                # the image. When the job crops the image, only the cropped region gets decoded.
+                self.__frame_transformer = frame_transformers.factory.get_transformer(image_job, tiff_reader.size)
+                region = self.__frame_transformer.get_decode_region(0)
+                if region is not None and region.area > 0:
+                    image = tiff_reader.read(region)
+                else:
+                    image = _read_image(image_job.data_uri)
         self.__image = self.__frame_transformer.transform_frame(image, 0)
 
     def get_image(self) -> np.ndarray:
@@ -61,6 +67,102 @@ class ImageReader(object):
 
 
 
+def _read_image(data_uri: str) -> np.ndarray:
+    # cv2.imread is much faster than cv2.VideoCapture for formats like PNG and TIFF because FFmpeg's decoders for
+    # them are slower than the ones in OpenCV's image codecs. cv2.haveImageReader only checks the file's signature,
+    # so formats OpenCV's image codecs do not support (e.g. GIF) and URLs still go through cv2.VideoCapture.
+    # JPEGs also use cv2.VideoCapture because FFmpeg's JPEG decoder is at least as fast as libjpeg-turbo and
+    # the decoders round some pixel values differently.
+    if cv2.haveImageReader(data_uri) and not _is_jpeg(data_uri):
+        image = _read_with_image_codec(data_uri)
+        if image is not None:
+            return image
+    return _read_with_video_capture(data_uri)
+
+
+def _is_jpeg(path: str) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(3) == b'\xff\xd8\xff'
+    except OSError:
+        return False
+
+
+def _read_with_image_codec(data_uri: str) -> Optional[np.ndarray]:
+    # IMREAD_IGNORE_ORIENTATION matches setting CAP_PROP_ORIENTATION_AUTO to 0 in _read_with_video_capture.
+    # The orientation is applied by the frame transformers using the ROTATION and HORIZONTAL_FLIP media properties.
+    return cv2.imread(data_uri, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+
+
+def _read_with_video_capture(data_uri: str) -> np.ndarray:
+    video_cap = cv2.VideoCapture(data_uri)
+    video_cap.set(cv2.CAP_PROP_ORIENTATION_AUTO, 0)
+    if not video_cap.isOpened():
+        raise mpf.DetectionError.COULD_NOT_OPEN_MEDIA.exception(
+            f'Failed to open "{data_uri}".')
+
+    was_read, image = video_cap.read()
+    if not was_read or image is None:
+        raise mpf.DetectionError.COULD_NOT_READ_MEDIA.exception(
+            f'Failed to read image from "{data_uri}".')
+    return image
+
+
+
+def read_images(image_jobs: Iterable[mpf.ImageJob], max_workers: Optional[int] = None, ordered: bool = True,
+                return_exceptions: bool = False) -> Iterator[Tuple[mpf.ImageJob, Union[ImageReader, Exception]]]:
+    """
+    Creates an ImageReader for each job using a thread pool. OpenCV releases the GIL while decoding, so multiple
+    images are decoded and transformed concurrently. To limit memory usage, at most 2 * max_workers images are
+    decoded ahead of the caller.
+
+    :param image_jobs: The jobs to read images for. Jobs are only taken from the iterable when there is room for
+                       them, so it may be a generator.
+    :param max_workers: Number of threads to use. Defaults to the same value as ThreadPoolExecutor.
+    :param ordered: When true, results are produced in the same order as image_jobs. Otherwise, results are
+                    produced as soon as they are ready.
+    :param return_exceptions: When true, an image that can not be read produces a (job, exception) pair.
+                              Otherwise, the exception is raised.
+    :return: Iterator of (job, ImageReader) pairs
+    """
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+    max_pending = 2 * max_workers
+    job_iter = iter(image_jobs)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        # Insertion order is submission order.
+        pending: collections.OrderedDict = collections.OrderedDict()
+
+        def submit_next():
+            job = next(job_iter, None)
+            if job is not None:
+                pending[executor.submit(ImageReader, job)] = job
+
+        try:
+            for _ in range(max_pending):
+                submit_next()
+            while pending:
+                if ordered:
+                    future = next(iter(pending))
+                else:
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    future = next(f for f in pending if f in done)
+                job = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    result = e
+                submit_next()
+                yield job, result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+
 class ImageReaderMixin(abc.ABC):
 
     def get_detections_from_image(self, image_job: mpf.ImageJob) -> Iterable[mpf.ImageLocation]:
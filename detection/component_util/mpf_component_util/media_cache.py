@@ -0,0 +1,239 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Dict, Mapping, NamedTuple, Optional, Union
+
+from . import utils
+from .frame_filters import seek_strategies
+from .frame_filters.key_frame_index import KeyFrameIndex
+
+
+# Caches information about media files that is expensive to discover, so that it can be shared by all of the
+# jobs that process the same media. The workflow manager often splits a single piece of media in to many
+# segment jobs, which may be run by different processes. Entries are keyed by MediaFileId, so modifying or
+# replacing a media file invalidates its entries. When the MEDIA_CACHE_DIR job property is set, entries are
+# also persisted to that directory so that they can be shared between processes.
+
+SeekStrategy = Union[seek_strategies.SetFramePositionSeek, seek_strategies.GrabSeek, seek_strategies.ReadSeek]
+
+
+class MediaFileId(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+
+    @staticmethod
+    def from_path(path: str) -> Optional['MediaFileId']:
+        """
+        :param path: Path to a media file
+        :return: The id of the media file or None if path does not refer to a local file
+        """
+        try:
+            stat_result = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return MediaFileId(os.path.abspath(path), stat_result.st_size, stat_result.st_mtime_ns)
+
+
+    def get_hash(self) -> str:
+        """
+        :return: A string derived from the file id that can be used as a file name
+        """
+        return hashlib.sha1(repr(tuple(self)).encode()).hexdigest()
+
+
+
+def get_cache_dir(job_properties: Mapping[str, str]) -> Optional[str]:
+    cache_dir = utils.get_property(job_properties, 'MEDIA_CACHE_DIR', '')
+    return cache_dir or None
+
+
+_SEEK_STRATEGY_TYPES = {t.__name__: t for t in (seek_strategies.SetFramePositionSeek,
+                                                seek_strategies.GrabSeek,
+                                                seek_strategies.ReadSeek)}
+
+_seek_strategy_memo: Dict[MediaFileId, str] = dict()
+_seek_strategy_memo_lock = threading.Lock()
+
+
+def get_seek_strategy(file_id: Optional[MediaFileId], cache_dir: Optional[str]) -> Optional[SeekStrategy]:
+    """
+    :param file_id: Id of the media file that will be read
+    :param cache_dir: Directory to check when the current process has not yet recorded a seek strategy
+    :return: A new instance of the seek strategy that was previously recorded for the media file, or None if
+             a seek strategy has not been recorded.
+    """
+    if file_id is None:
+        return None
+    with _seek_strategy_memo_lock:
+        strategy_name = _seek_strategy_memo.get(file_id)
+    if strategy_name is None and cache_dir is not None:
+        strategy_name = _read_cache_file(_get_seek_strategy_path(file_id, cache_dir))
+        if strategy_name is not None:
+            with _seek_strategy_memo_lock:
+                _seek_strategy_memo[file_id] = strategy_name
+
+    strategy_type = _SEEK_STRATEGY_TYPES.get(strategy_name)
+    return strategy_type() if strategy_type is not None else None
+
+
+def record_seek_strategy(file_id: Optional[MediaFileId], cache_dir: Optional[str],
+                         seek_strategy: SeekStrategy) -> None:
+    """
+    Records the seek strategy that successfully read frames from the media file.
+
+    :param file_id: Id of the media file that was read
+    :param cache_dir: Directory to persist the seek strategy to, or None to only record it for the current process
+    :param seek_strategy: The seek strategy that worked
+    """
+    if file_id is None:
+        return
+    strategy_name = type(seek_strategy).__name__
+    with _seek_strategy_memo_lock:
+        _seek_strategy_memo[file_id] = strategy_name
+    if cache_dir is not None:
+        _write_cache_file(_get_seek_strategy_path(file_id, cache_dir), strategy_name)
+
+
+def clear_seek_strategies() -> None:
+    """
+    Clears the seek strategies recorded by the current process. Persisted seek strategies are not removed.
+    """
+    with _seek_strategy_memo_lock:
+        _seek_strategy_memo.clear()
+
+
+def get_key_frame_index(media_path: str, job_properties: Mapping[str, str],
+                        max_frames: Optional[int] = None) -> KeyFrameIndex:
+    """
+    Gets the key frame index for the media from MEDIA_CACHE_DIR. When the index is not in the cache, the entire
+    media file is indexed and then added to the cache. If adding the index causes the cache to exceed
+    MEDIA_CACHE_MAX_SIZE_MB, the least recently used indexes are removed.
+
+    :param media_path: Path to the media
+    :param job_properties: Job properties containing the cache settings
+    :param max_frames: Maximum number of frames to index when MEDIA_CACHE_DIR is not set
+    :return: The key frame index
+    """
+    cache_dir = get_cache_dir(job_properties)
+    file_id = MediaFileId.from_path(media_path)
+    if cache_dir is None or file_id is None:
+        return KeyFrameIndex.from_media(media_path, max_frames)
+
+    index_dir = os.path.join(cache_dir, 'key_frame_indexes')
+    index_path = os.path.join(index_dir, file_id.get_hash() + '.npy')
+    try:
+        key_frame_index = KeyFrameIndex.load(index_path)
+        # The modification time is used to determine which indexes were least recently used.
+        os.utime(index_path)
+        return key_frame_index
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as err:
+        print(f'Failed to load key frame index from "{index_path}" due to: {err}', file=sys.stderr)
+
+    key_frame_index = KeyFrameIndex.from_media(media_path)
+    _write_cache_file(index_path, key_frame_index.save)
+    max_cache_bytes = utils.get_property(job_properties, 'MEDIA_CACHE_MAX_SIZE_MB', 256.0) * 1024 * 1024
+    _evict_least_recently_used(index_dir, max_cache_bytes, index_path)
+    return key_frame_index
+
+
+def _evict_least_recently_used(dir_path: str, max_bytes: int, keep_path: str) -> None:
+    entries = []
+    try:
+        with os.scandir(dir_path) as dir_iter:
+            for entry in dir_iter:
+                if not entry.name.endswith('.npy'):
+                    # Skip temporary files that are still being written.
+                    continue
+                try:
+                    stat_result = entry.stat()
+                except FileNotFoundError:
+                    # Another process evicted it.
+                    continue
+                entries.append((stat_result.st_mtime_ns, stat_result.st_size, entry.path))
+    except OSError as err:
+        print(f'Failed to list media cache directory "{dir_path}" due to: {err}', file=sys.stderr)
+        return
+
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        if path == keep_path:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            print(f'Failed to remove media cache file "{path}" due to: {err}', file=sys.stderr)
+            continue
+        total_bytes -= size
+
+
+def _get_seek_strategy_path(file_id: MediaFileId, cache_dir: str) -> str:
+    return os.path.join(cache_dir, 'seek_strategies', file_id.get_hash())
+
+
+def _read_cache_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+    except OSError as err:
+        print(f'Failed to read media cache file "{path}" due to: {err}', file=sys.stderr)
+        return None
+
+
+def _write_cache_file(path: str, content: Union[str, Callable[[BinaryIO], None]]) -> None:
+    """
+    :param path: Path to write to
+    :param content: Text to write, or a function that writes the file's content to the provided binary file
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so that other processes never see a partially written file.
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if isinstance(content, str):
+                    f.write(content.encode())
+                else:
+                    content(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError as err:
+        print(f'Failed to write media cache file "{path}" due to: {err}', file=sys.stderr)
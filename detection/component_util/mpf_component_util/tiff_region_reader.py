@@ -0,0 +1,147 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import math
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from . import utils
+
+try:
+    import tifffile
+except ImportError:
+    # Region decoding is only available when the optional tifffile package is installed.
+    tifffile = None
+
+
+class TiffRegionReader(object):
+    """
+    Decodes part of a TIFF image without decoding the rest of it. TIFF images are stored as independently
+    compressed tiles or strips, so only the tiles or strips that intersect the requested region need to be read
+    from disk and decompressed. This makes a large difference for very large images like satellite imagery.
+
+    Only the TIFF images that cv2.imread would decode to the same pixel values are supported, which are 8-bit
+    grayscale, RGB, and RGBA images with associated alpha.
+    """
+
+    def __init__(self, tiff_file: 'tifffile.TiffFile'):
+        self.__tiff_file = tiff_file
+        self.__page = tiff_file.pages[0]
+
+
+    @staticmethod
+    def open(path: str) -> Optional['TiffRegionReader']:
+        """
+        :param path: Path to the image that might be a TIFF
+        :return: A TiffRegionReader when path refers to a supported TIFF image, otherwise None
+        """
+        if tifffile is None:
+            return None
+        try:
+            tiff_file = tifffile.TiffFile(path)
+        except (OSError, tifffile.TiffFileError):
+            return None
+
+        if _is_supported(tiff_file.pages[0]):
+            return TiffRegionReader(tiff_file)
+        tiff_file.close()
+        return None
+
+
+    @property
+    def size(self) -> utils.Size:
+        return utils.Size(self.__page.imagewidth, self.__page.imagelength)
+
+
+    def read(self, region: utils.Rect) -> np.ndarray:
+        """
+        :param region: The region of the image to decode
+        :return: The decoded region in BGR order
+        """
+        page = self.__page
+        segment_height, segment_width = page.chunks[:2]
+        segments_per_row = math.ceil(page.imagewidth / segment_width)
+
+        output = np.empty((region.height, region.width, page.samplesperpixel), dtype=np.uint8)
+        file_handle = self.__tiff_file.filehandle
+        for segment_y in range(region.y // segment_height, math.ceil(region.br.y / segment_height)):
+            for segment_x in range(region.x // segment_width, math.ceil(region.br.x / segment_width)):
+                segment_idx = segment_y * segments_per_row + segment_x
+                file_handle.seek(page.dataoffsets[segment_idx])
+                data = file_handle.read(page.databytecounts[segment_idx])
+                segment, _, _ = page.decode(data, segment_idx)
+
+                segment_rect = utils.Rect(segment_x * segment_width, segment_y * segment_height,
+                                          segment_width, segment_height)
+                overlap = segment_rect.intersection(region)
+                output[overlap.y - region.y:overlap.br.y - region.y,
+                       overlap.x - region.x:overlap.br.x - region.x] = \
+                    segment[0, overlap.y - segment_rect.y:overlap.br.y - segment_rect.y,
+                            overlap.x - segment_rect.x:overlap.br.x - segment_rect.x]
+
+        return cv2.cvtColor(output, _COLOR_CONVERSIONS[page.samplesperpixel])
+
+
+    def close(self) -> None:
+        self.__tiff_file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+
+# Keyed on samples per pixel. cv2.imread drops the alpha channel when IMREAD_COLOR is used.
+_COLOR_CONVERSIONS = {
+    1: cv2.COLOR_GRAY2BGR,
+    3: cv2.COLOR_RGB2BGR,
+    4: cv2.COLOR_RGBA2BGR
+}
+
+
+def _is_supported(page) -> bool:
+    if page.dtype != np.uint8 or page.imagedepth != 1 or page.samplesperpixel not in _COLOR_CONVERSIONS:
+        return False
+    if page.samplesperpixel == 1:
+        if page.photometric != tifffile.PHOTOMETRIC.MINISBLACK:
+            return False
+    elif page.photometric != tifffile.PHOTOMETRIC.RGB or page.planarconfig != tifffile.PLANARCONFIG.CONTIG:
+        return False
+    elif page.samplesperpixel == 4 and tuple(page.extrasamples) != (tifffile.EXTRASAMPLE.ASSOCALPHA,):
+        # When the alpha channel is unassociated, cv2.imread multiplies the color channels by the alpha channel.
+        return False
+    if page.compression not in tifffile.TIFF.DECOMPRESSORS:
+        # Some compression schemes require the optional imagecodecs package.
+        return False
+    segment_height, segment_width = page.chunks[:2]
+    segment_count = math.ceil(page.imagelength / segment_height) * math.ceil(page.imagewidth / segment_width)
+    return len(page.dataoffsets) == segment_count
@@ -30,7 +30,7 @@ import dataclasses
 import operator
 import sys
 import typing
-from typing import (Callable, Mapping, NamedTuple, Optional, Sequence, Tuple, Union, TypeVar,
+from typing import (Callable, Dict, Iterator, Mapping, NamedTuple, Optional, Sequence, Tuple, Union, TypeVar,
                     Generic, Any)
 
 import cv2
@@ -46,24 +46,96 @@ def get_property(
         key: str,
         default_value: T,
         prop_type: Optional[Callable[[str], T]] = None) -> T:
-    if key not in properties:
-        return default_value
-
     if prop_type is None:
         prop_type = type(default_value)
 
-    value = properties[key]
-    if prop_type is bool:
-        return typing.cast(T, value.upper() == 'TRUE')
+    if isinstance(properties, JobProperties):
+        return properties.get_typed(key, default_value, prop_type)
+
+    if key not in properties:
+        return default_value
 
+    value = properties[key]
     try:
-        return prop_type(value)
+        return _convert_property(value, prop_type)
     except (TypeError, ValueError) as err:
-        print('Failed to convert the "%s" key with value "%s" to %s due to: %s' % (key, value, prop_type, err),
-              file=sys.stderr)
+        _print_conversion_error(key, value, prop_type, err)
         return default_value
 
 
+
+class JobProperties(Mapping[str, str]):
+    """
+    Read-only copy of a job's properties that converts each property to the requested type once. It can be used
+    anywhere a Mapping[str, str] of properties is accepted. get_property uses the cached values when it is passed
+    a JobProperties, so code that calls get_property for the same key many times only pays for the conversion
+    once. When a property can not be converted, the error is printed the first time and the default value is
+    returned every time.
+    """
+
+    # Cache entry for a value that could not be converted.
+    __CONVERSION_FAILED = object()
+    # Returned by the cache lookup when the value has not been converted yet.
+    __NOT_CONVERTED = object()
+
+    def __init__(self, properties: Mapping[str, str]):
+        self.__properties: Dict[str, str] = dict(properties)
+        self.__converted: Dict[Tuple[str, Callable[[str], Any]], Any] = dict()
+
+
+    def get_typed(self, key: str, default_value: T, prop_type: Optional[Callable[[str], T]] = None) -> T:
+        """
+        Same as get_property, but the converted value is cached.
+        """
+        if prop_type is None:
+            prop_type = type(default_value)
+        cache_key = (key, prop_type)
+        converted = self.__converted.get(cache_key, self.__NOT_CONVERTED)
+        if converted is self.__NOT_CONVERTED:
+            if key not in self.__properties:
+                return default_value
+            converted = self.__convert(key, prop_type)
+            self.__converted[cache_key] = converted
+        return default_value if converted is self.__CONVERSION_FAILED else converted
+
+
+    def __convert(self, key: str, prop_type: Callable[[str], Any]) -> Any:
+        value = self.__properties[key]
+        try:
+            return _convert_property(value, prop_type)
+        except (TypeError, ValueError) as err:
+            _print_conversion_error(key, value, prop_type, err)
+            return self.__CONVERSION_FAILED
+
+
+    def __getitem__(self, key: str) -> str:
+        return self.__properties[key]
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__properties)
+
+
+    def __len__(self) -> int:
+        return len(self.__properties)
+
+
+    def __repr__(self) -> str:
+        return f'JobProperties({self.__properties!r})'
+
+
+
+def _convert_property(value: str, prop_type: Callable[[str], T]) -> T:
+    if prop_type is bool:
+        return typing.cast(T, value.upper() == 'TRUE')
+    return prop_type(value)
+
+
+def _print_conversion_error(key: str, value: str, prop_type: Callable[[str], Any], err: Exception) -> None:
+    print('Failed to convert the "%s" key with value "%s" to %s due to: %s' % (key, value, prop_type, err),
+          file=sys.stderr)
+
+
 def dict_items_ordered_by_key(dict_, key=None, reverse=False):
     ordered_keys = sorted(dict_, key=key, reverse=reverse)
     return ((k, dict_[k]) for k in ordered_keys)
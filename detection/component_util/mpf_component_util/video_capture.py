@@ -25,16 +25,24 @@
 #############################################################################
 
 import abc
+import bisect
+import concurrent.futures
 import functools
+import queue
 import sys
-from typing import Iterable, Tuple, Optional, Sequence, Union
+import threading
+import weakref
+from typing import Iterable, Iterator, List, Tuple, Optional, Sequence, Union
 
 import cv2
 import numpy as np
 
 from . import frame_filters
 from . import frame_transformers
+from . import media_cache
 from . import utils
+from .columnar_video_track import ColumnarVideoTrack
+from .frame_pool import FramePool
 import mpf_component_api as mpf
 
 
@@ -47,7 +55,8 @@ class VideoCapture(Iterable[np.ndarray]):
 
     @__init__.register
     def _(self, video_job: mpf.VideoJob, enable_frame_transformers: bool = True,
-          enable_frame_filtering: bool = True):
+          enable_frame_filtering: bool = True, prefetch_frames: Optional[int] = None,
+          frame_pool_size: Optional[int] = None):
         """
         Initializes a new VideoCapture instance, using the frame transformers specified in job_properties,
         to be used for video processing jobs.
@@ -55,8 +64,24 @@ class VideoCapture(Iterable[np.ndarray]):
         :param video_job:
         :param enable_frame_transformers: Automatically transform frames based on job properties
         :param enable_frame_filtering: Automatically skip frames based on job properties
+        :param prefetch_frames: Maximum number of frames to decode ahead of the caller on a background thread.
+                                When None, the PREFETCH_FRAMES job property is used. 0 disables prefetching.
+        :param frame_pool_size: Maximum number of frame buffers to reuse across reads. A buffer is only reused
+                                once the caller no longer references the frame read in to it. When None, the
+                                FRAME_POOL_SIZE job property is used. 0 disables frame reuse.
         """
         self.__video_path = video_job.data_uri
+        if prefetch_frames is None:
+            prefetch_frames = utils.get_property(video_job.job_properties, 'PREFETCH_FRAMES', 0)
+        self.__prefetch_frames = max(0, prefetch_frames)
+        if frame_pool_size is None:
+            frame_pool_size = utils.get_property(video_job.job_properties, 'FRAME_POOL_SIZE', 0)
+        self.__frame_pool = FramePool(frame_pool_size) if frame_pool_size > 0 else None
+        self.__prefetcher: Optional[_FramePrefetcher] = None
+        # Original position of the next frame the caller will receive when frames are being prefetched.
+        self.__prefetch_frame_position = 0
+        # Prevents the prefetch thread from using self.__cv_video_capture at the same time as the caller.
+        self.__cv_video_capture_lock = threading.Lock()
         self.__cv_video_capture = cv2.VideoCapture(video_job.data_uri)
         self.__cv_video_capture.set(cv2.CAP_PROP_ORIENTATION_AUTO, 0)
         if not self.__cv_video_capture.isOpened():
@@ -65,10 +90,25 @@ class VideoCapture(Iterable[np.ndarray]):
 
         self.__frame_filter = self.__get_frame_filter(enable_frame_filtering, video_job, self.__cv_video_capture)
         self.__frame_transformer = self.__get_frame_transformer(enable_frame_transformers, video_job)
-        if utils.get_property(video_job.media_properties, 'HAS_CONSTANT_FRAME_RATE', False):
-            self.__seek_strategy = frame_filters.SetFramePositionSeek()
-        else:
-            self.__seek_strategy = frame_filters.GrabSeek()
+        # Stored because __read_and_transform is called while self.__cv_video_capture_lock is held.
+        self.__decoded_frame_shape = (self.original_frame_size.height, self.original_frame_size.width, 3)
+
+        self.__media_file_id = media_cache.MediaFileId.from_path(video_job.data_uri)
+        self.__media_cache_dir = media_cache.get_cache_dir(video_job.job_properties)
+        # When an earlier job needed to fall back to a different seek strategy for the same media,
+        # start with the strategy that worked instead of discovering that seeking is broken again.
+        self.__seek_strategy = media_cache.get_seek_strategy(self.__media_file_id, self.__media_cache_dir)
+        if self.__seek_strategy is None:
+            self.__seek_strategy = self.__get_initial_seek_strategy(video_job)
+        # Set after falling back to a different seek strategy, so the strategy can be recorded once it is
+        # known to work.
+        self.__should_record_seek_strategy = False
+
+        # Reused by read_batch so that reading batches does not allocate new arrays for every batch.
+        self.__batch_frames: Optional[np.ndarray] = None
+        # Size reported by the frame transformer for the frames in self.__batch_frames.
+        self.__batch_frame_size: Optional[utils.Size] = None
+        self.__batch_frame_indices: Optional[np.ndarray] = None
 
         # VideoCapture keeps track of the frame position instead of depending on
         # cv2.VideoCapture.get(cv2.CAP_PROP_POS_FRAMES) because for certain videos
@@ -84,18 +124,66 @@ class VideoCapture(Iterable[np.ndarray]):
 
 
     def read(self) -> Tuple[bool, Optional[np.ndarray]]:
-        original_pos_before_read = self.__frame_position
-        if self.__frame_filter.is_past_end_of_segment(original_pos_before_read):
-            return False, None
+        if self.__prefetch_frames > 0:
+            return self.__read_prefetched()
+        return self.__read_next()
 
-        was_read, frame = self.__read_and_transform()
-        if was_read:
-            self.__move_to_next_frame_in_segment()
-            return was_read, frame
 
-        if self.__seek_fallback() and self.__update_original_frame_position(original_pos_before_read):
-            return self.read()
-        return False, None
+    def read_batch(self, batch_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reads up to batch_size frames into a single contiguous array with shape (N, H, W, C). Fewer than
+        batch_size frames are returned when the end of the segment is reached or when the next frame is a
+        different size than the frames already in the batch, which can happen with feed forward jobs.
+
+        The returned arrays are views in to buffers owned by this VideoCapture. They will be overwritten
+        by the next call to read_batch, so they must be copied if they are needed after that.
+
+        :param batch_size: Maximum number of frames to read
+        :return: Tuple containing the frames and an array with the segment frame index of each frame.
+                 Both arrays have a length of 0 when there are no more frames to read.
+        """
+        batch_frame_size = None
+        num_read = 0
+        while num_read < batch_size:
+            if self.__frame_filter.is_past_end_of_segment(self.__caller_frame_position):
+                break
+            frame_index = self.current_frame_position
+            frame_size = self.__frame_transformer.get_frame_size(frame_index)
+            if batch_frame_size is None:
+                batch_frame_size = frame_size
+            elif frame_size != batch_frame_size:
+                break
+
+            # Once the batch buffer's shape is known, frames are decoded or transformed directly in to it.
+            batch_slot = self.__get_batch_slot(batch_size, frame_size, num_read)
+            if self.__prefetch_frames > 0:
+                was_read, frame = self.__read_prefetched()
+            else:
+                was_read, frame = self.__read_next(batch_slot)
+            if not was_read:
+                break
+            if frame is not batch_slot:
+                if num_read == 0:
+                    self.__prepare_batch_buffers(batch_size, frame, frame_size)
+                self.__batch_frames[num_read] = frame
+            self.__batch_frame_indices[num_read] = frame_index
+            num_read += 1
+
+        if num_read == 0:
+            return self.__get_empty_batch()
+        return self.__batch_frames[:num_read], self.__batch_frame_indices[:num_read]
+
+
+    def iter_batches(self, batch_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Repeatedly calls read_batch until there are no frames left. See read_batch for a description of
+        the values produced.
+        """
+        while True:
+            frames, frame_indices = self.read_batch(batch_size)
+            if len(frame_indices) == 0:
+                return
+            yield frames, frame_indices
 
 
     def __iter__(self) -> 'VideoCapture':
@@ -114,6 +202,7 @@ class VideoCapture(Iterable[np.ndarray]):
 
 
     def release(self) -> None:
+        self.__stop_prefetching(restore_position=False)
         self.__cv_video_capture.release()
 
 
@@ -126,13 +215,14 @@ class VideoCapture(Iterable[np.ndarray]):
         if frame_index < 0 or frame_index >= self.__frame_filter.get_segment_frame_count():
             return False
 
+        self.__stop_prefetching()
         original_position = self.__frame_filter.segment_to_original_frame_position(frame_index)
         return self.__update_original_frame_position(original_position)
 
 
     @property
     def current_frame_position(self) -> int:
-        return self.__frame_filter.original_to_segment_frame_position(self.__frame_position)
+        return self.__frame_filter.original_to_segment_frame_position(self.__caller_frame_position)
 
 
     @property
@@ -155,20 +245,22 @@ class VideoCapture(Iterable[np.ndarray]):
 
     @property
     def frame_position_ratio(self) -> float:
-        return self.__frame_filter.get_segment_frame_position_ratio(self.__frame_position)
+        return self.__frame_filter.get_segment_frame_position_ratio(self.__caller_frame_position)
 
 
     def set_frame_position_ratio(self, position_ratio: float) -> bool:
         if position_ratio < 0 or position_ratio > 1:
             return False
         frame_position = self.__frame_filter.ratio_to_original_frame_position(position_ratio)
+        self.__stop_prefetching()
         return self.__update_original_frame_position(frame_position)
 
 
     @property
     def current_time_in_millis(self) -> float:
         original_frame_rate = self.__get_property(cv2.CAP_PROP_FPS)
-        return self.__frame_filter.get_current_segment_time_in_millis(self.__frame_position, original_frame_rate)
+        return self.__frame_filter.get_current_segment_time_in_millis(self.__caller_frame_position,
+                                                                       original_frame_rate)
 
 
     def set_frame_position_in_millis(self, millis: float) -> bool:
@@ -204,6 +296,8 @@ class VideoCapture(Iterable[np.ndarray]):
         elif property_id == cv2.CAP_PROP_POS_MSEC:
             return self.set_frame_position_in_millis(value)
         else:
+            # Frames that were already prefetched would not reflect the new property value.
+            self.__stop_prefetching()
             return self.__set_property(property_id, value)
 
 
@@ -212,18 +306,21 @@ class VideoCapture(Iterable[np.ndarray]):
         return int(self.__get_property(cv2.CAP_PROP_FOURCC))
 
 
-    def reverse_transform(self, video_track: mpf.VideoTrack) -> None:
+    def reverse_transform(self, video_track: Union[mpf.VideoTrack, ColumnarVideoTrack]) -> None:
         video_track.start_frame = self.__frame_filter.segment_to_original_frame_position(video_track.start_frame)
         video_track.stop_frame = self.__frame_filter.segment_to_original_frame_position(video_track.stop_frame)
 
-        new_frame_locations = dict()
-        for frame_pos, image_loc in video_track.frame_locations.items():
-            self.__frame_transformer.reverse_transform(image_loc, frame_pos)
-
-            fixed_frame_index = self.__frame_filter.segment_to_original_frame_position(frame_pos)
-            new_frame_locations[fixed_frame_index] = image_loc
-
-        video_track.frame_locations = new_frame_locations
+        # Tracks can contain hundreds of thousands of detections, so all of them are transformed at once.
+        if isinstance(video_track, ColumnarVideoTrack):
+            batch = video_track.to_image_location_batch()
+        else:
+            batch = frame_transformers.ImageLocationBatch.from_frame_locations(video_track.frame_locations)
+        self.__frame_transformer.reverse_transform_batch(batch)
+        original_positions = self.__frame_filter.segment_to_original_frame_positions(batch.frame_indices)
+        if isinstance(video_track, ColumnarVideoTrack):
+            video_track.update_from_image_location_batch(batch, original_positions)
+        else:
+            video_track.frame_locations = batch.to_frame_locations(original_positions)
 
 
     def get_initialization_frames_if_available(self, num_requested_frames: int) -> Sequence[np.ndarray]:
@@ -241,6 +338,7 @@ class VideoCapture(Iterable[np.ndarray]):
         if num_frames_to_get < 1:
             return ()
 
+        self.__stop_prefetching()
         initial_frame_pos = self.__frame_position
 
         first_init_frame_idx = self.__frame_filter.segment_to_original_frame_position(-1 * num_frames_to_get)
@@ -249,7 +347,7 @@ class VideoCapture(Iterable[np.ndarray]):
 
         initialization_frames = []
         for i in range(num_frames_to_get):
-            was_read, frame = self.read()
+            was_read, frame = self.__read_next()
             if was_read:
                 initialization_frames.append(frame)
 
@@ -262,32 +360,143 @@ class VideoCapture(Iterable[np.ndarray]):
 
 
     def __get_property(self, property_id: int) -> float:
-        return self.__cv_video_capture.get(property_id)
+        with self.__cv_video_capture_lock:
+            return self.__cv_video_capture.get(property_id)
 
 
     def __set_property(self, property_id: int, value: float) -> bool:
-        return self.__cv_video_capture.set(property_id, value)
+        with self.__cv_video_capture_lock:
+            return self.__cv_video_capture.set(property_id, value)
+
+
+    def __get_batch_slot(self, batch_size: int, frame_size: utils.Size, index: int) -> Optional[np.ndarray]:
+        frames = self.__batch_frames
+        if (frames is None or len(frames) < batch_size or frame_size != self.__batch_frame_size
+                or len(self.__batch_frame_indices) < batch_size):
+            return None
+        return frames[index]
+
+
+    def __prepare_batch_buffers(self, batch_size: int, frame: np.ndarray, frame_size: utils.Size) -> None:
+        # The shape and type come from the transformed frame, because transformers like ModelTensorConverter
+        # change the layout and type of the frames.
+        frames = self.__batch_frames
+        if (frames is None or len(frames) < batch_size or frames.shape[1:] != frame.shape
+                or frames.dtype != frame.dtype):
+            self.__batch_frames = np.empty((batch_size, *frame.shape), dtype=frame.dtype)
+        self.__batch_frame_size = frame_size
+
+        if self.__batch_frame_indices is None or len(self.__batch_frame_indices) < batch_size:
+            self.__batch_frame_indices = np.empty(batch_size, dtype=np.int64)
+
+
+    def __get_empty_batch(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.__batch_frames is None:
+            # No frames have been transformed yet, so a blank frame is transformed to get the shape and type.
+            blank_frame = np.zeros(self.__decoded_frame_shape, dtype=np.uint8)
+            frame = self.__frame_transformer.transform_frame(blank_frame, max(0, self.current_frame_position - 1))
+            return np.empty((0, *frame.shape), dtype=frame.dtype), np.empty(0, dtype=np.int64)
+        return self.__batch_frames[:0], self.__batch_frame_indices[:0]
+
+
+    @property
+    def __caller_frame_position(self) -> int:
+        # When prefetching, self.__frame_position is the position of the prefetch thread, which is
+        # ahead of the frames the caller has received.
+        if self.__prefetcher is None:
+            return self.__frame_position
+        return self.__prefetch_frame_position
+
+
+    def __read_next(self, dst: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        :param dst: Optional array to decode or transform the frame in to. It is only used when it has the
+                    right shape and type.
+        """
+        while True:
+            original_pos_before_read = self.__frame_position
+            if self.__frame_filter.is_past_end_of_segment(original_pos_before_read):
+                return False, None
+
+            was_read, frame = self.__read_and_transform(dst)
+            if was_read:
+                if self.__should_record_seek_strategy:
+                    self.__should_record_seek_strategy = False
+                    media_cache.record_seek_strategy(self.__media_file_id, self.__media_cache_dir,
+                                                     self.__seek_strategy)
+                was_accepted = frame is not None
+                self.__move_to_next_frame_in_segment(was_accepted)
+                if was_accepted:
+                    return was_read, frame
+            elif not (self.__seek_fallback() and self.__update_original_frame_position(original_pos_before_read)):
+                return False, None
+
+
+    def __read_next_with_position(self) -> Tuple[bool, Optional[np.ndarray], int]:
+        with self.__cv_video_capture_lock:
+            was_read, frame = self.__read_next()
+            return was_read, frame, self.__frame_position
+
+
+    def __read_prefetched(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.__prefetcher is None:
+            self.__prefetch_frame_position = self.__frame_position
+            self.__prefetcher = _FramePrefetcher(self.__read_next_with_position, self.__prefetch_frames)
+        was_read, frame, position = self.__prefetcher.get()
+        if position is not None:
+            self.__prefetch_frame_position = position
+        return was_read, frame
+
+
+    def __stop_prefetching(self, restore_position=True) -> None:
+        """
+        Stops the prefetch thread and discards the frames it read ahead. When restore_position is true,
+        the underlying cv2.VideoCapture is moved back to the position of the next frame the caller would
+        have received, so the caller can not tell that frames were prefetched.
+        """
+        if self.__prefetcher is None:
+            return
+        self.__prefetcher.stop()
+        self.__prefetcher = None
+        if restore_position:
+            self.__update_original_frame_position(self.__prefetch_frame_position)
 
 
     def __get_frame_transformer(self, frame_transformers_enabled, video_job):
         if frame_transformers_enabled:
-            return frame_transformers.factory.get_transformer(video_job, self.original_frame_size)
+            return frame_transformers.factory.get_transformer(video_job, self.original_frame_size,
+                                                              self.__frame_pool)
         else:
             return frame_transformers.NoOpTransformer(self.original_frame_size)
 
 
-    def __read_and_transform(self):
-        was_read, frame = self.__cv_video_capture.read()
+    def __read_and_transform(self, dst: Optional[np.ndarray] = None):
+        if dst is not None and isinstance(self.__frame_transformer, frame_transformers.NoOpTransformer):
+            # The frame is not transformed, so it can be decoded directly in to dst. When the frame does not fit,
+            # cv2.VideoCapture.read allocates a new array.
+            was_read, frame = self.__cv_video_capture.read(image=dst)
+            dst = None
+        elif self.__frame_pool is None:
+            was_read, frame = self.__cv_video_capture.read()
+        else:
+            was_read, frame = self.__cv_video_capture.read(image=self.__frame_pool.get(self.__decoded_frame_shape))
         if was_read:
-            frame = self.__frame_transformer.transform_frame(frame, self.current_frame_position)
+            original_position = self.__frame_position
             self.__frame_position += 1
+            if not self.__frame_filter.accept_frame(frame, original_position):
+                # The frame filter skipped the frame, so there is no reason to transform it.
+                return was_read, None
+            segment_position = self.__frame_filter.original_to_segment_frame_position(original_position)
+            frame = self.__frame_transformer.transform_frame(frame, segment_position, dst)
         return was_read, frame
 
 
-    def __move_to_next_frame_in_segment(self):
+    def __move_to_next_frame_in_segment(self, was_accepted=True):
         if not self.__frame_filter.is_past_end_of_segment(self.__frame_position):
             seg_pos_before_read = self.__frame_filter.original_to_segment_frame_position(self.__frame_position - 1)
-            next_original_frame = self.__frame_filter.segment_to_original_frame_position(seg_pos_before_read + 1)
+            # A skipped frame maps to the segment position of the next frame in the segment.
+            next_segment_pos = seg_pos_before_read + 1 if was_accepted else seg_pos_before_read
+            next_original_frame = self.__frame_filter.segment_to_original_frame_position(next_segment_pos)
             # At this point a frame was successfully read. If self.__update_original_frame_position does not succeed
             # that means it is not possible to read any more frames from the video, so all future reads will fail
             self.__update_original_frame_position(next_original_frame)
@@ -301,6 +510,7 @@ class VideoCapture(Iterable[np.ndarray]):
         if self.__seek_strategy is None:
             return False
 
+        self.__should_record_seek_strategy = True
         self.__frame_position = 0
         self.__cv_video_capture.release()
         self.__cv_video_capture = cv2.VideoCapture(self.__video_path)
@@ -330,9 +540,24 @@ class VideoCapture(Iterable[np.ndarray]):
         return self.__seek_fallback() and self.__update_original_frame_position(requested_original_position)
 
 
+    @staticmethod
+    def __get_initial_seek_strategy(video_job):
+        if utils.get_property(video_job.media_properties, 'HAS_CONSTANT_FRAME_RATE', False):
+            return frame_filters.SetFramePositionSeek()
+
+        if utils.get_property(video_job.job_properties, 'USE_KEY_FRAME_SEEK', False):
+            try:
+                return frame_filters.KeyFrameSeek(
+                    media_cache.get_key_frame_index(video_job.data_uri, video_job.job_properties))
+            except (OSError, ValueError) as err:
+                print('Unable to build key frame index due to:', err, file=sys.stderr)
+                print('Falling back to GrabSeek', file=sys.stderr)
+        return frame_filters.GrabSeek()
+
+
     @staticmethod
     def __get_frame_filter(frame_filtering_enabled, video_job, cv_video_capture):
-        frame_count = VideoCapture.__get_frame_count(video_job, cv_video_capture)
+        frame_count = _get_frame_count(video_job, cv_video_capture)
         if not frame_filtering_enabled:
             return frame_filters.get_no_op_filter(frame_count)
 
@@ -349,38 +574,226 @@ class VideoCapture(Iterable[np.ndarray]):
                       % (video_job.job_name, first_track_frame, last_track_frame, video_job.start_frame,
                          video_job.stop_frame),
                       file=sys.stderr)
+            # The feed forward track specifies exactly which frames to process, so scene change filtering
+            # is not applied.
             return frame_filters.FeedForwardFrameFilter(video_job.feed_forward_track)
 
+        frame_filter = None
         if utils.get_property(video_job.job_properties, 'USE_KEY_FRAMES', False):
             try:
-                return frame_filters.KeyFrameFilter(video_job)
-            except OSError as err:
+                frame_filter = frame_filters.KeyFrameFilter(video_job)
+            except (OSError, ValueError) as err:
                 print('Unable to get key frames due to:', err, file=sys.stderr)
                 print('Falling back to IntervalFrameFilter', file=sys.stderr)
 
+        if frame_filter is None:
+            frame_filter = frame_filters.IntervalFrameFilter.from_job(video_job, frame_count)
+        return frame_filters.SceneChangeFrameFilter.from_job(video_job, frame_filter)
 
-        return frame_filters.IntervalFrameFilter.from_job(video_job, frame_count)
 
 
-    @staticmethod
-    def __get_frame_count(video_job, cv_video_capture):
-        frame_count = utils.get_property(video_job.media_properties, 'FRAME_COUNT', -1)
-        if frame_count > 0:
-            return frame_count
-        return int(cv_video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+def _get_frame_count(video_job: mpf.VideoJob, cv_video_capture: cv2.VideoCapture) -> int:
+    frame_count = utils.get_property(video_job.media_properties, 'FRAME_COUNT', -1)
+    if frame_count > 0:
+        return frame_count
+    return int(cv_video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+
+
+
+class _FramePrefetcher(object):
+    """
+    Calls read_func on a background thread and buffers up to max_frames of its results, so that decoding
+    the next frames overlaps with the caller processing the current frame. Reading stops after
+    read_func reports that a frame could not be read or raises an exception. The exception is re-raised
+    in the caller's thread when the caller reaches it.
+
+    The background thread only holds a weak reference to read_func's object so that an unreleased
+    VideoCapture can still be garbage collected.
+    """
+
+    _POLL_INTERVAL_SEC = 0.1
+
+    def __init__(self, read_func, max_frames: int):
+        self.__queue = queue.Queue(max_frames)
+        self.__stop_requested = threading.Event()
+        self.__final_result = None
+        self.__thread = threading.Thread(target=self.__run, args=(weakref.WeakMethod(read_func),),
+                                         name='VideoCapturePrefetch', daemon=True)
+        self.__thread.start()
+
+
+    def get(self):
+        if self.__final_result is not None:
+            return self.__final_result
+        result = self.__queue.get()
+        if isinstance(result, Exception):
+            # The frame position is unknown after an exception.
+            self.__final_result = (False, None, None)
+            raise result
+        if not result[0]:
+            self.__final_result = result
+        return result
+
+
+    def stop(self) -> None:
+        self.__stop_requested.set()
+        self.__thread.join()
+
+
+    def __run(self, weak_read_func) -> None:
+        while not self.__stop_requested.is_set():
+            read_func = weak_read_func()
+            if read_func is None:
+                return
+            try:
+                result = read_func()
+            except Exception as e:
+                result = e
+            del read_func
+
+            if not self.__put(result, weak_read_func):
+                return
+            if isinstance(result, Exception) or not result[0]:
+                return
+
+
+    def __put(self, result, weak_read_func) -> bool:
+        while not self.__stop_requested.is_set() and weak_read_func() is not None:
+            try:
+                self.__queue.put(result, timeout=self._POLL_INTERVAL_SEC)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+
+_VideoTrackType = Union[mpf.VideoTrack, ColumnarVideoTrack]
 
 
 
 class VideoCaptureMixin(abc.ABC):
 
-    def get_detections_from_video(self, video_job: mpf.VideoJob) -> Iterable[mpf.VideoTrack]:
+    def get_detections_from_video(self, video_job: mpf.VideoJob) -> Iterable[_VideoTrackType]:
+        """
+        get_detections_from_video_capture may return ColumnarVideoTrack objects instead of mpf.VideoTrack objects.
+        They are reverse transformed in the same way and are returned without being converted.
+
+        When the PARALLEL_SEGMENTS job property is greater than 1, the job's frame range is split in to that many
+        sub-ranges, preferably starting at key frames, and get_detections_from_video_capture is called
+        concurrently for each sub-range, each with its own VideoCapture. The tracks from each sub-range are
+        returned in order, but tracks are not merged across sub-range boundaries. Components that enable
+        PARALLEL_SEGMENTS must be able to handle concurrent calls to get_detections_from_video_capture.
+        Jobs with a feed forward track, USE_KEY_FRAMES, or a SCENE_CHANGE_THRESHOLD greater than 0 are always
+        processed sequentially. The scene change filter compares each frame to the previously emitted frame, so a
+        sub-range would not know which frame its first frame should be compared to.
+        """
+        num_segments = utils.get_property(video_job.job_properties, 'PARALLEL_SEGMENTS', 1)
+        if num_segments > 1 and _can_split_job(video_job):
+            sub_jobs = _split_job(video_job, num_segments)
+            if len(sub_jobs) > 1:
+                yield from self.__get_detections_from_sub_jobs(sub_jobs)
+                return
+        yield from self.__get_detections_sequentially(video_job)
+
+
+    def __get_detections_sequentially(self, video_job: mpf.VideoJob) -> Iterable[_VideoTrackType]:
         video_capture = VideoCapture(video_job)
         results = self.get_detections_from_video_capture(video_job, video_capture)
         for result in results:
             video_capture.reverse_transform(result)
             yield result
 
+
+    def __get_detections_from_sub_jobs(self, sub_jobs: Sequence[mpf.VideoJob]) -> Iterable[_VideoTrackType]:
+        # cv2.VideoCapture releases the GIL while decoding, so threads are enough to decode on multiple cores.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(sub_jobs)) as executor:
+            futures = [executor.submit(self.__get_sub_job_detections, sub_job) for sub_job in sub_jobs]
+            try:
+                for future in futures:
+                    yield from future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+    def __get_sub_job_detections(self, sub_job: mpf.VideoJob) -> List[_VideoTrackType]:
+        return list(self.__get_detections_sequentially(sub_job))
+
     @abc.abstractmethod
     def get_detections_from_video_capture(self, video_job: mpf.VideoJob, video_capture: VideoCapture) \
-            -> Iterable[mpf.VideoTrack]:
+            -> Iterable[_VideoTrackType]:
         raise NotImplementedError()
+
+
+
+def _can_split_job(video_job: mpf.VideoJob) -> bool:
+    return (video_job.feed_forward_track is None
+            and not utils.get_property(video_job.job_properties, 'USE_KEY_FRAMES', False)
+            and utils.get_property(video_job.job_properties, 'SCENE_CHANGE_THRESHOLD', 0.0) <= 0)
+
+
+def _split_job(video_job: mpf.VideoJob, num_segments: int) -> List[mpf.VideoJob]:
+    """
+    Splits video_job in to at most num_segments jobs that, combined, process the same frames as video_job.
+    Each sub-job starts on a frame that video_job would have processed, so FRAME_INTERVAL is respected.
+
+    :param video_job: The job to split
+    :param num_segments: The maximum number of sub-jobs to create
+    :return: The sub-jobs in frame order
+    """
+    frame_count = utils.get_property(video_job.media_properties, 'FRAME_COUNT', -1)
+    if frame_count <= 0:
+        cv_video_capture = cv2.VideoCapture(video_job.data_uri)
+        try:
+            frame_count = _get_frame_count(video_job, cv_video_capture)
+        finally:
+            cv_video_capture.release()
+
+    start_frame = video_job.start_frame
+    stop_frame = frame_filters.IntervalFrameFilter.get_stop_frame(video_job, frame_count)
+    frame_interval = frame_filters.IntervalFrameFilter.get_frame_interval(video_job)
+    segment_frame_count = frame_filters.IntervalFrameFilter(
+        start_frame, stop_frame, frame_interval).get_segment_frame_count()
+    num_segments = min(num_segments, segment_frame_count)
+    if num_segments < 2:
+        return [video_job]
+
+    key_frames = _get_all_key_frames(video_job._replace(stop_frame=stop_frame))
+    sub_job_starts = [start_frame]
+    for i in range(1, num_segments):
+        split_frame = start_frame + (segment_frame_count * i // num_segments) * frame_interval
+        if key_frames:
+            # Round up to the next frame that video_job would have processed.
+            key_frame_split = _round_up_to_interval(_get_closest(key_frames, split_frame), start_frame,
+                                                    frame_interval)
+            # When key frames are far apart, the closest one may be in the previous sub-job.
+            if key_frame_split > sub_job_starts[-1]:
+                split_frame = key_frame_split
+        if sub_job_starts[-1] < split_frame <= stop_frame:
+            sub_job_starts.append(split_frame)
+
+    sub_job_stops = [f - 1 for f in sub_job_starts[1:]] + [stop_frame]
+    return [video_job._replace(start_frame=start, stop_frame=stop)
+            for start, stop in zip(sub_job_starts, sub_job_stops)]
+
+
+def _get_all_key_frames(video_job: mpf.VideoJob) -> List[int]:
+    try:
+        # FRAME_INTERVAL is removed so that get_key_frames does not skip any key frames.
+        job_properties = {k: v for k, v in video_job.job_properties.items() if k != 'FRAME_INTERVAL'}
+        return frame_filters.KeyFrameFilter.get_key_frames(video_job._replace(job_properties=job_properties))
+    except (OSError, ValueError) as err:
+        print('Unable to get key frames due to:', err, file=sys.stderr)
+        print('The video segment will be split in to evenly sized parts.', file=sys.stderr)
+        return []
+
+
+def _round_up_to_interval(frame: int, start_frame: int, frame_interval: int) -> int:
+    return start_frame + -(-(frame - start_frame) // frame_interval) * frame_interval
+
+
+def _get_closest(sorted_values: Sequence[int], target: int) -> int:
+    idx = bisect.bisect_left(sorted_values, target)
+    candidates = sorted_values[max(0, idx - 1):idx + 1]
+    return min(candidates, key=lambda v: abs(v - target))
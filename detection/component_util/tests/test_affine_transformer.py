@@ -35,9 +35,13 @@ import numpy as np
 
 import mpf_component_api as mpf
 import mpf_component_util as mpf_util
-from mpf_component_util.frame_transformers.affine_frame_transformer import AffineFrameTransformer
+from mpf_component_util.frame_transformers.affine_frame_transformer import (
+    AffineFrameTransformer, FeedForwardExactRegionAffineTransformer, _RemapTableCache, _remap_table_cache)
+from mpf_component_util.frame_transformers.frame_cropper import FeedForwardFrameCropper, SearchRegionFrameCropper
+from mpf_component_util.frame_transformers.frame_resizer import FrameResizer, ModelInputResizer, ModelInputSize
 from mpf_component_util.frame_transformers.frame_transformer import NoOpTransformer
-from mpf_component_util.frame_transformers import frame_transformer_factory, SearchRegion, RegionEdge
+from mpf_component_util.frame_transformers import (
+    frame_transformer_factory, ImageLocationBatch, SearchRegion, RegionEdge)
 
 
 
@@ -178,6 +182,28 @@ class TestAffineTransformer(unittest.TestCase):
             self.assert_detections_same_location(new_detection, ff_detection)
 
 
+    def test_feed_forward_exact_region_shares_identical_regions(self):
+        region1 = mpf_util.RotatedRect(60, 300, 100, 40, 260, False)
+        region2 = mpf_util.RotatedRect(160, 350, 130, 20, 60, True)
+        transformer = FeedForwardExactRegionAffineTransformer(
+            (region1, region1, region2, region1), (0, 0, 0), NoOpTransformer(mpf_util.Size(640, 480)))
+        get_transform = transformer._FeedForwardExactRegionAffineTransformer__get_transform
+
+        self.assertIs(get_transform(0), get_transform(1))
+        self.assertIsNot(get_transform(1), get_transform(2))
+        self.assertEqual((100, 40), transformer.get_frame_size(3))
+        self.assertEqual((130, 20), transformer.get_frame_size(2))
+
+        for frame_index, region in enumerate((region1, region1, region2, region1)):
+            detection = mpf.ImageLocation(0, 0, int(region.width), int(region.height))
+            transformer.reverse_transform(detection, frame_index)
+            self.assertEqual((region.x, region.y, region.width, region.height),
+                             (detection.x_left_upper, detection.y_left_upper, detection.width, detection.height))
+
+        with self.assertRaises(IndexError):
+            transformer.get_frame_size(4)
+
+
     def test_feed_forward_superset_region(self):
         ff_track = mpf.VideoTrack(
             0, 2, -1,
@@ -481,6 +507,147 @@ class TestAffineTransformer(unittest.TestCase):
         self.assertEqual(img.shape, (30, 40, 3))
 
 
+    def test_reverse_transform_batch_matches_reverse_transform(self):
+        rng = np.random.default_rng(0)
+        frame_size = mpf_util.Size(640, 480)
+        ff_regions = [mpf_util.RotatedRect(int(rng.integers(0, 500)), int(rng.integers(0, 400)), 100, 40,
+                                           float(rng.choice((0, 20, 90, 137.5))), bool(rng.integers(2)))
+                      for _ in range(10)]
+        ff_locations = {i: mpf.ImageLocation(int(r.x), int(r.y), 100, 40) for i, r in enumerate(ff_regions)}
+        transformers = (
+            AffineFrameTransformer.rotate_full_frame(37.5, True, (0, 0, 0), NoOpTransformer(frame_size),
+                                                     max_output_dimension=300),
+            AffineFrameTransformer.rotate_full_frame(270, False, (0, 0, 0), NoOpTransformer(frame_size)),
+            FeedForwardExactRegionAffineTransformer(ff_regions, (0, 0, 0), NoOpTransformer(frame_size)),
+            FrameResizer(33, FeedForwardFrameCropper(ff_locations, NoOpTransformer(frame_size))),
+            SearchRegionFrameCropper(mpf_util.Rect(10, 20, 300, 200), NoOpTransformer(frame_size)),
+            ModelInputResizer(ModelInputSize(300, 300, True), (0, 0, 0), NoOpTransformer(frame_size)),
+            ModelInputResizer(ModelInputSize(320, 320), (0, 0, 0), NoOpTransformer(frame_size)),
+            AffineFrameTransformer.rotate_full_frame(20, False, (0, 0, 0), NoOpTransformer(frame_size),
+                                                     model_input_size=ModelInputSize(416, 416, True)),
+        )
+
+        for transformer in transformers:
+            frame_locations = {
+                i: mpf.ImageLocation(*(int(v) for v in rng.integers(0, 300, 4)), 0.5,
+                                     random_orientation_properties(rng))
+                for i in range(10)}
+            expected = {i: mpf.ImageLocation(il.x_left_upper, il.y_left_upper, il.width, il.height,
+                                             il.confidence, dict(il.detection_properties))
+                        for i, il in frame_locations.items()}
+            for frame_index, image_location in expected.items():
+                transformer.reverse_transform(image_location, frame_index)
+
+            batch = ImageLocationBatch.from_frame_locations(frame_locations)
+            transformer.reverse_transform_batch(batch)
+            actual = batch.to_frame_locations(batch.frame_indices)
+            self.assertEqual(expected, actual, type(transformer).__name__)
+            self.assertIs(frame_locations[3], actual[3])
+
+        # The feed forward transformers only have regions for the frames in the feed forward track.
+        for transformer in transformers[2:4]:
+            with self.assertRaises(IndexError):
+                transformer.reverse_transform_batch(
+                    ImageLocationBatch.from_frame_locations({10: mpf.ImageLocation(0, 0, 10, 10)}))
+
+
+    def test_model_input_size(self):
+        test_img_path = test_util.get_data_file_path('test_img.png')
+        job = mpf.ImageJob('test', test_img_path, dict(MODEL_INPUT_WIDTH='160', MODEL_INPUT_HEIGHT='160',
+                                                       LETTERBOX='true'), dict())
+        image_reader = mpf_util.ImageReader(job)
+        img = image_reader.get_image()
+        # The 320x200 image is scaled to 160x100 and centered vertically.
+        self.assertEqual((160, 160), mpf_util.Size.from_frame(img))
+        self.assertTrue((img[:30] == 0).all())
+        self.assertTrue((img[130:] == 0).all())
+        self.assertTrue((img[30:55, :] == 255).all())
+        # The middle black region is at Rect(80, 50, 160, 100) in the original image.
+        self.assertTrue((img[55:105, 40:120] == 0).all())
+        self.assert_reverse_transform(image_reader, (40, 55, 80, 50), (80, 50, 160, 100))
+
+        # The model input size takes precedence over DECODE_MAX_DIMENSION.
+        job.job_properties.update(LETTERBOX='false', DECODE_MAX_DIMENSION='100')
+        image_reader = mpf_util.ImageReader(job)
+        self.assertEqual((160, 160), mpf_util.Size.from_frame(image_reader.get_image()))
+        self.assert_reverse_transform(image_reader, (40, 40, 80, 80), (80, 50, 160, 100))
+
+        job.job_properties.update(MODEL_INPUT_WIDTH='0')
+        with self.assertRaises(mpf.DetectionException) as cm:
+            mpf_util.ImageReader(job)
+        self.assertEqual(mpf.DetectionError.INVALID_PROPERTY, cm.exception.error_code)
+
+
+    def test_model_input_size_is_part_of_rotation(self):
+        test_img_path = test_util.get_data_file_path('test_img.png')
+        job = mpf.ImageJob('test', test_img_path, dict(ROTATION='90', MODEL_INPUT_WIDTH='400',
+                                                       MODEL_INPUT_HEIGHT='400', LETTERBOX='true'), dict())
+        transformer = frame_transformer_factory.get_transformer(job, mpf_util.Size(320, 200))
+        # The frame is only resampled once because the resize is part of the rotation's warp.
+        self.assertIsInstance(transformer, AffineFrameTransformer)
+        self.assertEqual((400, 400), transformer.get_frame_size(0))
+
+        rotated_reader = mpf_util.ImageReader(mpf.ImageJob('test', test_img_path, dict(ROTATION='90'), dict()))
+        rotated = rotated_reader.get_image()
+        # The 200x320 rotated image is scaled by 1.25 to 250x400 and centered horizontally.
+        expected = np.zeros((400, 400, 3), dtype=np.uint8)
+        expected[:, 75:325] = cv2.resize(rotated, (250, 400), interpolation=cv2.INTER_NEAREST)
+        img = transformer.transform_frame(cv2.imread(test_img_path), 0)
+        # Only pixels on the edges of the black regions are blended differently.
+        self.assertLess(np.count_nonzero(np.abs(img.astype(int) - expected) > 64), 0.01 * img.size)
+
+        image_location = mpf.ImageLocation(75 + 25, 50, 50, 100)
+        transformer.reverse_transform(image_location, 0)
+        expected_location = mpf.ImageLocation(20, 40, 40, 80)
+        rotated_reader.reverse_transform(expected_location)
+        self.assertEqual(expected_location, image_location)
+
+
+    def test_large_downscale_in_rotation_does_not_alias(self):
+        # Alternating columns alias badly when only a few source pixels are sampled for each output pixel.
+        frame = np.zeros((1200, 1600, 3), dtype=np.uint8)
+        frame[:, ::2] = 255
+        frame[::3] = 80
+        for rotation in ('90', '30'):
+            folded = frame_transformer_factory.get_transformer(
+                mpf.ImageJob('test', 'test.png', dict(ROTATION=rotation, DECODE_MAX_DIMENSION='200'), dict()),
+                mpf_util.Size(1600, 1200))
+            unscaled = frame_transformer_factory.get_transformer(
+                mpf.ImageJob('test', 'test.png', dict(ROTATION=rotation), dict()), mpf_util.Size(1600, 1200))
+
+            img = folded.transform_frame(frame, 0)
+            # Same result as rotating at full resolution and then resizing with INTER_AREA.
+            expected = cv2.resize(unscaled.transform_frame(frame, 0), mpf_util.Size.from_frame(img),
+                                  interpolation=cv2.INTER_AREA)
+            self.assertLess(np.mean(np.abs(img.astype(int) - expected)), 5)
+
+
+    def test_rotated_letterbox_with_search_region(self):
+        frame = np.full((200, 400, 3), 200, dtype=np.uint8)
+        # The 200x100 search region is scaled by 0.5 when the model input size is 100, and it is not scaled
+        # when the model input size is 200, which uses _OrthogonalTransform instead of cv2.warpAffine.
+        for model_size, content_rows in ((100, slice(25, 75)), (200, slice(50, 150))):
+            job = mpf.ImageJob('test', 'test.png', dict(
+                ROTATION='90', MODEL_INPUT_WIDTH=str(model_size), MODEL_INPUT_HEIGHT=str(model_size),
+                LETTERBOX='true', SEARCH_REGION_ENABLE_DETECTION='true',
+                SEARCH_REGION_TOP_LEFT_X_DETECTION='0', SEARCH_REGION_TOP_LEFT_Y_DETECTION='0',
+                SEARCH_REGION_BOTTOM_RIGHT_X_DETECTION='200', SEARCH_REGION_BOTTOM_RIGHT_Y_DETECTION='100'),
+                dict())
+            transformer = frame_transformer_factory.get_transformer(job, mpf_util.Size(400, 200))
+            img = transformer.transform_frame(frame, 0)
+
+            # Pixels outside of the search region must not be used for the letterbox padding.
+            expected = np.zeros((model_size, model_size, 3), dtype=np.uint8)
+            expected[content_rows] = 200
+            self.assertTrue(np.array_equal(expected, img))
+
+
+    def assert_reverse_transform(self, image_reader, pre_transform_values, post_transform_values):
+        image_location = mpf.ImageLocation(*pre_transform_values)
+        image_reader.reverse_transform(image_location)
+        self.assertEqual(post_transform_values, mpf_util.Rect.from_image_location(image_location))
+
+
     def test_rotation_fill_color(self):
         test_img_path = test_util.get_data_file_path('rotation/hello-world.png')
 
@@ -496,6 +663,97 @@ class TestAffineTransformer(unittest.TestCase):
         img = mpf_util.ImageReader(job).get_image()
         self.assertTrue(np.array_equal(img[0, 0], (255, 255, 255)))
 
+
+    def test_rotation_interpolation(self):
+        # test_img.png only contains black and white pixels.
+        test_img_path = test_util.get_data_file_path('test_img.png')
+        job = mpf.ImageJob('test', test_img_path, dict(ROTATION='45', ROTATION_FILL_COLOR='WHITE'), dict())
+        img = mpf_util.ImageReader(job).get_image()
+        self.assertGreater(count_blended_pixels(img), 0)
+
+        for interpolation in ('NEAREST', 'nearest'):
+            job.job_properties['ROTATION_INTERPOLATION'] = interpolation
+            nearest_img = mpf_util.ImageReader(job).get_image()
+            self.assertEqual(img.shape, nearest_img.shape)
+            self.assertEqual(0, count_blended_pixels(nearest_img))
+
+        # The resize stage uses the same property.
+        job = mpf.ImageJob('test', test_img_path,
+                           dict(DECODE_MAX_DIMENSION='107', ROTATION_INTERPOLATION='NEAREST'), dict())
+        self.assertEqual(0, count_blended_pixels(mpf_util.ImageReader(job).get_image()))
+        job.job_properties['ROTATION_INTERPOLATION'] = 'AREA'
+        self.assertGreater(count_blended_pixels(mpf_util.ImageReader(job).get_image()), 0)
+
+        job.job_properties['ROTATION_INTERPOLATION'] = 'LANCZOS'
+        with self.assertRaises(mpf.DetectionException) as cm:
+            mpf_util.ImageReader(job)
+        self.assertEqual(mpf.DetectionError.INVALID_PROPERTY, cm.exception.error_code)
+
+
+    def test_orthogonal_rotation_matches_warp_affine(self):
+        frame = np.random.default_rng(0).integers(0, 256, (37, 53, 3), dtype=np.uint8)
+        frame_size = mpf_util.Size.from_frame(frame)
+        search_regions = (SearchRegion(),
+                          SearchRegion(RegionEdge.absolute(3), RegionEdge.absolute(5),
+                                       RegionEdge.absolute(30), RegionEdge.absolute(20)))
+        for rotation in (0, 90, 180, 270):
+            for flip in (False, True):
+                for search_region in search_regions:
+                    transformer = AffineFrameTransformer.search_region_on_rotated_frame(
+                        rotation, flip, (0, 0, 0), search_region, NoOpTransformer(frame_size))
+                    transformation = transformer._AffineFrameTransformer__transform
+                    expected = cv2.warpAffine(frame, transformation.reverse_transformation_matrix,
+                                              transformation.get_region_size(),
+                                              flags=cv2.WARP_INVERSE_MAP | cv2.INTER_CUBIC)
+                    self.assertTrue(np.array_equal(expected, transformer.transform_frame(frame, 0)),
+                                    f'rotation={rotation}, flip={flip}, search_region={search_region}')
+
+
+    def test_precomputed_maps_match_warp_affine(self):
+        self.addCleanup(_remap_table_cache.clear)
+        _remap_table_cache.clear()
+        frame = cv2.GaussianBlur(np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8),
+                                 (0, 0), 2)
+        frame_size = mpf_util.Size.from_frame(frame)
+        for rotation in (20, 137.5):
+            for flip in (False, True):
+                expected = AffineFrameTransformer.rotate_full_frame(
+                    rotation, flip, (255, 255, 255), NoOpTransformer(frame_size)).transform_frame(frame, 0)
+                actual = AffineFrameTransformer.rotate_full_frame(
+                    rotation, flip, (255, 255, 255), NoOpTransformer(frame_size),
+                    precompute_maps=True).transform_frame(frame, 0)
+                self.assertEqual(expected.shape, actual.shape)
+                # Both use fixed-point coordinates, but cv2.warpAffine computes them with slightly different
+                # rounding, so a few pixels along the edge of the frame may differ.
+                diff = cv2.absdiff(expected, actual)
+                self.assertLess(np.count_nonzero(diff > 1), diff.size * 0.001,
+                                f'rotation={rotation}, flip={flip}')
+        self.assertEqual(4, len(_remap_table_cache))
+
+        # Transformers with the same rotation share the remap tables.
+        AffineFrameTransformer.rotate_full_frame(20, False, (0, 0, 0), NoOpTransformer(frame_size),
+                                                 precompute_maps=True).transform_frame(frame, 0)
+        self.assertEqual(4, len(_remap_table_cache))
+
+
+    def test_remap_table_cache_evicts_least_recently_used(self):
+        # 10x10 output needs 10 * 10 * (4 + 2) = 600 bytes for its tables.
+        cache = _RemapTableCache(1300)
+        size = mpf_util.Size(10, 10)
+        matrices = [np.array(((1, 0, i), (0, 1, 0)), dtype=float) for i in range(3)]
+        first_tables = cache.get(matrices[0], size, cv2.INTER_CUBIC)
+        cache.get(matrices[1], size, cv2.INTER_CUBIC)
+        self.assertIs(first_tables, cache.get(matrices[0], size, cv2.INTER_CUBIC))
+        self.assertEqual(2, len(cache))
+
+        cache.get(matrices[2], size, cv2.INTER_CUBIC)
+        self.assertEqual(2, len(cache))
+        # matrices[1] was the least recently used, so it was evicted.
+        self.assertIs(first_tables, cache.get(matrices[0], size, cv2.INTER_CUBIC))
+        self.assertEqual(2, len(cache))
+        self.assertFalse(first_tables[0].flags.writeable)
+
+
     def test_auto_orientation_prefers_job_property(self):
         img_path = test_util.get_data_file_path('test_img.png')
         job = mpf.ImageJob('test', img_path,
@@ -531,6 +789,60 @@ class TestAffineTransformer(unittest.TestCase):
         self.assertTrue(test_util.is_all_black(img[170:, 300:]))
 
 
+    def test_transformer_cache(self):
+        frame_size = mpf_util.Size(640, 480)
+        job = mpf.ImageJob('test', 'image.png', dict(ROTATION='20', OTHER_PROPERTY='1'), dict(ROTATION='90'))
+        transformer = frame_transformer_factory.get_transformer(job, frame_size)
+        same_job = mpf.ImageJob('other', 'other.png', dict(ROTATION='20', OTHER_PROPERTY='2'), dict(ROTATION='90'))
+        self.assertIs(transformer, frame_transformer_factory.get_transformer(same_job, frame_size))
+
+        self.assertIsNot(transformer, frame_transformer_factory.get_transformer(job, mpf_util.Size(480, 640)))
+        job.job_properties['ROTATION_THRESHOLD'] = '30'
+        self.assertIsNot(transformer, frame_transformer_factory.get_transformer(job, frame_size))
+        self.assertIsNot(transformer, frame_transformer_factory.get_transformer(
+            mpf.ImageJob('test', 'image.png', dict(ROTATION='20'), dict(ROTATION='90', HORIZONTAL_FLIP='true')),
+            frame_size))
+        self.assertIsNot(transformer, frame_transformer_factory.get_transformer(
+            same_job, frame_size, mpf_util.FramePool(1)))
+        ff_job = mpf.ImageJob('test', 'image.png', dict(ROTATION='20', FEED_FORWARD_TYPE='REGION'),
+                              dict(ROTATION='90'), mpf.ImageLocation(0, 0, 10, 10))
+        self.assertIsNot(frame_transformer_factory.get_transformer(ff_job, frame_size),
+                         frame_transformer_factory.get_transformer(ff_job, frame_size))
+
+
+    def test_transformer_cache_key_contains_all_used_properties(self):
+        class RecordingDict(dict):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.used_keys = set()
+
+            def get(self, key, default=None):
+                self.used_keys.add(key)
+                return super().get(key, default)
+
+            def __getitem__(self, key):
+                self.used_keys.add(key)
+                return super().__getitem__(key)
+
+            def __contains__(self, key):
+                self.used_keys.add(key)
+                return super().__contains__(key)
+
+        job_properties = RecordingDict(
+            ROTATION='20', HORIZONTAL_FLIP='true', SEARCH_REGION_ENABLE_DETECTION='true', MODEL_INPUT_WIDTH='100',
+            MODEL_INPUT_HEIGHT='100', MODEL_INPUT_DTYPE='UINT8', DECODE_MAX_DIMENSION='100')
+        media_properties = RecordingDict()
+        job = mpf.ImageJob('test', 'image.png', job_properties, media_properties)
+        frame_transformer_factory._get_transformer(job, mpf_util.Size(640, 480), dict(), dict(), None)
+        job_properties.update(ROTATION='0', HORIZONTAL_FLIP='false', MODEL_INPUT_WIDTH='0', MODEL_INPUT_HEIGHT='0')
+        frame_transformer_factory._get_transformer(job, mpf_util.Size(640, 480), dict(), dict(), None)
+
+        self.assertLessEqual(job_properties.used_keys,
+                             set(frame_transformer_factory._TRANSFORMER_JOB_PROPERTIES))
+        self.assertLessEqual(media_properties.used_keys,
+                             set(frame_transformer_factory._TRANSFORMER_MEDIA_PROPERTIES))
+
+
 def closest_color(sample):
     palette = np.array((
         (0, 0, 0),
@@ -547,3 +859,16 @@ def closest_color(sample):
 
 def count_matching_pixels(img, pixel):
     return np.count_nonzero(np.all(img == pixel, axis=2))
+
+
+def count_blended_pixels(img):
+    return np.count_nonzero((img != 0) & (img != 255))
+
+
+def random_orientation_properties(rng):
+    properties = dict()
+    if rng.integers(2):
+        properties['ROTATION'] = str(float(rng.choice((0, 0.1, 45.5, 90, 359.9, 1e-9, -30))))
+    if rng.integers(2):
+        properties['HORIZONTAL_FLIP'] = 'true'
+    return properties
@@ -0,0 +1,87 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import test_util
+test_util.add_local_component_libs_to_sys_path()
+
+import unittest
+
+import numpy as np
+
+import mpf_component_api as mpf
+import mpf_component_util as mpf_util
+
+
+class TestColumnarVideoTrack(unittest.TestCase):
+
+    def test_convert_to_and_from_video_track(self):
+        video_track = mpf.VideoTrack(5, 10, 0.75, {
+            5: mpf.ImageLocation(20, 30, 15, 5, 0.5, dict(CLASSIFICATION='car')),
+            7: mpf.ImageLocation(0, 1, 2, 3, 0.25),
+            10: mpf.ImageLocation(4, 5, 6, 7, 0.125, dict(CLASSIFICATION='car')),
+        }, dict(TRACK_PROP='value'))
+
+        columnar_track = mpf_util.ColumnarVideoTrack.from_video_track(video_track)
+        self.assertEqual(3, len(columnar_track))
+        self.assertEqual([5, 7, 10], columnar_track.frame_indices.tolist())
+        self.assertEqual([[20, 30, 15, 5], [0, 1, 2, 3], [4, 5, 6, 7]], columnar_track.boxes.tolist())
+        self.assertEqual([0.5, 0.25, 0.125], columnar_track.confidences.tolist())
+        self.assertEqual(video_track, columnar_track.to_video_track())
+
+        frame_locations = columnar_track.frame_locations
+        self.assertEqual(video_track.frame_locations, dict(frame_locations))
+        self.assertEqual(list(video_track.frame_locations.items()), list(frame_locations.items()))
+        self.assertEqual(3, len(frame_locations.values()))
+        self.assertNotIn(6, frame_locations)
+
+        # The view returns copies, so the track can not be modified through it.
+        frame_locations[5].detection_properties['CLASSIFICATION'] = 'truck'
+        self.assertEqual('car', columnar_track.get_detection_properties(2)['CLASSIFICATION'])
+        with self.assertRaises(ValueError):
+            columnar_track.boxes[0, 0] = 1
+
+
+    def test_add_detections(self):
+        track = mpf_util.ColumnarVideoTrack(0, 99, initial_capacity=1)
+        for i in range(100):
+            track.add_detection(i, i, i + 1, 10, 20, i / 100, dict(CLASSIFICATION='person' if i % 2 else 'car'))
+        self.assertEqual(100, len(track))
+        self.assertEqual(list(range(100)), track.frame_indices.tolist())
+        self.assertEqual(mpf.ImageLocation(51, 52, 10, 20, 0.51, dict(CLASSIFICATION='person')),
+                         track.frame_locations[51])
+        # Each distinct set of detection properties is only stored once.
+        self.assertEqual(2, len({id(track._ColumnarVideoTrack__property_sets[i])
+                                 for i in track._ColumnarVideoTrack__property_set_ids[:len(track)]}))
+
+
+    def test_from_arrays(self):
+        track = mpf_util.ColumnarVideoTrack.from_arrays(
+            0, 2, np.arange(3), np.arange(12).reshape(3, 4), (0.1, 0.2, 0.3), 0.9, dict(TRACK_PROP='value'))
+        self.assertEqual(mpf.VideoTrack(0, 2, 0.9, {
+            0: mpf.ImageLocation(0, 1, 2, 3, 0.1),
+            1: mpf.ImageLocation(4, 5, 6, 7, 0.2),
+            2: mpf.ImageLocation(8, 9, 10, 11, 0.3)
+        }, dict(TRACK_PROP='value')), track.to_video_track())
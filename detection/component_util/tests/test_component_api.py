@@ -0,0 +1,107 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import test_util
+test_util.add_local_component_libs_to_sys_path()
+
+import copy
+import pickle
+import sys
+import unittest
+
+import mpf_component_api as mpf
+
+
+def create_detections():
+    image_location = mpf.ImageLocation(1, 2, 3, 4, 0.5, dict(CLASSIFICATION='car'))
+    return (
+        image_location,
+        mpf.VideoTrack(0, 5, 0.75, {0: image_location, 5: mpf.ImageLocation(5, 6, 7, 8)}, dict(TRACK='1')),
+        mpf.AudioTrack(100, 200, 0.25, dict(TRANSCRIPT='hello')),
+        mpf.GenericTrack(0.125, dict(TEXT='text')))
+
+
+def create_jobs():
+    return (
+        mpf.VideoJob('Video', 'video.mp4', 0, 10, dict(A='1'), dict(B='2'),
+                     mpf.VideoTrack(0, 1, frame_locations={0: mpf.ImageLocation(0, 0, 1, 1)})),
+        mpf.ImageJob('Image', 'image.png', dict(A='1'), dict(B='2'), mpf.ImageLocation(0, 0, 1, 1)),
+        mpf.AudioJob('Audio', 'audio.mp3', 0, 1000, dict(A='1'), dict(B='2'), mpf.AudioTrack(0, 10)),
+        mpf.GenericJob('Generic', 'file.txt', dict(A='1'), dict(B='2'), mpf.GenericTrack()))
+
+
+class TestComponentApi(unittest.TestCase):
+
+    @unittest.skipIf(sys.version_info < (3, 10), 'Detections only use __slots__ on Python 3.10 and newer.')
+    def test_detections_do_not_have_dict(self):
+        for detection in create_detections():
+            with self.subTest(type(detection).__name__):
+                self.assertFalse(hasattr(detection, '__dict__'))
+                with self.assertRaises(AttributeError):
+                    detection.unknown_attribute = 1
+
+
+    def test_jobs_do_not_have_dict(self):
+        for job in create_jobs():
+            with self.subTest(type(job).__name__):
+                self.assertFalse(hasattr(job, '__dict__'))
+                with self.assertRaises(AttributeError):
+                    job.unknown_attribute = 1
+
+
+    def test_equality_and_repr(self):
+        for obj in (*create_detections(), *create_jobs()):
+            with self.subTest(type(obj).__name__):
+                self.assertEqual(obj, copy.copy(obj))
+                self.assertTrue(repr(obj).startswith(type(obj).__name__ + '('))
+                self.assertEqual(obj, eval(repr(obj), vars(mpf)))
+
+        image_location = mpf.ImageLocation(1, 2, 3, 4)
+        self.assertEqual('ImageLocation(x_left_upper=1, y_left_upper=2, width=3, height=4, confidence=-1, '
+                         'detection_properties={})', repr(image_location))
+        self.assertNotEqual(image_location, mpf.ImageLocation(1, 2, 3, 5))
+        image_location.width = 5
+        self.assertEqual(mpf.ImageLocation(1, 2, 5, 4), image_location)
+
+
+    def test_deepcopy(self):
+        for obj in (*create_detections(), *create_jobs()):
+            with self.subTest(type(obj).__name__):
+                obj_copy = copy.deepcopy(obj)
+                self.assertEqual(obj, obj_copy)
+                self.assertIsNot(obj, obj_copy)
+
+        video_track = create_detections()[1]
+        track_copy = copy.deepcopy(video_track)
+        track_copy.frame_locations[0].detection_properties['CLASSIFICATION'] = 'truck'
+        self.assertEqual('car', video_track.frame_locations[0].detection_properties['CLASSIFICATION'])
+
+
+    def test_pickle(self):
+        for obj in (*create_detections(), *create_jobs()):
+            for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(type(obj).__name__, protocol=protocol):
+                    self.assertEqual(obj, pickle.loads(pickle.dumps(obj, protocol)))
@@ -0,0 +1,109 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import test_util
+test_util.add_local_component_libs_to_sys_path()
+
+import unittest
+
+import numpy as np
+
+import mpf_component_util as mpf_util
+from mpf_component_util.frame_pool import get_output_buffer
+
+from test_video_capture import create_video_job, get_frame_numbers
+
+
+class TestFramePool(unittest.TestCase):
+
+    def test_reuses_released_frames(self):
+        pool = mpf_util.FramePool(2)
+        frame = pool.get((4, 3, 3))
+        frame_address = frame.ctypes.data
+        self.assertEqual(1, len(pool))
+
+        del frame
+        reused_frame = pool.get((4, 3, 3))
+        self.assertEqual(frame_address, reused_frame.ctypes.data)
+        self.assertEqual(1, len(pool))
+
+        # reused_frame is still referenced, so a second buffer is needed.
+        other_frame = pool.get((4, 3, 3))
+        self.assertFalse(np.shares_memory(reused_frame, other_frame))
+        self.assertEqual(2, len(pool))
+
+        # Pool is full and all buffers are in use, so the new buffer is not added to the pool.
+        self.assertFalse(np.shares_memory(pool.get((4, 3, 3)), reused_frame))
+        self.assertEqual(2, len(pool))
+
+
+    def test_does_not_reuse_frames_with_views(self):
+        pool = mpf_util.FramePool(1)
+        frame = pool.get((10, 10, 3))
+        cropped = frame[2:5, 3:7]
+        del frame
+        self.assertFalse(np.shares_memory(cropped, pool.get((10, 10, 3))))
+
+        del cropped
+        self.assertEqual(1, len(pool))
+        resized_frame = pool.get((5, 5, 3))
+        self.assertEqual((5, 5, 3), resized_frame.shape)
+        self.assertEqual(1, len(pool))
+
+
+    def test_video_capture_shows_same_frames(self):
+        job = create_video_job(0, 29, 2)
+        job.job_properties['ROTATION'] = '90'
+        expected_frames = list(mpf_util.VideoCapture(job))
+
+        job.job_properties['FRAME_POOL_SIZE'] = '3'
+        cap = mpf_util.VideoCapture(job)
+        frame_addresses = set()
+        for expected_frame in expected_frames:
+            was_read, frame = cap.read()
+            self.assertTrue(was_read)
+            self.assertTrue(np.array_equal(expected_frame, frame))
+            frame_addresses.add(frame.ctypes.data)
+        self.assertFalse(cap.read()[0])
+        self.assertLess(len(frame_addresses), len(expected_frames))
+
+        job.job_properties['ROTATION'] = '0'
+        cap = mpf_util.VideoCapture(job, frame_pool_size=2)
+        held_frames = list(cap)
+        self.assertEqual(list(range(0, 30, 2)), get_frame_numbers(held_frames))
+
+
+    def test_get_output_buffer(self):
+        dst = np.empty((4, 3, 3), dtype=np.uint8)
+        self.assertIs(dst, get_output_buffer((4, 3, 3), np.uint8, dst))
+        self.assertIsNot(dst, get_output_buffer((4, 3, 3), np.float32, dst))
+        self.assertEqual((3, 4, 3), get_output_buffer((3, 4, 3), np.uint8, dst).shape)
+
+        pool = mpf_util.FramePool(1)
+        pooled = get_output_buffer((3, 4, 3), np.uint8, dst, pool)
+        self.assertEqual(1, len(pool))
+        del pooled
+        self.assertIs(dst, get_output_buffer((4, 3, 3), np.uint8, dst, pool))
@@ -0,0 +1,126 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import test_util
+test_util.add_local_component_libs_to_sys_path()
+
+import unittest
+
+import numpy as np
+
+import mpf_component_api as mpf
+import mpf_component_util as mpf_util
+from mpf_component_util.frame_transformers import FrameTile, FrameTiler
+
+
+class TestFrameTiler(unittest.TestCase):
+
+    def test_get_tiles(self):
+        frame = np.zeros((600, 1000, 3), dtype=np.uint8)
+        tiles = FrameTiler((256, 200), overlap=32).get_tiles(frame)
+
+        self.assertEqual([0, 224, 448, 672, 744], sorted({t.region.x for t in tiles}))
+        self.assertEqual([0, 168, 336, 400], sorted({t.region.y for t in tiles}))
+        self.assertEqual(20, len(tiles))
+        coverage = np.zeros(frame.shape[:2], dtype=np.int32)
+        for tile in tiles:
+            self.assertEqual((256, 200), mpf_util.Size.from_frame(tile.image))
+            self.assertTrue(np.shares_memory(frame, tile.image))
+            coverage[tile.region.y:tile.region.br.y, tile.region.x:tile.region.br.x] += 1
+        self.assertTrue((coverage > 0).all())
+
+        # The whole frame is a single tile when it is smaller than the tile size.
+        small_tiles = FrameTiler((256, 200), overlap=32).get_tiles(frame[:100, :150])
+        self.assertEqual([mpf_util.Rect(0, 0, 150, 100)], [t.region for t in small_tiles])
+
+        batch = FrameTiler.get_batch(tiles, mpf_util.FramePool(1))
+        self.assertEqual((20, 200, 256, 3), batch.shape)
+        self.assertTrue(batch.flags.c_contiguous)
+
+        with self.assertRaises(ValueError):
+            FrameTiler((256, 200), overlap=200)
+
+
+    def test_merge(self):
+        tiles = [FrameTile(np.zeros((100, 100, 3)), mpf_util.Rect(0, 0, 100, 100)),
+                 FrameTile(np.zeros((100, 100, 3)), mpf_util.Rect(80, 0, 100, 100))]
+        tile_detections = [
+            # The object at x=70 is cut off by the first tile's right edge.
+            [mpf.ImageLocation(70, 10, 30, 20, 0.5), mpf.ImageLocation(5, 5, 10, 10, 0.9),
+             mpf.ImageLocation(7, 5, 10, 10, 0.8)],
+            [mpf.ImageLocation(0, 10, 40, 20, 0.7, dict(CLASSIFICATION='car'))]
+        ]
+        results = FrameTiler((100, 100), overlap=20).merge(tiles, tile_detections)
+
+        # Overlapping detections from the same tile are both kept.
+        self.assertEqual([(5, 5, 10, 10), (7, 5, 10, 10), (80, 10, 40, 20)],
+                         sorted(mpf_util.Rect.from_image_location(il) for il in results))
+        self.assertEqual([0.9, 0.8, 0.7], [il.confidence for il in results])
+        self.assertEqual('car', results[2].detection_properties['CLASSIFICATION'])
+        self.assertEqual([], FrameTiler((100, 100)).merge(tiles, [[], []]))
+
+
+    def test_tiles_from_image_reader(self):
+        # The search region and rotation are applied before the frame is split in to tiles.
+        job = mpf.ImageJob('Test Job', test_util.get_data_file_path('test_img.png'), {
+            'ROTATION': '90',
+            'SEARCH_REGION_ENABLE_DETECTION': 'true',
+            'SEARCH_REGION_TOP_LEFT_Y_DETECTION': '250'
+        }, {}, None)
+        image_reader = mpf_util.ImageReader(job)
+        image = image_reader.get_image()
+        # The search region is applied to the rotated frame. The only dark region in it is the 20x30 region in the
+        # original image's bottom right corner. It is smaller than the overlap, so it is fully contained in at
+        # least one tile.
+        tiler = FrameTiler((48, 48), overlap=32)
+        tiles = tiler.get_tiles(image)
+
+        tile_detections = []
+        for tile in tiles:
+            # Report the dark region in each tile as a detection.
+            ys, xs = np.nonzero(tile.image[..., 0] < 128)
+            if len(xs) == 0:
+                tile_detections.append([])
+            else:
+                tile_detections.append([mpf.ImageLocation(
+                    int(xs.min()), int(ys.min()), int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1),
+                    float(len(xs)))])
+
+        expected = mpf.ImageLocation(0, 0, 0, 0)
+        ys, xs = np.nonzero(image[..., 0] < 128)
+        expected.x_left_upper, expected.y_left_upper = int(xs.min()), int(ys.min())
+        expected.width, expected.height = int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1)
+
+        self.assertEqual((30, 20), (expected.width, expected.height))
+
+        results = tiler.merge(tiles, tile_detections)
+        self.assertEqual(1, len(results))
+        self.assertEqual(mpf_util.Rect.from_image_location(expected), mpf_util.Rect.from_image_location(results[0]))
+
+        image_reader.reverse_transform(expected)
+        image_reader.reverse_transform(results[0])
+        self.assertEqual(expected.detection_properties, results[0].detection_properties)
+        self.assertEqual((300, 199, 30, 20), mpf_util.Rect.from_image_location(results[0]))
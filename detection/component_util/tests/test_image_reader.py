@@ -29,9 +29,17 @@ from __future__ import division, print_function
 import test_util
 test_util.add_local_component_libs_to_sys_path()
 
+import os
+import tempfile
 import unittest
+
+import cv2
+import numpy as np
+
 import mpf_component_api as mpf
 import mpf_component_util as mpf_util
+from mpf_component_util import image_reader
+from mpf_component_util.tiff_region_reader import TiffRegionReader, tifffile
 
 
 def images_equal(im1, im2):
@@ -162,6 +170,169 @@ class TestImageReader(unittest.TestCase):
         self.assertEqual((239, 199, 30, 20), mpf_util.Rect.from_image_location(results[3]))
 
 
+    def test_decode_max_dimension(self):
+        job = mpf.ImageJob('Test Job', test_util.get_data_file_path('test_img.png'),
+                           dict(DECODE_MAX_DIMENSION='160'), {}, None)
+        image_reader = mpf_util.ImageReader(job)
+        image = image_reader.get_image()
+        self.assertEqual((160, 100), mpf_util.Size.from_frame(image))
+        # Middle black region is at Rect(80, 50, 160, 100) in the original image.
+        self.assertTrue(images_equal(image[25:75, 40:120], 0))
+        self._assert_reverse_transform(image_reader, (40, 25, 80, 50), (80, 50, 160, 100))
+
+        job.job_properties['DECODE_MAX_DIMENSION'] = '1000'
+        self.assertEqual((320, 200), mpf_util.Size.from_frame(mpf_util.ImageReader(job).get_image()))
+
+
+    def test_decode_max_dimension_with_rotation(self):
+        job = mpf.ImageJob('Test Job', test_util.get_data_file_path('test_img.png'),
+                           dict(ROTATION='90', DECODE_MAX_DIMENSION='160'), {}, None)
+        image_reader = mpf_util.ImageReader(job)
+        image = image_reader.get_image()
+        self.assertEqual((100, 160), mpf_util.Size.from_frame(image))
+
+        job.job_properties['DECODE_MAX_DIMENSION'] = '0'
+        full_size_reader = mpf_util.ImageReader(job)
+        full_size_location = mpf.ImageLocation(20, 40, 60, 80)
+        full_size_reader.reverse_transform(full_size_location)
+        self._assert_reverse_transform(image_reader, (10, 20, 30, 40),
+                                       mpf_util.Rect.from_image_location(full_size_location) + (90,))
+
+
+    def test_image_codec_matches_video_capture(self):
+        for file_name in ('test_img.png', 'rotation/hello-world.png'):
+            img_path = test_util.get_data_file_path(file_name)
+            self.assertTrue(images_equal(image_reader._read_with_video_capture(img_path),
+                                         image_reader._read_with_image_codec(img_path)))
+
+        # Files that OpenCV's image codecs can not read fall back to cv2.VideoCapture.
+        video_path = test_util.get_data_file_path('frame_filter_test.mp4')
+        self.assertIsNone(image_reader._read_with_image_codec(video_path))
+        job = mpf.ImageJob('Test Job', video_path, {}, {}, None)
+        self.assertTrue(images_equal(image_reader._read_with_video_capture(video_path),
+                                     mpf_util.ImageReader(job).get_image()))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            jpeg_path = os.path.join(temp_dir, 'test_img.jpg')
+            cv2.imwrite(jpeg_path, image_reader._read_image(test_util.get_data_file_path('test_img.png')))
+            job = mpf.ImageJob('Test Job', jpeg_path, {}, {}, None)
+            self.assertTrue(images_equal(image_reader._read_with_video_capture(jpeg_path),
+                                         mpf_util.ImageReader(job).get_image()))
+
+        with self.assertRaises(mpf.DetectionException) as cm:
+            mpf_util.ImageReader(mpf.ImageJob('Test Job', test_util.get_data_file_path('does-not-exist.png'),
+                                              {}, {}, None))
+        self.assertEqual(mpf.DetectionError.COULD_NOT_OPEN_MEDIA, cm.exception.error_code)
+
+
+    @unittest.skipIf(tifffile is None, 'tifffile is not installed')
+    def test_tiff_region_decode(self):
+        rng = np.random.default_rng(0)
+        rgb_image = rng.integers(0, 256, (300, 500, 3), dtype=np.uint8)
+        tiff_options = (
+            ('tiled.tif', rgb_image, dict(tile=(64, 48), compression='zlib', photometric='rgb')),
+            ('stripped.tif', rgb_image, dict(rowsperstrip=16, photometric='rgb')),
+            ('gray.tif', rgb_image[..., 0], dict(tile=(32, 32), photometric='minisblack')),
+            ('alpha.tif', np.dstack((rgb_image, rgb_image[..., :1])), dict(tile=(32, 32), photometric='rgb',
+                                                                            extrasamples=('assocalpha',))))
+        search_region = dict(SEARCH_REGION_ENABLE_DETECTION='true',
+                             SEARCH_REGION_TOP_LEFT_X_DETECTION='70', SEARCH_REGION_TOP_LEFT_Y_DETECTION='33',
+                             SEARCH_REGION_BOTTOM_RIGHT_X_DETECTION='251',
+                             SEARCH_REGION_BOTTOM_RIGHT_Y_DETECTION='290')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for file_name, pixels, options in tiff_options:
+                path = os.path.join(temp_dir, file_name)
+                tifffile.imwrite(path, pixels, **options)
+                full_image = image_reader._read_image(path)
+
+                with TiffRegionReader.open(path) as tiff_reader:
+                    self.assertEqual((500, 300), tiff_reader.size)
+                    self.assertTrue(images_equal(full_image, tiff_reader.read(mpf_util.Rect(0, 0, 500, 300))))
+                    self.assertTrue(images_equal(full_image[10:11, 490:],
+                                                 tiff_reader.read(mpf_util.Rect(490, 10, 10, 1))))
+
+                job = mpf.ImageJob('Test Job', path, search_region, {}, None)
+                image_reader_ = mpf_util.ImageReader(job)
+                self.assertTrue(images_equal(full_image[33:290, 70:251], image_reader_.get_image()))
+                self._assert_reverse_transform(image_reader_, (5, 10, 20, 30), (75, 43, 20, 30))
+
+                # Rotation requires the full image.
+                job = mpf.ImageJob('Test Job', path, dict(search_region, ROTATION='90'), {}, None)
+                png_path = os.path.join(temp_dir, 'full.png')
+                cv2.imwrite(png_path, full_image)
+                png_job = mpf.ImageJob('Test Job', png_path, job.job_properties, {}, None)
+                self.assertTrue(images_equal(mpf_util.ImageReader(png_job).get_image(),
+                                             mpf_util.ImageReader(job).get_image()))
+
+            # cv2.imread premultiplies unassociated alpha, so those images are decoded with cv2.imread.
+            path = os.path.join(temp_dir, 'unassociated-alpha.tif')
+            tifffile.imwrite(path, np.dstack((rgb_image, rgb_image[..., :1])), photometric='rgb',
+                             extrasamples=('unassalpha',))
+            self.assertIsNone(TiffRegionReader.open(path))
+
+        self.assertIsNone(TiffRegionReader.open(test_util.get_data_file_path('test_img.png')))
+
+
+    def test_model_tensor_format(self):
+        img_path = test_util.get_data_file_path('rotation/hello-world.png')
+        bgr_image = mpf_util.ImageReader(mpf.ImageJob('Test Job', img_path, {}, {}, None)).get_image()
+
+        job = mpf.ImageJob('Test Job', img_path, dict(
+            MODEL_INPUT_CHANNEL_ORDER='RGB', MODEL_INPUT_MEAN='10, 20, 30', MODEL_INPUT_STD='2',
+            MODEL_INPUT_LAYOUT='CHW'), {}, None)
+        tensor = mpf_util.ImageReader(job).get_image()
+        expected = ((bgr_image[..., ::-1] - np.array((10, 20, 30), dtype=np.float32)) / 2).transpose(2, 0, 1)
+        self.assertEqual(np.float32, tensor.dtype)
+        self.assertTrue(tensor.flags.c_contiguous)
+        self.assertTrue(np.allclose(expected, tensor))
+
+        job = mpf.ImageJob('Test Job', img_path, dict(MODEL_INPUT_CHANNEL_ORDER='rgb', MODEL_INPUT_DTYPE='UINT8',
+                                                      ROTATION='90'), {}, None)
+        image_reader_ = mpf_util.ImageReader(job)
+        rotated = mpf_util.ImageReader(mpf.ImageJob('Test Job', img_path, dict(ROTATION='90'), {}, None))
+        self.assertTrue(images_equal(cv2.cvtColor(rotated.get_image(), cv2.COLOR_BGR2RGB),
+                                     image_reader_.get_image()))
+        expected_location = mpf.ImageLocation(10, 20, 30, 40)
+        rotated.reverse_transform(expected_location)
+        self._assert_reverse_transform(image_reader_, (10, 20, 30, 40),
+                                       mpf_util.Rect.from_image_location(expected_location) + (90,))
+
+        for invalid_properties in (dict(MODEL_INPUT_LAYOUT='NCHW'), dict(MODEL_INPUT_MEAN='1,2'),
+                                   dict(MODEL_INPUT_STD='0'), dict(MODEL_INPUT_DTYPE='INT64')):
+            with self.assertRaises(mpf.DetectionException) as cm:
+                mpf_util.ImageReader(mpf.ImageJob('Test Job', img_path, invalid_properties, {}, None))
+            self.assertEqual(mpf.DetectionError.INVALID_PROPERTY, cm.exception.error_code)
+
+
+    def test_read_images(self):
+        img_path = test_util.get_data_file_path('test_img.png')
+        jobs = [mpf.ImageJob(f'Job {i}', img_path, dict(ROTATION=str(i % 4 * 90)), {}, None) for i in range(10)]
+
+        results = list(mpf_util.read_images(iter(jobs), max_workers=2))
+        self.assertEqual(jobs, [job for job, _ in results])
+        for job, image_reader in results:
+            expected = mpf_util.ImageReader(job).get_image()
+            self.assertTrue(images_equal(expected, image_reader.get_image()))
+
+        unordered_results = mpf_util.read_images(jobs, max_workers=3, ordered=False)
+        self.assertCountEqual([j.job_name for j in jobs], [job.job_name for job, _ in unordered_results])
+
+
+    def test_read_images_with_invalid_image(self):
+        jobs = [mpf.ImageJob('Good Job', test_util.get_data_file_path('test_img.png'), {}, {}, None),
+                mpf.ImageJob('Bad Job', test_util.get_data_file_path('does-not-exist.png'), {}, {}, None)]
+
+        results = list(mpf_util.read_images(jobs, return_exceptions=True))
+        self.assertIsInstance(results[0][1], mpf_util.ImageReader)
+        self.assertIsInstance(results[1][1], mpf.DetectionException)
+
+        results = mpf_util.read_images(jobs)
+        self.assertEqual(jobs[0], next(results)[0])
+        with self.assertRaises(mpf.DetectionException):
+            next(results)
+
+
 
 class ImageReaderMixinComponent(mpf_util.ImageReaderMixin, object):
     def __init__(self, test_obj):
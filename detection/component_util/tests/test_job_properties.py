@@ -0,0 +1,79 @@
+#############################################################################
+# NOTICE                                                                    #
+#                                                                           #
+# This software (or technical data) was produced for the U.S. Government    #
+# under contract, and is subject to the Rights in Data-General Clause       #
+# 52.227-14, Alt. IV (DEC 2007).                                            #
+#                                                                           #
+# Copyright 2023 The MITRE Corporation. All Rights Reserved.                #
+#############################################################################
+
+#############################################################################
+# Copyright 2023 The MITRE Corporation                                      #
+#                                                                           #
+# Licensed under the Apache License, Version 2.0 (the "License");           #
+# you may not use this file except in compliance with the License.          #
+# You may obtain a copy of the License at                                   #
+#                                                                           #
+#    http://www.apache.org/licenses/LICENSE-2.0                             #
+#                                                                           #
+# Unless required by applicable law or agreed to in writing, software       #
+# distributed under the License is distributed on an "AS IS" BASIS,         #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+# See the License for the specific language governing permissions and       #
+# limitations under the License.                                            #
+#############################################################################
+
+import test_util
+test_util.add_local_component_libs_to_sys_path()
+
+import contextlib
+import io
+import unittest
+
+import mpf_component_api as mpf
+import mpf_component_util as mpf_util
+from mpf_component_util.frame_transformers import frame_transformer_factory
+
+
+class TestJobProperties(unittest.TestCase):
+
+    def test_get_property(self):
+        props = mpf_util.JobProperties(dict(INT='5', FLOAT='1.5', BOOL='true', STR='text'))
+        self.assertEqual(5, mpf_util.get_property(props, 'INT', 0))
+        self.assertEqual(5.0, mpf_util.get_property(props, 'INT', 0.0))
+        self.assertEqual(1.5, mpf_util.get_property(props, 'FLOAT', 0.0))
+        self.assertIs(True, mpf_util.get_property(props, 'BOOL', False))
+        self.assertEqual('text', mpf_util.get_property(props, 'STR', ''))
+        self.assertEqual(-1, mpf_util.get_property(props, 'MISSING', -1))
+        self.assertEqual('5', props.get_typed('INT', '', str))
+
+        self.assertEqual('5', props['INT'])
+        self.assertEqual(4, len(props))
+        self.assertEqual(['INT', 'FLOAT', 'BOOL', 'STR'], list(props))
+        self.assertEqual(dict(INT='5', FLOAT='1.5', BOOL='true', STR='text'), dict(props))
+
+
+    def test_is_snapshot(self):
+        job_properties = dict(KEY='1')
+        props = mpf_util.JobProperties(job_properties)
+        job_properties['KEY'] = '2'
+        self.assertEqual(1, mpf_util.get_property(props, 'KEY', 0))
+        with self.assertRaises(TypeError):
+            props['KEY'] = '3'
+
+
+    def test_conversion_error_reported_once(self):
+        props = mpf_util.JobProperties(dict(BAD_INT='abc'))
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            for _ in range(3):
+                self.assertEqual(7, mpf_util.get_property(props, 'BAD_INT', 7))
+                self.assertEqual(8, props.get_typed('BAD_INT', 8))
+        self.assertEqual(1, stderr.getvalue().count('BAD_INT'))
+
+
+    def test_used_as_job_properties(self):
+        job = mpf.ImageJob('Test', 'test.png', mpf_util.JobProperties(dict(ROTATION='90')), {}, None)
+        transformer = frame_transformer_factory.get_transformer(job, mpf_util.Size(640, 480))
+        self.assertEqual(mpf_util.Size(480, 640), transformer.get_frame_size(0))
@@ -27,6 +27,9 @@
 import test_util
 test_util.add_local_component_libs_to_sys_path()
 
+import os
+import subprocess
+import tempfile
 import unittest
 
 import cv2
@@ -35,7 +38,11 @@ import numpy as np
 
 import mpf_component_api as mpf
 import mpf_component_util as mpf_util
-from mpf_component_util.frame_filters import FeedForwardFrameFilter, IntervalFrameFilter, seek_strategies
+from mpf_component_util import media_cache
+from mpf_component_util.frame_transformers import frame_transformer_factory
+from mpf_component_util.frame_filters import (
+    FeedForwardFrameFilter, IntervalFrameFilter, KeyFrameFilter, KeyFrameIndex, seek_strategies)
+from mpf_component_util.video_capture import _split_job
 
 
 
@@ -356,6 +363,85 @@ class FrameFilterTest(unittest.TestCase):
         self.assert_read_fails(cap)
 
 
+    def test_scene_change_filter(self):
+        # Consecutive frames in frame_filter_test.mp4 differ by 1 / 255, so with this threshold every 4th
+        # frame is emitted.
+        job = create_video_job(0, 29)
+        job.job_properties['SCENE_CHANGE_THRESHOLD'] = str(3.5 / 255)
+        cap = mpf_util.VideoCapture(job)
+        self.assertEqual(30, cap.frame_count)
+        self.assertEqual([0, 4, 8, 12, 16, 20, 24, 28], [get_frame_number(f) for f in cap])
+        self.assertEqual(8, cap.frame_count)
+        self.assertEqual(8, cap.current_frame_position)
+
+        il = mpf.ImageLocation(0, 1, 2, 3)
+        track = mpf.VideoTrack(1, 6, frame_locations={1: il, 3: il, 6: il})
+        cap.reverse_transform(track)
+        self.assertEqual(4, track.start_frame)
+        self.assertEqual(24, track.stop_frame)
+        self.assertEqual([4, 12, 24], list(track.frame_locations))
+
+
+    def test_scene_change_filter_with_prefetching(self):
+        job = create_video_job(0, 29)
+        job.job_properties.update(SCENE_CHANGE_THRESHOLD=str(3.5 / 255), PREFETCH_FRAMES='4')
+        cap = mpf_util.VideoCapture(job)
+        frame_numbers = []
+        positions = []
+        for frame in cap:
+            frame_numbers.append(get_frame_number(frame))
+            # The prefetch thread decides which frames to skip ahead of the caller, but the position only
+            # reflects the frames the caller has received.
+            positions.append(cap.current_frame_position)
+        self.assertEqual([0, 4, 8, 12, 16, 20, 24, 28], frame_numbers)
+        self.assertEqual(list(range(1, 9)), positions)
+        self.assertEqual(8, cap.frame_count)
+
+        track = mpf.VideoTrack(2, 7, frame_locations={2: mpf.ImageLocation(0, 1, 2, 3)})
+        cap.reverse_transform(track)
+        self.assertEqual(8, track.start_frame)
+        self.assertEqual(28, track.stop_frame)
+        self.assertEqual([8], list(track.frame_locations))
+        cap.release()
+
+
+    def test_scene_change_filter_with_interval_and_batches(self):
+        job = create_video_job(1, 29, 2)
+        job.job_properties['SCENE_CHANGE_THRESHOLD'] = str(3.5 / 255)
+        job.job_properties['PREFETCH_FRAMES'] = '2'
+        cap = mpf_util.VideoCapture(job)
+        batches = [(get_frame_numbers(frames), list(indices)) for frames, indices in cap.iter_batches(3)]
+        self.assertEqual([
+            ([1, 5, 9], [0, 1, 2]),
+            ([13, 17, 21], [3, 4, 5]),
+            ([25, 29], [6, 7])
+        ], batches)
+
+
+    def test_scene_change_filter_set_frame_position(self):
+        job = create_video_job(0, 29)
+        job.job_properties['SCENE_CHANGE_THRESHOLD'] = str(3.5 / 255)
+        cap = mpf_util.VideoCapture(job)
+        self.assertEqual(0, get_frame_number(next(cap)))
+        self.assertEqual(4, get_frame_number(next(cap)))
+
+        # Frames 5, 6, and 7 have not been read yet, so they are still part of the segment.
+        self.assertTrue(cap.set_frame_position(5))
+        self.assertEqual(8, get_frame_number(next(cap)))
+        self.assertEqual(6, cap.current_frame_position)
+        self.assertEqual(12, get_frame_number(next(cap)))
+
+        self.assertTrue(cap.set_frame_position(1))
+        self.assertEqual(4, get_frame_number(next(cap)))
+        self.assertEqual(5, get_frame_number(next(cap)))
+
+        track = mpf.VideoTrack(5, 6, frame_locations={5: mpf.ImageLocation(0, 1, 2, 3)})
+        cap.reverse_transform(track)
+        self.assertEqual(8, track.start_frame)
+        self.assertEqual(12, track.stop_frame)
+        self.assertEqual([8], list(track.frame_locations))
+
+
     def test_can_fix_frame_pos_in_reverse_transform(self):
         cap = create_video_capture(5, 19, 2)
         il = mpf.ImageLocation(0, 1, 2, 3)
@@ -421,6 +507,161 @@ class FrameFilterTest(unittest.TestCase):
         self.assertEqual(25, get_frame_number(next(cap)))
 
 
+    def test_prefetching_shows_same_frames(self):
+        cap = mpf_util.VideoCapture(create_video_job(0, 29), prefetch_frames=4)
+        self.assert_expected_frames_shown(cap, range(30))
+
+        cap = mpf_util.VideoCapture(create_video_job(15, 29, 4), prefetch_frames=1)
+        self.assert_expected_frames_shown(cap, (15, 19, 23, 27))
+
+
+    def test_prefetching_preserves_frame_position(self):
+        job = create_video_job(10, 29, 5)
+        job.job_properties['PREFETCH_FRAMES'] = '3'
+        cap = mpf_util.VideoCapture(job)
+
+        self.assertEqual(10, get_frame_number(next(cap)))
+        self.assertEqual(1, cap.current_frame_position)
+        self.assertAlmostEqual(0.25, cap.frame_position_ratio)
+
+        self.assertTrue(cap.set_frame_position(2))
+        self.assertEqual(2, cap.current_frame_position)
+        self.assertEqual(20, get_frame_number(next(cap)))
+        self.assertEqual(3, cap.current_frame_position)
+
+        init_frames = cap.get_initialization_frames_if_available(2)
+        self.assertEqual([0, 5], [get_frame_number(f) for f in init_frames])
+
+        self.assertEqual(3, cap.current_frame_position)
+        self.assertEqual(25, get_frame_number(next(cap)))
+        self.assert_read_fails(cap)
+
+        self.assertTrue(cap.set_frame_position(0))
+        self.assertEqual(10, get_frame_number(next(cap)))
+        cap.release()
+
+
+    def test_prefetching_uses_seek_fallback(self):
+        job = mpf.VideoJob('Test', VIDEO_WITH_SET_FRAME_ISSUE, 0, 1000, {}, {}, None)
+        cap = mpf_util.VideoCapture(job, False, False, prefetch_frames=2)
+        frame_count = cap.frame_count
+        next(cap)
+        self.assertTrue(cap.set_frame_position(frame_count - 5))
+
+        self.assertEqual(5, sum(1 for _ in cap))
+        self.assertEqual(frame_count, cap.current_frame_position)
+
+
+    def test_read_batch(self):
+        cap = create_video_capture(3, 29, 3)
+        frames, frame_indices = cap.read_batch(4)
+        self.assertEqual((4, 240, 320, 3), frames.shape)
+        self.assertTrue(frames.flags.c_contiguous)
+        self.assertEqual([0, 1, 2, 3], list(frame_indices))
+        self.assertEqual([3, 6, 9, 12], get_frame_numbers(frames))
+        self.assertEqual(4, cap.current_frame_position)
+
+        next_frames, next_frame_indices = cap.read_batch(4)
+        self.assertTrue(np.shares_memory(frames, next_frames))
+        self.assertEqual([4, 5, 6, 7], list(next_frame_indices))
+        self.assertEqual([15, 18, 21, 24], get_frame_numbers(next_frames))
+
+        last_frames, last_frame_indices = cap.read_batch(4)
+        self.assertEqual([8], list(last_frame_indices))
+        self.assertEqual([27], get_frame_numbers(last_frames))
+
+        empty_frames, empty_frame_indices = cap.read_batch(4)
+        self.assertEqual(0, len(empty_frames))
+        self.assertEqual(0, len(empty_frame_indices))
+
+
+    def test_iter_batches(self):
+        cap = create_video_capture(0, 29, 2)
+        batches = [(get_frame_numbers(frames), list(indices)) for frames, indices in cap.iter_batches(6)]
+        self.assertEqual([
+            ([0, 2, 4, 6, 8, 10], [0, 1, 2, 3, 4, 5]),
+            ([12, 14, 16, 18, 20, 22], [6, 7, 8, 9, 10, 11]),
+            ([24, 26, 28], [12, 13, 14])
+        ], batches)
+
+
+    def test_read_batch_with_model_tensor_format(self):
+        job = create_video_job(0, 29, 10)
+        job.job_properties.update(MODEL_INPUT_LAYOUT='CHW', ROTATION='90')
+        cap = mpf_util.VideoCapture(job)
+        # The shape and type of an empty batch match the transformed frames, even before any frames are read.
+        empty_frames, _ = cap.read_batch(0)
+        self.assertEqual((0, 3, 320, 240), empty_frames.shape)
+        self.assertEqual(np.float32, empty_frames.dtype)
+
+        frames, frame_indices = cap.read_batch(2)
+        self.assertEqual((2, 3, 320, 240), frames.shape)
+        self.assertEqual(np.float32, frames.dtype)
+        self.assertEqual([0, 1], list(frame_indices))
+        self.assertEqual([0, 10], frames[:, 0, 0, 0].tolist())
+
+        # The second batch is transformed directly in to the same buffer.
+        next_frames, next_frame_indices = cap.read_batch(2)
+        self.assertTrue(np.shares_memory(frames, next_frames))
+        self.assertEqual([2], list(next_frame_indices))
+        self.assertEqual([20], next_frames[:, 0, 0, 0].tolist())
+
+        empty_frames, _ = cap.read_batch(2)
+        self.assertEqual((0, 3, 320, 240), empty_frames.shape)
+        self.assertEqual(np.float32, empty_frames.dtype)
+
+
+    def test_transform_frame_into_dst(self):
+        job = create_video_job(0, 29)
+        job.job_properties.update(ROTATION='90')
+        transformer = frame_transformer_factory.get_transformer(job, mpf_util.Size(320, 240))
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        dst = np.empty((320, 240, 3), dtype=np.uint8)
+        self.assertIs(dst, transformer.transform_frame(frame, 0, dst))
+        # An array with the wrong shape is not used.
+        wrong_size_dst = np.empty((240, 320, 3), dtype=np.uint8)
+        self.assertIsNot(wrong_size_dst, transformer.transform_frame(frame, 0, wrong_size_dst))
+
+
+    def test_read_batch_splits_batch_when_frame_size_changes(self):
+        ff_track = mpf.VideoTrack(4, 29, frame_locations={
+            4: mpf.ImageLocation(10, 60, 65, 125),
+            9: mpf.ImageLocation(10, 60, 65, 125),
+            15: mpf.ImageLocation(60, 20, 100, 200),
+            29: mpf.ImageLocation(70, 0, 30, 240)
+        })
+        job = mpf.VideoJob('Test', FRAME_FILTER_TEST_VIDEO, 4, 29, dict(FEED_FORWARD_TYPE='REGION'), {}, ff_track)
+        cap = mpf_util.VideoCapture(job)
+
+        frames, frame_indices = cap.read_batch(10)
+        self.assertEqual((2, 125, 65, 3), frames.shape)
+        self.assertEqual([4, 9], get_frame_numbers(frames))
+
+        frames, frame_indices = cap.read_batch(10)
+        self.assertEqual((1, 200, 100, 3), frames.shape)
+        self.assertEqual([2], list(frame_indices))
+
+        frames, frame_indices = cap.read_batch(10)
+        self.assertEqual((1, 240, 30, 3), frames.shape)
+        self.assertEqual([29], get_frame_numbers(frames))
+        self.assertEqual(0, len(cap.read_batch(10)[1]))
+
+
+    def test_decode_max_dimension(self):
+        job = create_video_job(0, 29, 2)
+        job.job_properties['DECODE_MAX_DIMENSION'] = '160'
+        job.job_properties['FRAME_POOL_SIZE'] = '2'
+        cap = mpf_util.VideoCapture(job)
+        self.assertEqual((160, 120), cap.frame_size)
+        frames = list(cap)
+        self.assertEqual((120, 160, 3), frames[0].shape)
+        self.assertEqual(list(range(0, 30, 2)), get_frame_numbers(frames))
+
+        track = mpf.VideoTrack(1, 1, frame_locations={1: mpf.ImageLocation(10, 20, 30, 40)})
+        cap.reverse_transform(track)
+        self.assertEqual((20, 40, 60, 80), mpf_util.Rect.from_image_location(track.frame_locations[2]))
+
+
     def test_can_handle_feed_forward_track(self):
         ff_track = mpf.VideoTrack(0, 29, frame_locations={
             1: mpf.ImageLocation(5, 5, 5, 10),
@@ -583,6 +824,31 @@ class FrameFilterTest(unittest.TestCase):
         self.assertTrue(was_read)
 
 
+    def test_seek_strategy_is_remembered_after_fallback(self):
+        media_cache.clear_seek_strategies()
+        self.addCleanup(media_cache.clear_seek_strategies)
+        file_id = media_cache.MediaFileId.from_path(VIDEO_WITH_SET_FRAME_ISSUE)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            job = mpf.VideoJob('Test', VIDEO_WITH_SET_FRAME_ISSUE, 0, 1000, dict(MEDIA_CACHE_DIR=cache_dir),
+                               dict(HAS_CONSTANT_FRAME_RATE='true'), None)
+            cap = mpf_util.VideoCapture(job, False, False)
+            self.assertIsNone(media_cache.get_seek_strategy(file_id, cache_dir))
+
+            cap.set_frame_position(cap.frame_count - 5)
+            self.assertTrue(cap.read()[0])
+            self.assertIsInstance(media_cache.get_seek_strategy(file_id, None), seek_strategies.GrabSeek)
+
+            # Simulate a new process that only has access to the persisted strategy.
+            media_cache.clear_seek_strategies()
+            self.assertIsNone(media_cache.get_seek_strategy(file_id, None))
+            self.assertIsInstance(media_cache.get_seek_strategy(file_id, cache_dir), seek_strategies.GrabSeek)
+
+            cap = mpf_util.VideoCapture(job, False, False)
+            cap.set_frame_position(cap.frame_count - 5)
+            self.assertEqual(5, sum(1 for _ in cap))
+        self.assertIsNone(media_cache.MediaFileId.from_path('http://example.com/video.mp4'))
+
+
     def assert_can_change_frame_position(self, seek_strategy):
         cv_cap = cv2.VideoCapture(FRAME_FILTER_TEST_VIDEO)
         frame_position = 0
@@ -617,6 +883,39 @@ class FrameFilterTest(unittest.TestCase):
     def test_read_seek(self):
         self.assert_can_change_frame_position(seek_strategies.ReadSeek())
 
+    def test_key_frame_seek(self):
+        key_frame_index = KeyFrameIndex.from_media(FRAME_FILTER_TEST_VIDEO)
+        self.assert_can_change_frame_position(seek_strategies.KeyFrameSeek(key_frame_index))
+
+
+    def test_key_frame_index(self):
+        key_frame_index = KeyFrameIndex.from_media(FRAME_FILTER_TEST_VIDEO)
+        self.assertEqual(30, key_frame_index.frame_count)
+        self.assertEqual([0, 5, 10, 15, 20, 25], list(key_frame_index.key_frames))
+        self.assertAlmostEqual(7000 / 30, key_frame_index.get_frame_time_ms(7))
+        self.assertEqual(7, key_frame_index.get_frame_at_time(7000 / 30))
+        self.assertEqual(7, key_frame_index.get_frame_at_time(7100 / 30))
+        self.assertIsNone(key_frame_index.get_frame_at_time(7500 / 30))
+        self.assertEqual([10, 5], key_frame_index.get_preceding_key_frames(12, 2))
+        self.assertEqual([0], key_frame_index.get_preceding_key_frames(3, 2))
+
+
+    def test_key_frame_seek_on_variable_frame_rate_video(self):
+        sequential_cap = cv2.VideoCapture(VIDEO_WITH_SET_FRAME_ISSUE)
+        expected_frames = []
+        while True:
+            was_read, frame = sequential_cap.read()
+            if not was_read:
+                break
+            expected_frames.append(frame)
+
+        job = mpf.VideoJob('Test', VIDEO_WITH_SET_FRAME_ISSUE, 0, 1000, dict(USE_KEY_FRAME_SEEK='true'), {}, None)
+        cap = mpf_util.VideoCapture(job, False, False)
+        for target_frame in (100, 40, 190, 35, 0, 215):
+            self.assertTrue(cap.set_frame_position(target_frame))
+            self.assertTrue(np.array_equal(expected_frames[target_frame], next(cap)))
+            self.assertEqual(target_frame + 1, cap.current_frame_position)
+
 
     def test_can_filter_on_key_frames(self):
         job = mpf.VideoJob('Test', FRAME_FILTER_TEST_VIDEO, 0, 1000, dict(USE_KEY_FRAMES='true'), {}, None)
@@ -649,6 +948,61 @@ class FrameFilterTest(unittest.TestCase):
         self.assert_expected_frames_shown(cap, (5, 15))
 
 
+    def test_key_frames_on_stream_without_packet_timestamps(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Raw H.264 streams do not store presentation timestamps, so the packets can not be indexed.
+            h264_path = os.path.join(temp_dir, 'frame_filter_test.h264')
+            subprocess.run(('ffmpeg', '-loglevel', 'error', '-i', FRAME_FILTER_TEST_VIDEO, '-c:v', 'copy',
+                            '-bsf:v', 'h264_mp4toannexb', '-f', 'h264', h264_path), check=True)
+            with self.assertRaises(ValueError):
+                KeyFrameIndex.from_media(h264_path)
+
+            job = mpf.VideoJob('Test', h264_path, 0, 29, dict(USE_KEY_FRAMES='true'), dict(FRAME_COUNT='30'), None)
+            self.assertEqual([0, 5, 10, 15, 20, 25], KeyFrameFilter.get_key_frames(job))
+            self.assert_expected_frames_shown(mpf_util.VideoCapture(job), (0, 5, 10, 15, 20, 25))
+
+            job.job_properties.update(USE_KEY_FRAMES='false', PARALLEL_SEGMENTS='2')
+            results = list(FrameNumberComponent().get_detections_from_video(job))
+            self.assertEqual(list(range(30)), [t.start_frame for t in results])
+
+
+    def test_key_frame_probe_modes_find_same_key_frames(self):
+        for start_frame, stop_frame, frame_interval in ((0, -1, 1), (6, 21, 1), (5, 29, 2), (0, 3, 1)):
+            job = create_video_job(start_frame, stop_frame, frame_interval)
+            packet_key_frames = KeyFrameFilter.get_key_frames(job)
+            job.job_properties['KEY_FRAME_PROBE_MODE'] = 'FRAME'
+            self.assertEqual(KeyFrameFilter.get_key_frames(job), packet_key_frames)
+
+        self.assertEqual([10, 15, 20], KeyFrameFilter.get_key_frames(create_video_job(6, 21)))
+        # Only the beginning of the video is probed when the stop frame is set.
+        self.assertEqual(12, KeyFrameIndex.from_media(FRAME_FILTER_TEST_VIDEO, 12).frame_count)
+
+
+    def test_key_frame_index_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            index_dir = os.path.join(cache_dir, 'key_frame_indexes')
+            os.makedirs(index_dir)
+            old_index_path = os.path.join(index_dir, 'old.npy')
+            KeyFrameIndex.from_media(VIDEO_WITH_SET_FRAME_ISSUE).save(old_index_path)
+            os.utime(old_index_path, ns=(0, 0))
+
+            job_properties = dict(MEDIA_CACHE_DIR=cache_dir, MEDIA_CACHE_MAX_SIZE_MB='0.001')
+            job = mpf.VideoJob('Test', FRAME_FILTER_TEST_VIDEO, 6, 21, dict(job_properties, USE_KEY_FRAMES='true'),
+                               {}, None)
+            self.assertEqual([10, 15, 20], KeyFrameFilter.get_key_frames(job))
+            # Least recently used index was evicted to make room for the new index.
+            self.assertFalse(os.path.exists(old_index_path))
+            index_files = os.listdir(index_dir)
+            self.assertEqual(1, len(index_files))
+
+            # The whole video is indexed, even though the first job stopped at frame 21.
+            cached_index = media_cache.get_key_frame_index(FRAME_FILTER_TEST_VIDEO, job_properties)
+            self.assertIsInstance(cached_index.get_frame_time_ms(0), float)
+            self.assertEqual(30, cached_index.frame_count)
+            self.assertEqual([0, 5, 10, 15, 20, 25], list(cached_index.key_frames))
+            self.assertEqual(index_files, os.listdir(index_dir))
+
+
     def test_reverse_transform_no_feed_forward_no_search_region(self):
         job = mpf.VideoJob('Test', FRAME_FILTER_TEST_VIDEO, 0, 30, {}, {}, None)
         cap = mpf_util.VideoCapture(job)
@@ -740,6 +1094,23 @@ class FrameFilterTest(unittest.TestCase):
         self.assertEqual(60, last_detection.height)
 
 
+    def test_reverse_transform_columnar_track(self):
+        job = mpf.VideoJob('Test', FRAME_FILTER_TEST_VIDEO, 0, 30,
+                           dict(ROTATION='30', HORIZONTAL_FLIP='true', FRAME_INTERVAL='2'), {}, None)
+        cap = mpf_util.VideoCapture(job)
+
+        video_track = create_test_track()
+        for i, image_location in enumerate(video_track.frame_locations.values()):
+            image_location.detection_properties['ROTATION'] = str(i * 10.0)
+        video_track.frame_locations[7].detection_properties['ROTATION'] = '0.0'
+        columnar_track = mpf_util.ColumnarVideoTrack.from_video_track(video_track)
+
+        cap.reverse_transform(video_track)
+        cap.reverse_transform(columnar_track)
+        self.assertEqual([10, 14, 20], columnar_track.frame_indices.tolist())
+        self.assertEqual(video_track, columnar_track.to_video_track())
+
+
 class TestVideoCaptureMixin(unittest.TestCase):
     def test_video_capture_mixin(self):
         job_properties = {
@@ -762,6 +1133,84 @@ class TestVideoCaptureMixin(unittest.TestCase):
         self.assertEqual((239, 199, 30, 20), mpf_util.Rect.from_image_location(results[3].frame_locations[0]))
 
 
+    def test_split_job_at_key_frames(self):
+        job = create_video_job(1, 29, 3)
+        sub_jobs = _split_job(job, 3)
+        self.assertEqual([(1, 9), (10, 21), (22, 29)], [(j.start_frame, j.stop_frame) for j in sub_jobs])
+
+        sub_job_frames = []
+        for sub_job in sub_jobs:
+            sub_job_frames.extend(get_frame_numbers(mpf_util.VideoCapture(sub_job)))
+        self.assertEqual(get_frame_numbers(mpf_util.VideoCapture(job)), sub_job_frames)
+
+        self.assertEqual(2, len(_split_job(create_video_job(0, 2, 2), 5)))
+        self.assertEqual([job], _split_job(create_video_job(1, 29, 3), 1))
+
+
+    def test_parallel_segments(self):
+        job = create_video_job(0, -1, 2)
+        job.job_properties['PARALLEL_SEGMENTS'] = '4'
+        job.job_properties['ROTATION'] = '90'
+        results = list(FrameNumberComponent().get_detections_from_video(job))
+        self.assertEqual(list(range(0, 30, 2)), [t.start_frame for t in results])
+        for track in results:
+            self.assertEqual([track.start_frame], list(track.frame_locations))
+            self.assertEqual(str(track.start_frame), track.detection_properties['FRAME_NUMBER'])
+            # Reverse transform of the rotated frame's top left corner.
+            self.assertEqual((0, 239, 1, 1), mpf_util.Rect.from_image_location(
+                track.frame_locations[track.start_frame]))
+
+
+    def test_parallel_segments_with_scene_change_filter(self):
+        # Each sub-job's filter would start without a previous frame to compare to, so the job must not be split.
+        for threshold, expected_frames in (('5', [0]), (str(3.5 / 255), [0, 4, 8, 12, 16, 20, 24, 28])):
+            with self.subTest(threshold=threshold):
+                job = create_video_job(0, 29)
+                job.job_properties['SCENE_CHANGE_THRESHOLD'] = threshold
+                sequential_results = list(FrameNumberComponent().get_detections_from_video(job))
+
+                job.job_properties['PARALLEL_SEGMENTS'] = '3'
+                parallel_results = list(FrameNumberComponent().get_detections_from_video(job))
+
+                self.assertEqual(expected_frames, [t.start_frame for t in sequential_results])
+                self.assertEqual(expected_frames, [t.start_frame for t in parallel_results])
+
+
+    def test_video_capture_mixin_with_columnar_tracks(self):
+        job = create_video_job(0, -1, 2)
+        job.job_properties['PARALLEL_SEGMENTS'] = '3'
+        job.job_properties['ROTATION'] = '90'
+        results = list(ColumnarFrameNumberComponent().get_detections_from_video(job))
+        # There is one track for each segment.
+        self.assertEqual(3, len(results))
+        for track in results:
+            self.assertIsInstance(track, mpf_util.ColumnarVideoTrack)
+            self.assertEqual((track.start_frame, track.stop_frame),
+                             (track.frame_indices[0], track.frame_indices[-1]))
+            self.assertEqual([[0, 239, 1, 1]] * len(track), track.boxes.tolist())
+        self.assertEqual(list(range(0, 30, 2)), np.concatenate([t.frame_indices for t in results]).tolist())
+        self.assertEqual('90.0', results[0].frame_locations[4].detection_properties['ROTATION'])
+
+
+
+class FrameNumberComponent(mpf_util.VideoCaptureMixin):
+    def get_detections_from_video_capture(self, video_job, video_capture):
+        for frame_index, frame in enumerate(video_capture):
+            yield mpf.VideoTrack(
+                frame_index, frame_index,
+                frame_locations={frame_index: mpf.ImageLocation(0, 0, 1, 1)},
+                detection_properties=dict(FRAME_NUMBER=str(get_frame_number(frame))))
+
+
+
+class ColumnarFrameNumberComponent(mpf_util.VideoCaptureMixin):
+    def get_detections_from_video_capture(self, video_job, video_capture):
+        track = mpf_util.ColumnarVideoTrack(0, video_capture.frame_count - 1)
+        for frame_index, frame in enumerate(video_capture):
+            track.add_detection(frame_index, 0, 0, 1, 1)
+        yield track
+
+
 
 class VideoCaptureMixinComponent(mpf_util.VideoCaptureMixin):
     def __init__(self, test_obj):
@@ -841,3 +1290,7 @@ def get_frame_number(frame):
     # In frame_filter_test.mp4 value of each color channel value is equal to that frame's frame number.
     # For example the color of frame 0 is rgb(0, 0, 0) and frame 1 is rgb(1, 1, 1).
     return frame[0, 0, 0]
+
+
+def get_frame_numbers(frames):
+    return [get_frame_number(f) for f in frames]